@@ -49,9 +49,12 @@ from ..models import (
     UserRetiredCampaign,
 )
 from ..tasks import retire_campaign
+from ..transcription_history import get_compacted_texts
 from ..views import ReportCampaignView
 from .actions import (
     anonymize_action,
+    export_transcriptions_to_csv_action,
+    export_transcriptions_to_excel_action,
     publish_action,
     publish_item_action,
     reopen_asset_action,
@@ -699,10 +702,14 @@ class TranscriptionAdmin(admin.ModelAdmin):
         "rejected",
         "reviewed_by",
         "supersedes",
-        "text",
+        "full_text",
     )
+    exclude = ("text",)
 
-    actions = (export_to_csv_action, export_to_excel_action)
+    actions = (
+        export_transcriptions_to_csv_action,
+        export_transcriptions_to_excel_action,
+    )
 
     def lookup_allowed(self, key, value):
         if key in ("asset__item__project__campaign__id__exact"):
@@ -710,10 +717,19 @@ class TranscriptionAdmin(admin.ModelAdmin):
         else:
             return super().lookup_allowed(key, value)
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("text_delta")
+
     @admin.display(description="Text")
     def truncated_text(self, obj):
+        if hasattr(obj, "text_delta"):
+            return "(Compacted)"
         return truncatechars(obj.text, 100)
 
+    @admin.display(description="Text")
+    def full_text(self, obj):
+        return get_compacted_texts([obj.pk]).get(obj.pk, obj.text)
+
 
 @admin.register(SimpleContentBlock)
 class SimpleContentBlockAdmin(admin.ModelAdmin):
@@ -3,12 +3,69 @@ from logging import getLogger
 
 from django.contrib import messages
 from django.utils.timezone import now
-
-from ..models import Asset, Transcription, TranscriptionStatus
+from tabular_export.admin import ensure_filename
+from tabular_export.core import (
+    export_to_csv_response,
+    export_to_excel_response,
+    flatten_queryset,
+    get_field_names_from_queryset,
+)
+
+from ..models import (
+    Asset,
+    Item,
+    Project,
+    SiteReportEvent,
+    TranscribableAsset,
+    Transcription,
+    TranscriptionStatus,
+    TranscriptionStatusCount,
+)
+from ..transcription_history import get_compacted_texts
 
 logger = getLogger(__name__)
 
 
+def refresh_asset_rollups(queryset):
+    """
+    Update denormalized asset data after a bulk update skipped the signals
+    """
+
+    pks = list(queryset.values_list("pk", flat=True))
+
+    if queryset.model is Asset:
+        TranscribableAsset.objects.refresh(asset_ids=pks)
+        campaign_lookup = "item__asset__in"
+    elif queryset.model is Item:
+        TranscribableAsset.objects.refresh(item_ids=pks)
+        campaign_lookup = "item__in"
+    elif queryset.model is Project:
+        TranscribableAsset.objects.refresh(project_ids=pks)
+        campaign_lookup = "pk__in"
+    else:
+        return
+
+    projects = set(
+        Project.objects.filter(**{campaign_lookup: pks}).values_list(
+            "pk", "campaign_id"
+        )
+    )
+    TranscriptionStatusCount.objects.rebuild(
+        campaign_ids={campaign_id for _, campaign_id in projects}
+    )
+
+    # Bulk updates are not recorded as deltas so the next incremental site
+    # report recalculates the affected campaigns and topics instead:
+    SiteReportEvent.objects.bulk_create(
+        SiteReportEvent(
+            event_type=SiteReportEvent.EventType.RECALCULATE,
+            campaign_id=campaign_id,
+            project_id=project_id,
+        )
+        for project_id, campaign_id in projects
+    )
+
+
 def anonymize_action(modeladmin, request, queryset):
     count = queryset.count()
     for user_account in queryset:
@@ -33,6 +90,7 @@ def publish_item_action(modeladmin, request, queryset):
     asset_count = Asset.objects.filter(item__in=queryset, published=False).update(
         published=True
     )
+    refresh_asset_rollups(queryset)
 
     messages.info(request, f"Published {count} items and {asset_count} assets")
 
@@ -49,6 +107,7 @@ def unpublish_item_action(modeladmin, request, queryset):
     asset_count = Asset.objects.filter(item__in=queryset, published=True).update(
         published=False
     )
+    refresh_asset_rollups(queryset)
 
     messages.info(request, f"Unpublished {count} items and {asset_count} assets")
 
@@ -62,6 +121,7 @@ def publish_action(modeladmin, request, queryset):
     """
 
     count = queryset.filter(published=False).update(published=True)
+    refresh_asset_rollups(queryset)
     messages.info(request, f"Published {count} objects")
 
 
@@ -74,6 +134,7 @@ def unpublish_action(modeladmin, request, queryset):
     """
 
     count = queryset.filter(published=True).update(published=False)
+    refresh_asset_rollups(queryset)
     messages.info(request, f"Unpublished {count} objects")
 
 
@@ -96,8 +157,8 @@ def reopen_asset_action(modeladmin, request, queryset):
     Don't use bulk_create because then the post-save signal will not be sent.
 
     """
-    for asset in assets:
-        latest_transcription = asset.transcription_set.order_by("-pk").first()
+    for asset in assets.select_related("latest_transcription"):
+        latest_transcription = asset.latest_transcription
         new_transcription = Transcription(
             supersedes=latest_transcription,
             rejected=now(),
@@ -113,3 +174,40 @@ def reopen_asset_action(modeladmin, request, queryset):
 
 
 reopen_asset_action.short_description = "Reopen selected assets"
+
+
+def flatten_transcription_queryset(queryset):
+    """
+    Flatten transcriptions for export with the full text of any which have been
+    compacted
+    """
+
+    field_names = get_field_names_from_queryset(queryset)
+    headers, rows = flatten_queryset(queryset, field_names=field_names)
+
+    id_index = field_names.index("id")
+    text_index = field_names.index("text")
+
+    rows = [list(row) for row in rows]
+    compacted_texts = get_compacted_texts([row[id_index] for row in rows])
+    for row in rows:
+        if row[id_index] in compacted_texts:
+            row[text_index] = compacted_texts[row[id_index]]
+
+    return headers, rows
+
+
+@ensure_filename("csv")
+def export_transcriptions_to_csv_action(modeladmin, request, queryset, filename=None):
+    return export_to_csv_response(filename, *flatten_transcription_queryset(queryset))
+
+
+export_transcriptions_to_csv_action.short_description = "Export to CSV"
+
+
+@ensure_filename("xlsx")
+def export_transcriptions_to_excel_action(modeladmin, request, queryset, filename=None):
+    return export_to_excel_response(filename, *flatten_transcription_queryset(queryset))
+
+
+export_transcriptions_to_excel_action.short_description = "Export to Excel"
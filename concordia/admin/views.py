@@ -13,7 +13,6 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import permission_required
 from django.core.exceptions import ValidationError
 from django.core.files.uploadhandler import TemporaryFileUploadHandler
-from django.db.models import OuterRef, Subquery
 from django.http import HttpResponse
 from django.shortcuts import render
 from django.utils.text import slugify
@@ -21,8 +20,8 @@ from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt, csrf_protect
 from tabular_export.core import export_to_csv_response, flatten_queryset
 
-from concordia.models import Asset, Item, Transcription, TranscriptionStatus
-from exporter.views import do_bagit_export
+from concordia.models import Asset, Item, TranscriptionStatus
+from exporter.views import do_bagit_export, get_latest_transcription_data
 from importer.models import ImportItem, ImportItemAsset, ImportJob
 from importer.tasks import (
     fetch_all_urls,
@@ -357,15 +356,7 @@ def project_level_export(request):
         )
         item_qs = asset_qs
 
-        latest_trans_subquery = (
-            Transcription.objects.filter(asset=OuterRef("pk"))
-            .order_by("-pk")
-            .values("text")
-        )
-
-        assets = asset_qs.annotate(
-            latest_transcription=Subquery(latest_trans_subquery[:1])
-        )
+        assets = get_latest_transcription_data(asset_qs)
 
         export_filename_base = "%s%s" % (
             campaign_slug,
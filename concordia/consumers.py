@@ -1,21 +1,343 @@
+import asyncio
 import time
+from logging import getLogger
+from urllib.parse import parse_qs
 
+import msgpack
+from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from django.db import IntegrityError
+
+from .reservation_backends import ReservationStatus, get_reservation_backend
+from .signals.signals import reservation_obtained, reservation_released
+from .utils import get_or_create_session_reservation_token, get_redis_connection
+
+logger = getLogger(__name__)
+
+
+def get_asset_update_group(scope_type=None, scope_id=None):
+    """
+    Return the channel layer group for updates to assets in a campaign, project,
+    item or single asset, or the group which receives every update if scope_type
+    is None
+    """
+
+    if scope_type is None:
+        return "asset_updates"
+    else:
+        return f"asset_updates.{scope_type}.{scope_id}"
 
 
 class AssetConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Broadcasts asset updates and manages the reservations held by this socket
+
+    Browsers send messages like {"type": "reserve", "asset_pk": 123} using the
+    reserve, renew and release types instead of polling reserve_asset. Each
+    request receives an asset_reservation_status reply whose status is one of
+    the ReservationStatus values, "released" or "unavailable". A reservation is
+    shared by every socket using the same session, so it is released as soon
+    as the last socket holding it sends a release or closes. Browsers without a
+    session cookie receive "unavailable" because the socket cannot set one, and
+    should use reserve_asset instead.
+
+    Asset changes are delivered as asset_updates messages containing a list of
+    updates, each with the same fields as the older asset_update message.
+    Sockets only receive updates and reservation changes for the scopes they
+    subscribe to using messages like {"type": "subscribe", "scope_type":
+    "campaign", "scope_id": 123}. The "all" scope type receives every update
+    and is intended for the action app. Reservation changes are only sent to
+    the "all" and "asset" scopes.
+
+    The payload can be negotiated using query string parameters when the socket
+    is opened: format=compact omits the latest transcription text from asset
+    updates for clients which only display status and encoding=msgpack uses
+    MessagePack binary frames instead of JSON text frames in both directions.
+    """
+
+    RESERVATION_ACTIONS = ("reserve", "renew", "release")
+    SUBSCRIPTION_ACTIONS = ("subscribe", "unsubscribe")
+    SCOPE_TYPES = ("campaign", "project", "item", "asset")
+    PAYLOAD_FORMATS = ("full", "compact")
+    ENCODINGS = ("json", "msgpack")
+
+    #: Limits the number of groups a single socket can add itself to
+    MAX_SUBSCRIPTIONS = 100
+
+    #: Asset updates received within this many seconds are sent to the browser
+    #: together as a single asset_updates message with one entry per asset
+    UPDATE_BATCH_SECONDS = 0.25
+
     async def connect(self):
-        await self.channel_layer.group_add("asset_updates", self.channel_name)
+        self.reserved_asset_pks = set()
+        self.pending_asset_updates = {}
+        self.asset_update_flush = None
+        self.subscribed_groups = set()
+
+        options = parse_qs(self.scope.get("query_string", b"").decode("latin-1"))
+        self.payload_format = options.get("format", ["full"])[-1]
+        self.encoding = options.get("encoding", ["json"])[-1]
+
+        if (
+            self.payload_format not in self.PAYLOAD_FORMATS
+            or self.encoding not in self.ENCODINGS
+        ):
+            logger.warning("Rejecting asset socket with options: %r", options)
+            await self.close()
+            return
+
         await self.accept()
 
     async def disconnect(self, code):
-        await self.channel_layer.group_discard("asset_updates", self.channel_name)
+        for group in self.subscribed_groups:
+            await self.channel_layer.group_discard(group, self.channel_name)
+
+        if self.asset_update_flush is not None:
+            self.asset_update_flush.cancel()
+
+        for asset_pk in list(self.reserved_asset_pks):
+            await self.release_reservation(asset_pk)
+
+    async def receive(self, text_data=None, bytes_data=None, **kwargs):
+        if bytes_data is not None and self.encoding == "msgpack":
+            try:
+                content = msgpack.unpackb(bytes_data)
+            except ValueError:
+                logger.warning("Ignoring undecodable asset socket message")
+                return
+            await self.receive_json(content, **kwargs)
+        else:
+            await super().receive(text_data=text_data, bytes_data=bytes_data, **kwargs)
+
+    async def send_json(self, content, close=False):
+        if self.encoding == "msgpack":
+            await self.send(bytes_data=msgpack.packb(content), close=close)
+        else:
+            await super().send_json(content, close=close)
+
+    async def receive_json(self, content, **kwargs):
+        action = content.get("type") if isinstance(content, dict) else None
+
+        if action in self.SUBSCRIPTION_ACTIONS:
+            await self.update_subscription(action, content)
+            return
+
+        if action not in self.RESERVATION_ACTIONS:
+            logger.warning("Ignoring unknown asset socket message: %r", content)
+            return
+
+        try:
+            asset_pk = int(content["asset_pk"])
+        except (KeyError, TypeError, ValueError):
+            logger.warning("Ignoring asset socket message without asset_pk")
+            return
+
+        if action == "release":
+            await self.release_reservation(asset_pk)
+            status = "released"
+        else:
+            status = await self.obtain_reservation(asset_pk)
+
+        await self.send_json(
+            {
+                "message": {
+                    "type": "asset_reservation_status",
+                    "asset_pk": asset_pk,
+                    "status": status,
+                },
+                "sent": int(time.time()),
+            }
+        )
+
+    async def update_subscription(self, action, content):
+        scope_type = content.get("scope_type")
+
+        if scope_type == "all":
+            group = get_asset_update_group()
+        elif scope_type in self.SCOPE_TYPES:
+            try:
+                group = get_asset_update_group(scope_type, int(content["scope_id"]))
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Ignoring subscription message without scope_id")
+                return
+        else:
+            logger.warning("Ignoring subscription to unknown scope: %r", content)
+            return
+
+        if action == "unsubscribe":
+            self.subscribed_groups.discard(group)
+            await self.channel_layer.group_discard(group, self.channel_name)
+        elif (
+            group not in self.subscribed_groups
+            and len(self.subscribed_groups) >= self.MAX_SUBSCRIPTIONS
+        ):
+            logger.warning("Ignoring subscription beyond limit: %r", content)
+            return
+        else:
+            self.subscribed_groups.add(group)
+            await self.channel_layer.group_add(group, self.channel_name)
+
+        await self.send_json(
+            {
+                "message": {
+                    "type": "asset_subscription_status",
+                    "scope_type": scope_type,
+                    "scope_id": content.get("scope_id"),
+                    "subscribed": group in self.subscribed_groups,
+                },
+                "sent": int(time.time()),
+            }
+        )
+
+    def get_reservation_token(self):
+        """
+        Return the session's reservation token, or None if the browser does not
+        have a session
+
+        A session created here would never reach the browser, because a
+        WebSocket cannot set cookies, and the reservation views would use a
+        different token.
+        """
+
+        session = self.scope["session"]
+        reservation_token = get_or_create_session_reservation_token(session)
+
+        # Loading the session clears the key if it did not exist:
+        if session.session_key is None:
+            return None
+
+        # Unlike views, consumers do not save modified sessions automatically:
+        if session.modified:
+            session.save()
+
+        return reservation_token
+
+    def get_reservation_sockets_key(self, asset_pk, reservation_token):
+        """
+        Return the Redis key for the set of sockets holding a reservation
+        """
+
+        return f"concordia:reservation-sockets:{asset_pk}:{reservation_token}"
+
+    @database_sync_to_async
+    def obtain_reservation(self, asset_pk):
+        reservation_token = self.get_reservation_token()
+        if reservation_token is None:
+            return "unavailable"
+
+        redis = get_redis_connection()
+        sockets_key = self.get_reservation_sockets_key(asset_pk, reservation_token)
+
+        # The socket is registered first so another socket for the same session
+        # which is closing will not release the reservation we are renewing. The
+        # expiration cleans up after sockets which are never closed cleanly:
+        with redis.pipeline() as pipe:
+            pipe.sadd(sockets_key, self.channel_name)
+            pipe.expire(sockets_key, 2 * settings.TRANSCRIPTION_RESERVATION_SECONDS)
+            pipe.execute()
+
+        try:
+            status = get_reservation_backend().reserve(asset_pk, reservation_token)
+        except IntegrityError:
+            logger.warning("Unable to reserve unknown asset %s", asset_pk)
+            status = ReservationStatus.CONFLICT
+
+        if status in ReservationStatus.SUCCESSFUL:
+            self.reserved_asset_pks.add(asset_pk)
+            reservation_obtained.send(
+                sender="asset_consumer",
+                asset_pk=asset_pk,
+                reservation_token=reservation_token,
+            )
+        else:
+            self.reserved_asset_pks.discard(asset_pk)
+            redis.srem(sockets_key, self.channel_name)
+
+        return status
+
+    @database_sync_to_async
+    def release_reservation(self, asset_pk):
+        self.reserved_asset_pks.discard(asset_pk)
+
+        reservation_token = self.get_reservation_token()
+        if reservation_token is None:
+            return
+
+        with get_redis_connection().pipeline() as pipe:
+            pipe.srem(
+                self.get_reservation_sockets_key(asset_pk, reservation_token),
+                self.channel_name,
+            )
+            pipe.scard(self.get_reservation_sockets_key(asset_pk, reservation_token))
+            _, remaining_sockets = pipe.execute()
+
+        if remaining_sockets:
+            logger.info(
+                "Keeping reservation with token %s for %d other sockets",
+                reservation_token,
+                remaining_sockets,
+            )
+            return
+
+        get_reservation_backend().release(asset_pk, reservation_token)
+
+        logger.info("Releasing reservation with token %s", reservation_token)
+        reservation_released.send(
+            sender="asset_consumer",
+            asset_pk=asset_pk,
+            reservation_token=reservation_token,
+        )
+
+    def prepare_asset_update(self, update):
+        latest_transcription = update.get("latest_transcription")
+
+        if self.payload_format == "compact" and latest_transcription:
+            update = {
+                **update,
+                "latest_transcription": {
+                    k: v for k, v in latest_transcription.items() if k != "text"
+                },
+            }
+
+        return update
 
     async def asset_update(self, message):
-        await self.send_json({"message": message, "sent": int(time.time())})
+        await self.send_json(
+            {"message": self.prepare_asset_update(message), "sent": int(time.time())}
+        )
+
+    async def asset_updates(self, message):
+        # Later updates for the same asset replace any which are still pending:
+        for update in message["updates"]:
+            self.pending_asset_updates[update["asset_pk"]] = update
+
+        if self.asset_update_flush is None:
+            self.asset_update_flush = asyncio.ensure_future(
+                self.send_pending_asset_updates()
+            )
+
+    async def send_pending_asset_updates(self):
+        await asyncio.sleep(self.UPDATE_BATCH_SECONDS)
+
+        updates = [
+            self.prepare_asset_update(i) for i in self.pending_asset_updates.values()
+        ]
+        self.pending_asset_updates = {}
+        self.asset_update_flush = None
+
+        await self.send_json(
+            {
+                "message": {"type": "asset_updates", "updates": updates},
+                "sent": int(time.time()),
+            }
+        )
 
     async def asset_reservation_obtained(self, message):
         await self.send_json({"message": message, "sent": int(time.time())})
 
     async def asset_reservation_released(self, message):
         await self.send_json({"message": message, "sent": int(time.time())})
+
+    async def asset_reservations_released(self, message):
+        await self.send_json({"message": message, "sent": int(time.time())})
@@ -224,6 +224,7 @@ class AssetDocument(Document):
             super()
             .get_queryset()
             .order_by("pk")
+            .select_related("latest_transcription")
             .prefetch_related(
                 "item",
                 "item__project",
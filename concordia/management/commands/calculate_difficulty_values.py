@@ -1,19 +1,29 @@
 """
-Run the task which calculates initial difficulty values
+Run the task which calculates difficulty values
+
+By default only assets with transcriptions changed since the previous run are
+recalculated. Use --full to recalculate every published asset.
 """
 
 from timeit import default_timer
 
 from django.core.management.base import BaseCommand
 
-from concordia.tasks import calculate_difficulty_values
+from concordia.tasks import calculate_incremental_difficulty_values
 
 
 class Command(BaseCommand):
-    def handle(self, *, verbosity, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recalculate every published asset rather than recent changes",
+        )
+
+    def handle(self, *, verbosity, full, **kwargs):
         start_time = default_timer()
 
-        updated_count = calculate_difficulty_values()
+        updated_count = calculate_incremental_difficulty_values(full=full)
 
         if verbosity > 1:
             print(
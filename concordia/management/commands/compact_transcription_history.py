@@ -0,0 +1,34 @@
+"""
+Run the task which compacts the text of superseded transcriptions
+
+Superseded transcriptions which have not changed for
+TRANSCRIPTION_COMPACTION_MIN_AGE_DAYS have their text replaced by a compressed
+delta against the transcription which superseded them. Use --min-age-days to
+override the setting.
+"""
+
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand
+
+from concordia.tasks import compact_transcription_history
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age-days",
+            type=int,
+            help="Only compact transcriptions which have not changed for this long",
+        )
+
+    def handle(self, *, verbosity, min_age_days, **kwargs):
+        start_time = default_timer()
+
+        compacted_count = compact_transcription_history(min_age_days=min_age_days)
+
+        if verbosity > 1:
+            print(
+                "Compacted %d records in %0.1f seconds"
+                % (compacted_count, default_timer() - start_time)
+            )
@@ -0,0 +1,423 @@
+"""
+Measure how asset updates and reservation changes fan out to WebSocket clients
+
+This opens many in-process clients against the asset consumer, saves
+transcriptions and makes reservations on a set of temporary assets and reports
+the delivery latency percentiles and how many messages never arrived. Messages
+travel through the configured channel layer so the results reflect Redis or the
+in-memory layer depending on the CHANNEL_LAYERS setting.
+
+The temporary campaign is deleted when the test finishes.
+"""
+
+import asyncio
+import random
+import time
+import uuid
+from statistics import quantiles
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from concordia.models import Asset, Campaign, Item, MediaType, Project, Transcription
+from concordia.reservation_backends import ReservationStatus
+from concordia.routing import application
+from concordia.utils import get_anonymous_user
+
+SOCKET_PATH = "/ws/asset/asset_updates/"
+
+
+def get_default_origin():
+    host = next((i for i in settings.ALLOWED_HOSTS if i != "*"), "localhost")
+    return f"http://{host.lstrip('.')}"
+
+
+class LoadTestClient:
+    """
+    A WebSocket client which records when each message is received
+    """
+
+    def __init__(self, *, payload_format, encoding, origin, session_key=None):
+        headers = [(b"origin", origin.encode("utf-8"))]
+        # Reservations are only made for browsers which already have a session:
+        if session_key:
+            cookie = f"{settings.SESSION_COOKIE_NAME}={session_key}"
+            headers.append((b"cookie", cookie.encode("utf-8")))
+
+        self.encoding = encoding
+        self.communicator = WebsocketCommunicator(
+            application,
+            f"{SOCKET_PATH}?format={payload_format}&encoding={encoding}",
+            headers=headers,
+        )
+        self.latest_transcriptions = {}
+        self.update_latencies = []
+        self.reservation_latencies = []
+        self.replies = asyncio.Queue()
+
+    async def connect(self, *, subscribe, timeout):
+        connected, _ = await self.communicator.connect(timeout=timeout)
+        if not connected:
+            raise RuntimeError("The asset socket refused the connection")
+
+        if subscribe:
+            await self.send({"type": "subscribe", "scope_type": "all"})
+            await self.receive(timeout=timeout)
+
+    async def send(self, content):
+        if self.encoding == "msgpack":
+            await self.communicator.send_to(bytes_data=msgpack.packb(content))
+        else:
+            await self.communicator.send_json_to(content)
+
+    async def receive(self, timeout):
+        if self.encoding == "msgpack":
+            return msgpack.unpackb(await self.communicator.receive_from(timeout))
+        else:
+            return await self.communicator.receive_json_from(timeout)
+
+    async def listen(self, transcription_times):
+        while True:
+            data = await self.receive(timeout=None)
+            received = time.time()
+            message = data["message"]
+
+            if message["type"] == "asset_updates":
+                for update in message["updates"]:
+                    latest_transcription = update["latest_transcription"]
+                    if not latest_transcription:
+                        continue
+                    transcription_pk = latest_transcription["id"]
+                    if transcription_pk in transcription_times:
+                        self.update_latencies.append(
+                            received - transcription_times[transcription_pk]
+                        )
+                    self.latest_transcriptions[update["asset_pk"]] = max(
+                        transcription_pk,
+                        self.latest_transcriptions.get(update["asset_pk"], 0),
+                    )
+            elif message["type"] in (
+                "asset_reservation_obtained",
+                "asset_reservation_released",
+            ):
+                self.reservation_latencies.append(received - message["sent"])
+            elif message["type"] == "asset_reservation_status":
+                self.replies.put_nowait(message)
+
+    async def request_reservation(self, action, asset_pk, timeout):
+        await self.send({"type": action, "asset_pk": asset_pk})
+        message = await asyncio.wait_for(self.replies.get(), timeout)
+        return message["status"]
+
+    async def disconnect(self):
+        await self.communicator.disconnect()
+
+
+class Command(BaseCommand):
+    help = __doc__.strip()
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--clients", type=int, default=100, help="Number of listening sockets"
+        )
+        parser.add_argument(
+            "--assets", type=int, default=10, help="Number of temporary assets"
+        )
+        parser.add_argument(
+            "--transcriptions",
+            type=int,
+            default=100,
+            help="Number of transcriptions to save",
+        )
+        parser.add_argument(
+            "--reservations",
+            type=int,
+            default=50,
+            help="Number of reservations to obtain and release",
+        )
+        parser.add_argument(
+            "--reservers",
+            type=int,
+            default=5,
+            help="Number of sockets making reservations",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=20,
+            help="Transcriptions and reservations started per second",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=10,
+            help="Seconds to wait for connections and remaining deliveries",
+        )
+        parser.add_argument(
+            "--format",
+            dest="payload_format",
+            choices=("full", "compact"),
+            default="full",
+        )
+        parser.add_argument("--encoding", choices=("json", "msgpack"), default="json")
+        parser.add_argument(
+            "--origin",
+            default=get_default_origin(),
+            help="Origin header sent by the sockets, which must match ALLOWED_HOSTS",
+        )
+
+    def handle(self, *, verbosity, **options):
+        campaign, asset_pks = self.create_assets(options["assets"])
+
+        try:
+            results = async_to_sync(self.run_load_test)(asset_pks, **options)
+        finally:
+            campaign.delete()
+
+        self.report(results, verbosity=verbosity, **options)
+
+    def create_assets(self, asset_count):
+        slug = f"websocket-load-test-{uuid.uuid4().hex[:8]}"
+
+        campaign = Campaign.objects.create(
+            title="WebSocket load test", slug=slug, published=True
+        )
+        project = Project.objects.create(
+            campaign=campaign, title="WebSocket load test", slug=slug, published=True
+        )
+        item = Item.objects.create(
+            project=project,
+            title="WebSocket load test",
+            item_id=slug,
+            item_url=f"http://example.com/item/{slug}/",
+            published=True,
+        )
+        # Assets are saved individually so the signal handlers which maintain
+        # the status counts and site report events see them being created:
+        assets = [
+            Asset.objects.create(
+                item=item,
+                title=f"WebSocket load test {i}",
+                slug=f"{slug}-{i}",
+                sequence=i,
+                media_type=MediaType.IMAGE,
+                media_url=f"{i}.jpg",
+                published=True,
+            )
+            for i in range(1, asset_count + 1)
+        ]
+
+        return campaign, [i.pk for i in assets]
+
+    def create_sessions(self, count):
+        session_store = import_string(f"{settings.SESSION_ENGINE}.SessionStore")
+        sessions = [session_store() for i in range(count)]
+        for session in sessions:
+            session.create()
+        return sessions
+
+    async def run_load_test(
+        self,
+        asset_pks,
+        *,
+        clients,
+        transcriptions,
+        reservations,
+        reservers,
+        rate,
+        timeout,
+        payload_format,
+        encoding,
+        origin,
+        **kwargs,
+    ):
+        transcription_times = {}
+        expected_transcriptions = {}
+        reservation_messages = 0
+
+        listeners = [
+            LoadTestClient(
+                payload_format=payload_format, encoding=encoding, origin=origin
+            )
+            for i in range(clients)
+        ]
+        sessions = await database_sync_to_async(self.create_sessions)(reservers)
+        reserving_clients = [
+            LoadTestClient(
+                payload_format=payload_format,
+                encoding=encoding,
+                origin=origin,
+                session_key=session.session_key,
+            )
+            for session in sessions
+        ]
+
+        await asyncio.gather(
+            *(i.connect(subscribe=True, timeout=timeout) for i in listeners),
+            *(i.connect(subscribe=False, timeout=timeout) for i in reserving_clients),
+        )
+
+        listener_tasks = [
+            asyncio.ensure_future(i.listen(transcription_times))
+            for i in listeners + reserving_clients
+        ]
+
+        anonymous_user = await database_sync_to_async(get_anonymous_user)()
+
+        @database_sync_to_async
+        def save_transcription(asset_pk, n):
+            started = time.time()
+            # These run one at a time in the same thread so each transcription
+            # can supersede the previous one for its asset:
+            transcription = Transcription.objects.create(
+                asset_id=asset_pk,
+                user=anonymous_user,
+                supersedes_id=expected_transcriptions.get(asset_pk),
+                text=f"Load test {n}",
+            )
+            # Updates are sent when the transaction commits so the latency is
+            # measured from before the transcription was saved:
+            transcription_times[transcription.pk] = started
+            expected_transcriptions[asset_pk] = transcription.pk
+
+        async def reserve_and_release(client, asset_pk):
+            nonlocal reservation_messages
+
+            status = await client.request_reservation("reserve", asset_pk, timeout)
+            if status in ReservationStatus.SUCCESSFUL:
+                reservation_messages += 1
+            await client.request_reservation("release", asset_pk, timeout)
+            reservation_messages += 1
+
+        # Each reserving socket handles one request at a time so its replies
+        # can be matched to the requests which caused them:
+        reserver_locks = {i: asyncio.Lock() for i in reserving_clients}
+
+        async def locked_reservation(client, asset_pk):
+            async with reserver_locks[client]:
+                await reserve_and_release(client, asset_pk)
+
+        events = ["transcription"] * transcriptions + ["reservation"] * (
+            reservations if reserving_clients else 0
+        )
+        random.shuffle(events)
+
+        started = time.monotonic()
+        event_tasks = []
+        for n, event in enumerate(events):
+            asset_pk = random.choice(asset_pks)
+            if event == "transcription":
+                event_tasks.append(
+                    asyncio.ensure_future(save_transcription(asset_pk, n))
+                )
+            else:
+                event_tasks.append(
+                    asyncio.ensure_future(
+                        locked_reservation(random.choice(reserving_clients), asset_pk)
+                    )
+                )
+            await asyncio.sleep(1 / rate)
+
+        await asyncio.gather(*event_tasks)
+        generation_seconds = time.monotonic() - started
+
+        def is_complete(listener):
+            return len(listener.reservation_latencies) >= reservation_messages and all(
+                listener.latest_transcriptions.get(asset_pk, 0) >= transcription_pk
+                for asset_pk, transcription_pk in expected_transcriptions.items()
+            )
+
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not all(map(is_complete, listeners)):
+            await asyncio.sleep(0.1)
+
+        for task in listener_tasks:
+            task.cancel()
+        for result in await asyncio.gather(*listener_tasks, return_exceptions=True):
+            # Cancellation is expected but anything else means a client failed:
+            if isinstance(result, Exception):
+                raise result
+        await asyncio.gather(
+            *(i.disconnect() for i in listeners + reserving_clients),
+            return_exceptions=True,
+        )
+        for session in sessions:
+            await database_sync_to_async(session.delete)()
+
+        missing_updates = sum(
+            listener.latest_transcriptions.get(asset_pk, 0) < transcription_pk
+            for listener in listeners
+            for asset_pk, transcription_pk in expected_transcriptions.items()
+        )
+        missing_reservation_messages = sum(
+            max(0, reservation_messages - len(listener.reservation_latencies))
+            for listener in listeners
+        )
+
+        return {
+            "generation_seconds": generation_seconds,
+            "update_latencies": [j for i in listeners for j in i.update_latencies],
+            "expected_updates": len(expected_transcriptions) * len(listeners),
+            "missing_updates": missing_updates,
+            "reservation_latencies": [
+                j for i in listeners for j in i.reservation_latencies
+            ],
+            "expected_reservation_messages": reservation_messages * len(listeners),
+            "missing_reservation_messages": missing_reservation_messages,
+        }
+
+    def report(
+        self, results, *, verbosity, clients, payload_format, encoding, **kwargs
+    ):
+        if verbosity < 1:
+            return
+
+        self.stdout.write(
+            "%d clients using %s %s payloads over %s in %0.1f seconds"
+            % (
+                clients,
+                payload_format,
+                encoding,
+                type(get_channel_layer()).__name__,
+                results["generation_seconds"],
+            )
+        )
+
+        for label, latencies, expected, missing in (
+            (
+                "Asset updates",
+                results["update_latencies"],
+                results["expected_updates"],
+                results["missing_updates"],
+            ),
+            (
+                "Reservation messages",
+                results["reservation_latencies"],
+                results["expected_reservation_messages"],
+                results["missing_reservation_messages"],
+            ),
+        ):
+            self.stdout.write(
+                "%s: %d received, %d of %d missing"
+                % (label, len(latencies), missing, expected)
+            )
+            self.stdout.write("    %s" % self.format_latencies(latencies))
+
+    def format_latencies(self, latencies):
+        if len(latencies) < 2:
+            return "Not enough messages to calculate latency percentiles"
+
+        percentiles = quantiles(latencies, n=100, method="inclusive")
+
+        return "Latency p50 %0.1fms p90 %0.1fms p99 %0.1fms max %0.1fms" % (
+            percentiles[49] * 1000,
+            percentiles[89] * 1000,
+            percentiles[98] * 1000,
+            max(latencies) * 1000,
+        )
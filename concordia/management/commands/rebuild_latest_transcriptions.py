@@ -0,0 +1,25 @@
+"""
+Point every asset at its most recent transcription
+
+This backfills Asset.latest_transcription and repairs any assets whose pointer
+has drifted from their transcriptions.
+"""
+
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand
+
+from concordia.models import Asset
+
+
+class Command(BaseCommand):
+    def handle(self, *, verbosity, **kwargs):
+        start_time = default_timer()
+
+        updated_count = Asset.objects.all().update_latest_transcriptions()
+
+        if verbosity > 1:
+            print(
+                "Updated %d records in %0.1f seconds"
+                % (updated_count, default_timer() - start_time)
+            )
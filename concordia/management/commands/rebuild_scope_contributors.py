@@ -0,0 +1,30 @@
+"""
+Recalculate the contributors recorded for campaigns, projects and items
+"""
+
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand
+
+from concordia.models import ScopeContributor
+
+
+class Command(BaseCommand):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--campaign",
+            dest="campaign_ids",
+            type=int,
+            action="append",
+            help="Only rebuild the contributors for this campaign ID (repeatable)",
+        )
+
+    def handle(self, *, verbosity, campaign_ids, **kwargs):
+        start_time = default_timer()
+
+        ScopeContributor.objects.rebuild(campaign_ids=campaign_ids)
+
+        if verbosity > 1:
+            print(
+                "Rebuilt contributors in %0.1f seconds" % (default_timer() - start_time)
+            )
@@ -0,0 +1,22 @@
+"""
+Rebuild the work queue used to find the next asset to transcribe
+"""
+
+from timeit import default_timer
+
+from django.core.management.base import BaseCommand
+
+from concordia.models import TranscribableAsset
+
+
+class Command(BaseCommand):
+    def handle(self, *, verbosity, **kwargs):
+        start_time = default_timer()
+
+        TranscribableAsset.objects.refresh()
+
+        if verbosity > 1:
+            print(
+                "Queued %d assets in %0.1f seconds"
+                % (TranscribableAsset.objects.count(), default_timer() - start_time)
+            )
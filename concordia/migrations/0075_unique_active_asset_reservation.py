@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("concordia", "0074_auto_20230314_1341"),
+    ]
+
+    operations = [
+        # Legacy rows may have a NULL tombstone flag or, because of the race
+        # which the constraint prevents, more than one active reservation for
+        # the same asset. We keep the most recent active reservation:
+        migrations.RunSQL(
+            """
+            UPDATE concordia_assettranscriptionreservation
+                SET tombstoned = FALSE
+                WHERE tombstoned IS NULL;
+
+            DELETE FROM concordia_assettranscriptionreservation AS older
+                USING concordia_assettranscriptionreservation AS newer
+                WHERE older.asset_id = newer.asset_id
+                    AND NOT older.tombstoned
+                    AND NOT newer.tombstoned
+                    AND older.id < newer.id;
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name="assettranscriptionreservation",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("tombstoned", False)),
+                fields=("asset",),
+                name="unique_active_asset_reservation",
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0075_unique_active_asset_reservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranscribableAsset",
+            fields=[
+                (
+                    "asset",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to="concordia.asset",
+                    ),
+                ),
+                ("unstarted", models.BooleanField()),
+                ("sequence", models.PositiveIntegerField()),
+                (
+                    "campaign",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="concordia.campaign",
+                    ),
+                ),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, to="concordia.item"
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="concordia.project",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="transcribableasset",
+            index=models.Index(
+                fields=["item", "unstarted", "sequence"],
+                name="concordia_t_item_id_4eb677_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transcribableasset",
+            index=models.Index(
+                fields=["project", "unstarted", "sequence"],
+                name="concordia_t_project_5396e1_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transcribableasset",
+            index=models.Index(
+                fields=["campaign", "unstarted", "sequence"],
+                name="concordia_t_campaig_883f3d_idx",
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO concordia_transcribableasset
+                (asset_id, campaign_id, project_id, item_id, unstarted, sequence)
+            SELECT a.id, p.campaign_id, i.project_id, a.item_id,
+                a.transcription_status = 'not_started', a.sequence
+            FROM concordia_asset a
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            INNER JOIN concordia_project p ON p.id = i.project_id
+            WHERE a.published AND i.published AND p.published
+                AND a.transcription_status IN ('not_started', 'in_progress')
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("concordia", "0076_transcribableasset"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AssetTranscriber",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "asset",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="concordia.asset",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="assettranscriber",
+            constraint=models.UniqueConstraint(
+                fields=("user", "asset"), name="unique_asset_transcriber"
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO concordia_assettranscriber (asset_id, user_id)
+            SELECT DISTINCT asset_id, user_id FROM concordia_transcription
+            ON CONFLICT DO NOTHING
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0077_assettranscriber"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="assettranscriptionreservation",
+            name="review",
+            field=models.BooleanField(
+                default=False,
+                help_text="Review reservations expire after REVIEW_RESERVATION_SECONDS and may be taken over once they have expired",
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0078_assettranscriptionreservation_review"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranscriptionStatusCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope_type",
+                    models.CharField(
+                        choices=[
+                            ("campaign", "Campaign"),
+                            ("project", "Project"),
+                            ("item", "Item"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("scope_id", models.PositiveIntegerField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("not_started", "Not Started"),
+                            ("in_progress", "In Progress"),
+                            ("submitted", "Needs Review"),
+                            ("completed", "Completed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="transcriptionstatuscount",
+            constraint=models.UniqueConstraint(
+                fields=("scope_type", "scope_id", "status"),
+                name="unique_transcription_status_count",
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO concordia_transcriptionstatuscount
+                (scope_type, scope_id, status, count)
+            SELECT s.scope_type, s.scope_id, a.transcription_status, COUNT(*)
+            FROM concordia_asset a
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            INNER JOIN concordia_project p ON p.id = i.project_id
+            CROSS JOIN LATERAL (
+                VALUES ('item', i.id), ('project', p.id), ('campaign', p.campaign_id)
+            ) AS s (scope_type, scope_id)
+            WHERE a.published AND i.published AND p.published
+            GROUP BY s.scope_type, s.scope_id, a.transcription_status
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("concordia", "0079_transcriptionstatuscount"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScopeContributor",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope_type",
+                    models.CharField(
+                        choices=[
+                            ("campaign", "Campaign"),
+                            ("project", "Project"),
+                            ("item", "Item"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("scope_id", models.PositiveIntegerField()),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="scopecontributor",
+            constraint=models.UniqueConstraint(
+                fields=("scope_type", "scope_id", "user"),
+                name="unique_scope_contributor",
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO concordia_scopecontributor (scope_type, scope_id, user_id)
+            SELECT DISTINCT s.scope_type, s.scope_id, u.user_id
+            FROM concordia_transcription t
+            INNER JOIN concordia_asset a ON a.id = t.asset_id
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            INNER JOIN concordia_project p ON p.id = i.project_id
+            CROSS JOIN LATERAL (
+                VALUES ('item', i.id), ('project', p.id), ('campaign', p.campaign_id)
+            ) AS s (scope_type, scope_id)
+            CROSS JOIN LATERAL (
+                VALUES (t.user_id), (t.reviewed_by_id)
+            ) AS u (user_id)
+            WHERE u.user_id IS NOT NULL
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
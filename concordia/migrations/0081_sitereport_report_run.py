@@ -0,0 +1,38 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0080_scopecontributor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="sitereport",
+            name="report_run",
+            field=models.UUIDField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="sitereport",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("campaign__isnull", False), ("report_run__isnull", False)
+                ),
+                fields=("report_run", "campaign"),
+                name="unique_campaign_report_per_run",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="sitereport",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("report_run__isnull", False), ("topic__isnull", False)
+                ),
+                fields=("report_run", "topic"),
+                name="unique_topic_report_per_run",
+            ),
+        ),
+    ]
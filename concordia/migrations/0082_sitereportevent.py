@@ -0,0 +1,59 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0081_sitereport_report_run"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SiteReportEvent",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+                (
+                    "event_type",
+                    models.CharField(
+                        choices=[
+                            ("asset", "Asset"),
+                            ("item", "Item"),
+                            ("project", "Project"),
+                            ("transcription", "Transcription"),
+                            ("tag", "Tag"),
+                            ("recalculate", "Recalculate"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("campaign_id", models.PositiveIntegerField()),
+                ("project_id", models.PositiveIntegerField()),
+                ("topic_id", models.PositiveIntegerField(blank=True, null=True)),
+                ("deltas", models.JSONField(blank=True, default=dict)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="sitereportevent",
+            index=models.Index(
+                fields=["created_on"], name="concordia_s_created_dee85a_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sitereportevent",
+            index=models.Index(
+                fields=["campaign_id", "created_on"],
+                name="concordia_s_campaig_bf337f_idx",
+            ),
+        ),
+    ]
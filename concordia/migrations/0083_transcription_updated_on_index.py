@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-18 21:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0082_sitereportevent"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transcription",
+            index=models.Index(
+                fields=["updated_on"], name="concordia_t_updated_7fb347_idx"
+            ),
+        ),
+    ]
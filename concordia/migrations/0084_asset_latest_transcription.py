@@ -0,0 +1,39 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0083_transcription_updated_on_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="asset",
+            name="latest_transcription",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="concordia.transcription",
+            ),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE concordia_asset a
+            SET latest_transcription_id = t.latest_transcription_id
+            FROM (
+                SELECT asset_id, MAX(id) AS latest_transcription_id
+                FROM concordia_transcription
+                GROUP BY asset_id
+            ) t
+            WHERE a.id = t.asset_id
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:18
+
+from django.db import migrations
+from django.db.models import Count, F
+
+
+def repair_transcription_chains(apps, schema_editor):
+    """
+    Relink transcriptions which would violate the constraints added in the
+    next migration: a second open transcription for an asset, a second
+    transcription superseding the same one or one superseding a transcription
+    for a different asset now supersedes the closest earlier transcription
+    which has not already been superseded.
+    """
+
+    Transcription = apps.get_model("concordia", "Transcription")
+
+    asset_ids = set(
+        Transcription.objects.values("asset_id", "supersedes_id")
+        .annotate(transcription_count=Count("pk"))
+        .filter(transcription_count__gt=1)
+        .values_list("asset_id", flat=True)
+    )
+    asset_ids.update(
+        Transcription.objects.exclude(supersedes=None)
+        .exclude(supersedes__asset_id=F("asset_id"))
+        .values_list("asset_id", flat=True)
+    )
+
+    for asset_id in asset_ids:
+        transcriptions = list(
+            Transcription.objects.filter(asset_id=asset_id)
+            .order_by("pk")
+            .values_list("pk", "supersedes_id")
+        )
+        asset_transcription_ids = {pk for pk, _ in transcriptions}
+        superseded_ids = set()
+        previous_ids = []
+
+        for pk, supersedes_id in transcriptions:
+            if supersedes_id in superseded_ids or (
+                supersedes_id is not None
+                and supersedes_id not in asset_transcription_ids
+            ):
+                candidates = [
+                    i for i in reversed(previous_ids) if i not in superseded_ids
+                ]
+                supersedes_id = candidates[0] if candidates else None
+                Transcription.objects.filter(pk=pk).update(supersedes_id=supersedes_id)
+
+            superseded_ids.add(supersedes_id)
+            previous_ids.append(pk)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("concordia", "0084_asset_latest_transcription"),
+    ]
+
+    operations = [
+        migrations.RunPython(repair_transcription_chains, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0085_repair_transcription_chains"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="transcription",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("supersedes", None)),
+                fields=("asset",),
+                name="unique_open_transcription_per_asset",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="transcription",
+            constraint=models.UniqueConstraint(
+                fields=("supersedes",), name="unique_transcription_supersedes"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="transcription",
+            constraint=models.UniqueConstraint(
+                fields=("id", "asset"), name="unique_transcription_asset"
+            ),
+        ),
+        # A transcription can only supersede another one for the same asset.
+        # This is checked immediately rather than when the transaction commits
+        # so the violation can be reported by the view which saved it:
+        migrations.RunSQL(
+            """
+            ALTER TABLE concordia_transcription
+            ADD CONSTRAINT transcription_supersedes_same_asset
+            FOREIGN KEY (supersedes_id, asset_id)
+            REFERENCES concordia_transcription (id, asset_id)
+            ON DELETE CASCADE
+            """,
+            """
+            ALTER TABLE concordia_transcription
+            DROP CONSTRAINT transcription_supersedes_same_asset
+            """,
+        ),
+    ]
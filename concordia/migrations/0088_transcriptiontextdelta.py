@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0087_userprofileactivitydelta"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TranscriptionTextDelta",
+            fields=[
+                (
+                    "transcription",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="text_delta",
+                        serialize=False,
+                        to="concordia.transcription",
+                    ),
+                ),
+                ("delta", models.BinaryField()),
+                ("created_on", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:29
+
+from django.db import migrations
+from django.db.models import Count, Min
+
+
+def deduplicate_tags(apps, schema_editor):
+    """
+    Merge tags with the same value, which the unique constraint added in the
+    next migration will prevent, into the oldest one
+    """
+
+    Tag = apps.get_model("concordia", "Tag")
+    UserAssetTagCollection = apps.get_model("concordia", "UserAssetTagCollection")
+    TagCollectionTags = UserAssetTagCollection.tags.through
+
+    duplicates = (
+        Tag.objects.values("value")
+        .annotate(tag_count=Count("pk"), first_pk=Min("pk"))
+        .filter(tag_count__gt=1)
+        .values_list("value", "first_pk")
+    )
+
+    for value, first_pk in duplicates:
+        duplicate_pks = list(
+            Tag.objects.filter(value=value)
+            .exclude(pk=first_pk)
+            .values_list("pk", flat=True)
+        )
+        collection_ids = set(
+            TagCollectionTags.objects.filter(tag__in=duplicate_pks).values_list(
+                "userassettagcollection_id", flat=True
+            )
+        )
+
+        TagCollectionTags.objects.bulk_create(
+            [
+                TagCollectionTags(userassettagcollection_id=i, tag_id=first_pk)
+                for i in collection_ids
+            ],
+            ignore_conflicts=True,
+        )
+        # This also deletes the duplicates' rows in the through table:
+        Tag.objects.filter(pk__in=duplicate_pks).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("concordia", "0088_transcriptiontextdelta"),
+    ]
+
+    operations = [
+        migrations.RunPython(deduplicate_tags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 22:30
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0089_deduplicate_tags"),
+    ]
+
+    operations = [
+        # The pattern index from when value was previously unique was not
+        # removed along with the constraint and would conflict with the new one:
+        migrations.RunSQL(
+            "DROP INDEX IF EXISTS concordia_tag_value_374a9b09_like",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AlterField(
+            model_name="tag",
+            name="value",
+            field=models.CharField(
+                max_length=50,
+                unique=True,
+                validators=[
+                    django.core.validators.RegexValidator("^[- _À-ž'\\w]{1,50}$")
+                ],
+            ),
+        ),
+    ]
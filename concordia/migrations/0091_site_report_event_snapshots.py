@@ -0,0 +1,54 @@
+# Generated by Django 3.2.25 on 2026-10-18 23:10
+
+from django.db import migrations, models
+
+import concordia.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("concordia", "0090_tag_value_unique"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="sitereportevent",
+            name="concordia_s_created_dee85a_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="sitereportevent",
+            name="concordia_s_campaig_bf337f_idx",
+        ),
+        migrations.AddField(
+            model_name="sitereport",
+            name="event_snapshot",
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        # Existing events are treated as committed before every snapshot. The
+        # reports without a snapshot are recalculated rather than updated with
+        # them:
+        migrations.AddField(
+            model_name="sitereportevent",
+            name="xid",
+            field=models.BigIntegerField(default=0, editable=False),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name="sitereportevent",
+            name="xid",
+            field=models.BigIntegerField(
+                default=concordia.models.CurrentTransactionId, editable=False
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="sitereportevent",
+            index=models.Index(fields=["xid"], name="concordia_s_xid_81b580_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="sitereportevent",
+            index=models.Index(
+                fields=["campaign_id", "xid"], name="concordia_s_campaig_f6e684_idx"
+            ),
+        ),
+    ]
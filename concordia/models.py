@@ -1,5 +1,7 @@
+import json
 import os.path
 import time
+from collections import Counter
 from datetime import date
 from logging import getLogger
 
@@ -7,8 +9,22 @@ from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
-from django.db import models
-from django.db.models import Count, F, JSONField, Q
+from django.db import connection, models, transaction
+from django.db.models import (
+    Count,
+    F,
+    Func,
+    IntegerField,
+    JSONField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    prefetch_related_objects,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save
 from django.urls import reverse
 from django_prometheus_metrics.models import MetricsModelMixin
@@ -76,6 +92,52 @@ class MediaType:
     CHOICES = ((IMAGE, "Image"), (AUDIO, "Audio"), (VIDEO, "Video"))
 
 
+class TrackedFieldsMixin(object):
+    """
+    Remembers the values of tracked_fields as they were loaded from the database
+
+    Signal handlers use this to maintain denormalized data by applying the
+    difference between the loaded and saved values instead of recalculating it.
+    """
+
+    tracked_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        if all(i in loaded for i in cls.tracked_fields):
+            instance._loaded_values = {i: loaded[i] for i in cls.tracked_fields}
+        return instance
+
+    def get_loaded_values(self):
+        """
+        Return the tracked values loaded from the database or None if unknown
+        """
+
+        return getattr(self, "_loaded_values", None)
+
+    def lock_loaded_values(self):
+        """
+        Reload the tracked values from the database and lock the row until the
+        current transaction ends
+        """
+
+        self._loaded_values = (
+            type(self)
+            ._default_manager.select_for_update()
+            .filter(pk=self.pk)
+            .values(*self.tracked_fields)
+            .first()
+        )
+
+    def get_tracked_values(self):
+        return {i: getattr(self, i) for i in self.tracked_fields}
+
+    def reset_loaded_values(self):
+        self._loaded_values = self.get_tracked_values()
+
+
 class PublicationQuerySet(models.QuerySet):
     def published(self):
         return self.filter(published=True)
@@ -86,32 +148,13 @@ class PublicationQuerySet(models.QuerySet):
 
 class UnlistedPublicationQuerySet(PublicationQuerySet):
     def annotated(self):
+        scope_type = self.model._meta.model_name
         return (
-            self.annotate(
-                asset_count=Count(
-                    "project__item__asset",
-                    filter=Q(
-                        project__published=True,
-                        project__item__published=True,
-                        project__item__asset__published=True,
-                    ),
-                )
-            )
-            .filter(asset_count__gt=0)
+            TranscriptionStatusCount.objects.annotate_counts(self, scope_type)
             .annotate(
-                **{
-                    v: Count(
-                        "project__item__asset",
-                        filter=Q(
-                            project__published=True,
-                            project__item__published=True,
-                            project__item__asset__published=True,
-                            project__item__asset__transcription_status=k,
-                        ),
-                    )
-                    for k, v in STATUS_COUNT_KEYS.items()
-                }
+                asset_count=sum((F(i) for i in STATUS_COUNT_KEYS.values()), Value(0))
             )
+            .filter(asset_count__gt=0)
             .annotate(needs_review_count=F("in_progress_count") + F("submitted_count"))
             .annotate(
                 completed_percent=100 * F("completed_count") / F("asset_count"),
@@ -264,8 +307,9 @@ class ResourceFile(models.Model):
         super().delete(*args, **kwargs)
 
 
-class Project(MetricsModelMixin("project"), models.Model):
+class Project(MetricsModelMixin("project"), TrackedFieldsMixin, models.Model):
     objects = PublicationQuerySet.as_manager()
+    tracked_fields = ("campaign_id", "published")
 
     campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE)
 
@@ -299,8 +343,9 @@ class Project(MetricsModelMixin("project"), models.Model):
         )
 
 
-class Item(MetricsModelMixin("item"), models.Model):
+class Item(MetricsModelMixin("item"), TrackedFieldsMixin, models.Model):
     objects = PublicationQuerySet.as_manager()
+    tracked_fields = ("project_id", "published")
 
     project = models.ForeignKey(Project, on_delete=models.CASCADE)
 
@@ -339,6 +384,41 @@ class Item(MetricsModelMixin("item"), models.Model):
 
 
 class AssetQuerySet(PublicationQuerySet):
+    #: Sets the difficulty to the number of transcriptions multiplied by the
+    #: number of distinct transcribers and reviewers, which must be kept
+    #: consistent with add_contribution_counts()
+    UPDATE_DIFFICULTY_SQL = """
+        UPDATE concordia_asset a
+        SET difficulty = c.difficulty
+        FROM (
+            SELECT a.id AS asset_id,
+                COUNT(DISTINCT t.id) * (
+                    COUNT(DISTINCT t.user_id) + COUNT(DISTINCT t.reviewed_by_id)
+                ) AS difficulty
+            FROM concordia_asset a
+            LEFT OUTER JOIN concordia_transcription t ON t.asset_id = a.id
+            WHERE a.id IN ({assets})
+            GROUP BY a.id
+        ) c
+        WHERE a.id = c.asset_id AND a.difficulty IS DISTINCT FROM c.difficulty
+    """
+
+    #: Points each asset at its transcription with the highest ID, which must
+    #: be kept consistent with the Transcription signal handlers
+    UPDATE_LATEST_TRANSCRIPTION_SQL = """
+        UPDATE concordia_asset a
+        SET latest_transcription_id = t.latest_transcription_id
+        FROM (
+            SELECT a.id AS asset_id, MAX(t.id) AS latest_transcription_id
+            FROM concordia_asset a
+            LEFT OUTER JOIN concordia_transcription t ON t.asset_id = a.id
+            WHERE a.id IN ({assets})
+            GROUP BY a.id
+        ) t
+        WHERE a.id = t.asset_id
+            AND a.latest_transcription_id IS DISTINCT FROM t.latest_transcription_id
+    """
+
     def add_contribution_counts(self):
         """Add annotations for the number of transcriptions & users"""
 
@@ -348,9 +428,39 @@ class AssetQuerySet(PublicationQuerySet):
             reviewer_count=Count("transcription__reviewed_by", distinct=True),
         )
 
+    def update_difficulty_values(self):
+        """
+        Recalculate the difficulty for the assets in this queryset using a
+        single UPDATE statement, returning the number of changed assets
+        """
+
+        asset_sql, asset_params = self.order_by().values("pk").query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.UPDATE_DIFFICULTY_SQL.format(assets=asset_sql), asset_params
+            )
+            return cursor.rowcount
+
+    def update_latest_transcriptions(self):
+        """
+        Point the assets in this queryset at their most recent transcription
+        using a single UPDATE statement, returning the number of changed assets
+        """
+
+        asset_sql, asset_params = self.order_by().values("pk").query.sql_with_params()
 
-class Asset(MetricsModelMixin("asset"), models.Model):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.UPDATE_LATEST_TRANSCRIPTION_SQL.format(assets=asset_sql),
+                asset_params,
+            )
+            return cursor.rowcount
+
+
+class Asset(MetricsModelMixin("asset"), TrackedFieldsMixin, models.Model):
     objects = AssetQuerySet.as_manager()
+    tracked_fields = ("item_id", "published", "transcription_status")
 
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
 
@@ -388,6 +498,17 @@ class Asset(MetricsModelMixin("asset"), models.Model):
 
     difficulty = models.PositiveIntegerField(default=0, blank=True, null=True)
 
+    # This is maintained by the Transcription signal handlers so the most
+    # recent transcription can be joined rather than found with a subquery:
+    latest_transcription = models.ForeignKey(
+        "Transcription",
+        on_delete=models.SET_NULL,
+        editable=False,
+        blank=True,
+        null=True,
+        related_name="+",
+    )
+
     class Meta:
         unique_together = (("slug", "item"),)
         indexes = [
@@ -398,6 +519,16 @@ class Asset(MetricsModelMixin("asset"), models.Model):
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # The signal handlers apply the difference between the stored and the
+        # new tracked values to the status counters. Using the stored values
+        # under a row lock rather than the ones loaded earlier stops concurrent
+        # saves from both subtracting the same old status:
+        with transaction.atomic(savepoint=False):
+            if not self._state.adding:
+                self.lock_loaded_values()
+            super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse(
             "transcriptions:asset-detail",
@@ -409,9 +540,6 @@ class Asset(MetricsModelMixin("asset"), models.Model):
             },
         )
 
-    def latest_transcription(self):
-        return self.transcription_set.order_by("-pk").first()
-
     def get_storage_path(self, filename):
         s3_relative_path = "/".join(
             [
@@ -430,7 +558,7 @@ class Asset(MetricsModelMixin("asset"), models.Model):
 
 class Tag(MetricsModelMixin("tag"), models.Model):
     TAG_VALIDATOR = RegexValidator(r"^[- _À-ž'\w]{1,50}$")
-    value = models.CharField(max_length=50, validators=[TAG_VALIDATOR])
+    value = models.CharField(max_length=50, unique=True, validators=[TAG_VALIDATOR])
 
     def __str__(self):
         return self.value
@@ -490,6 +618,25 @@ class Transcription(MetricsModelMixin("transcription"), models.Model):
     class Meta:
         indexes = [
             models.Index(fields=["asset", "user"]),
+            # Used to find the assets with recent changes:
+            models.Index(fields=["updated_on"]),
+        ]
+        constraints = [
+            # Each asset has a single chain of transcriptions with one head and
+            # each transcription can only be superseded once:
+            models.UniqueConstraint(
+                fields=["asset"],
+                condition=models.Q(supersedes=None),
+                name="unique_open_transcription_per_asset",
+            ),
+            models.UniqueConstraint(
+                fields=["supersedes"], name="unique_transcription_supersedes"
+            ),
+            # Referenced by the transcription_supersedes_same_asset foreign key
+            # which is created in migration 0086 since Django cannot express it:
+            models.UniqueConstraint(
+                fields=["id", "asset"], name="unique_transcription_asset"
+            ),
         ]
 
     def __str__(self):
@@ -517,29 +664,57 @@ class Transcription(MetricsModelMixin("transcription"), models.Model):
             return TranscriptionStatus.CHOICE_MAP[TranscriptionStatus.IN_PROGRESS]
 
 
+class TranscriptionTextDelta(models.Model):
+    """
+    The compressed text of a superseded transcription
+
+    The delta recreates the transcription's text from the text of the
+    transcription which superseded it and replaces the stored text once the
+    history has been compacted. See concordia.transcription_history.
+    """
+
+    transcription = models.OneToOneField(
+        Transcription,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="text_delta",
+    )
+    delta = models.BinaryField()
+    created_on = models.DateTimeField(auto_now_add=True)
+
+
+class AssetTranscriber(models.Model):
+    """
+    Records each user who has transcribed an asset
+
+    This is maintained when transcriptions are created so the review queue can
+    exclude a reviewer's own work without joining the transcription history.
+    """
+
+    asset = models.ForeignKey(Asset, on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "asset"], name="unique_asset_transcriber"
+            )
+        ]
+
+
 def on_transcription_save(sender, instance, **kwargs):
+    # The counts are buffered and applied by flush_user_profile_activity so
+    # active users don't contend for their UserProfileActivity rows:
     if kwargs["created"]:
-        user_profile_activity, created = UserProfileActivity.objects.get_or_create(
-            user=instance.user,
-            campaign=instance.asset.item.project.campaign,
+        UserProfileActivityDelta.objects.record(
+            instance.user_id, instance.asset_id, transcribe_count=1
         )
-        if created:
-            user_profile_activity.transcribe_count = 1
-        else:
-            user_profile_activity.transcribe_count = F("transcribe_count") + 1
-        user_profile_activity.save()
     elif instance.reviewed_by:
         reviewed = instance.accepted or instance.rejected
         if reviewed.date() == date.today():
-            user_profile_activity, created = UserProfileActivity.objects.get_or_create(
-                user=instance.reviewed_by,
-                campaign=instance.asset.item.project.campaign,
+            UserProfileActivityDelta.objects.record(
+                instance.reviewed_by_id, instance.asset_id, review_count=1
             )
-            if created:
-                user_profile_activity.review_count = 1
-            else:
-                user_profile_activity.review_count = F("review_count") + 1
-            user_profile_activity.save()
 
 
 post_save.connect(on_transcription_save, sender=Transcription)
@@ -556,6 +731,508 @@ class AssetTranscriptionReservation(models.Model):
     created_on = models.DateTimeField(editable=False, auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
     tombstoned = models.BooleanField(default=False, blank=True, null=True)
+    review = models.BooleanField(
+        default=False,
+        help_text=(
+            "Review reservations expire after REVIEW_RESERVATION_SECONDS and may"
+            " be taken over once they have expired"
+        ),
+    )
+
+    class Meta:
+        constraints = [
+            # Only one active reservation may exist for an asset. Tombstoned
+            # reservations are kept alongside the current one:
+            models.UniqueConstraint(
+                fields=["asset"],
+                condition=Q(tombstoned=False),
+                name="unique_active_asset_reservation",
+            )
+        ]
+
+
+class TranscriptionStatusCountQuerySet(models.QuerySet):
+    #: Applies the difference between an asset's old and new state to the item,
+    #: project and campaign counters. Only assets which are visible, i.e.
+    #: published in a published item and project, are counted.
+    APPLY_CHANGES_SQL = """
+        WITH changes (item_id, published, status, delta) AS (
+            VALUES {values}
+        ), visible AS (
+            SELECT c.status, c.delta, i.id AS item_id, p.id AS project_id,
+                p.campaign_id
+            FROM changes c
+            INNER JOIN concordia_item i ON i.id = c.item_id
+            INNER JOIN concordia_project p ON p.id = i.project_id
+            WHERE c.published AND i.published AND p.published
+        )
+        INSERT INTO concordia_transcriptionstatuscount
+            (scope_type, scope_id, status, count)
+        SELECT s.scope_type, s.scope_id, v.status, SUM(v.delta)
+        FROM visible v
+        CROSS JOIN LATERAL (
+            VALUES ('item', v.item_id), ('project', v.project_id),
+                ('campaign', v.campaign_id)
+        ) AS s (scope_type, scope_id)
+        GROUP BY s.scope_type, s.scope_id, v.status
+        ON CONFLICT (scope_type, scope_id, status) DO UPDATE
+            SET count = concordia_transcriptionstatuscount.count + EXCLUDED.count
+    """
+
+    #: Recalculates every counter for the campaigns matched by the scope clause
+    REBUILD_SQL = """
+        WITH counts AS (
+            SELECT s.scope_type, s.scope_id, a.transcription_status AS status,
+                COUNT(*) AS count
+            FROM concordia_asset a
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            INNER JOIN concordia_project p ON p.id = i.project_id
+            CROSS JOIN LATERAL (
+                VALUES ('item', i.id), ('project', p.id), ('campaign', p.campaign_id)
+            ) AS s (scope_type, scope_id)
+            WHERE a.published AND i.published AND p.published AND {scope}
+            GROUP BY s.scope_type, s.scope_id, a.transcription_status
+        ), stale AS (
+            DELETE FROM concordia_transcriptionstatuscount c
+            WHERE (
+                (c.scope_type = 'campaign' AND c.scope_id IN (
+                    SELECT p.campaign_id FROM concordia_project p WHERE {scope}
+                ))
+                OR (c.scope_type = 'project' AND c.scope_id IN (
+                    SELECT p.id FROM concordia_project p WHERE {scope}
+                ))
+                OR (c.scope_type = 'item' AND c.scope_id IN (
+                    SELECT i.id
+                    FROM concordia_item i
+                    INNER JOIN concordia_project p ON p.id = i.project_id
+                    WHERE {scope}
+                ))
+                OR {scope_is_everything}
+            ) AND NOT EXISTS (
+                SELECT 1 FROM counts
+                WHERE counts.scope_type = c.scope_type
+                    AND counts.scope_id = c.scope_id
+                    AND counts.status = c.status
+            )
+        )
+        INSERT INTO concordia_transcriptionstatuscount
+            (scope_type, scope_id, status, count)
+        SELECT scope_type, scope_id, status, count FROM counts
+        ON CONFLICT (scope_type, scope_id, status) DO UPDATE
+            SET count = EXCLUDED.count
+    """
+
+    def apply_asset_change(self, old_values, new_values):
+        """
+        Update the counters for an asset which changed from old to new values
+
+        Each argument is a dictionary of the Asset tracked_fields or None for a
+        newly created or deleted asset.
+        """
+
+        self.apply_asset_changes([(old_values, new_values)])
+
+    def apply_asset_changes(self, changes):
+        """
+        Update the counters for a list of (old values, new values) pairs as used
+        by apply_asset_change in a single statement
+        """
+
+        values = []
+        params = []
+        for old_values, new_values in changes:
+            for asset_values, delta in ((old_values, -1), (new_values, 1)):
+                if asset_values is not None:
+                    values.append("(%s, %s, %s, %s)")
+                    params.extend(
+                        [
+                            asset_values["item_id"],
+                            asset_values["published"],
+                            asset_values["transcription_status"],
+                            delta,
+                        ]
+                    )
+
+        if not values:
+            return
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.APPLY_CHANGES_SQL.format(values=", ".join(values)), params
+            )
+
+    def rebuild(self, *, campaign_ids=None):
+        """
+        Recalculate the counters for the specified campaigns, or all of them
+        """
+
+        if campaign_ids is None:
+            scope, scope_is_everything, params = "TRUE", "TRUE", []
+        else:
+            scope, scope_is_everything = "p.campaign_id = ANY(%s)", "FALSE"
+            params = [list(campaign_ids)] * 4
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.REBUILD_SQL.format(
+                    scope=scope, scope_is_everything=scope_is_everything
+                ),
+                params,
+            )
+
+    def get_counts(self, scope_type, scope_ids):
+        """
+        Return a dictionary of {scope_id: {status: count}} for the given scopes
+
+        Topics are not stored and are calculated from their published projects.
+        """
+
+        scope_ids = list(scope_ids)
+        counts = {
+            i: dict.fromkeys(TranscriptionStatus.CHOICE_MAP, 0) for i in scope_ids
+        }
+
+        if scope_type == "topic":
+            project_topics = Project.topics.through.objects.filter(
+                topic__in=scope_ids, project__published=True
+            ).values_list("project_id", "topic_id")
+            topics_by_project = {}
+            for project_id, topic_id in project_topics:
+                topics_by_project.setdefault(project_id, []).append(topic_id)
+
+            rows = self.filter(
+                scope_type="project", scope_id__in=topics_by_project.keys()
+            ).values_list("scope_id", "status", "count")
+            for project_id, status, count in rows:
+                for topic_id in topics_by_project[project_id]:
+                    counts[topic_id][status] += count
+        else:
+            rows = self.filter(
+                scope_type=scope_type, scope_id__in=scope_ids
+            ).values_list("scope_id", "status", "count")
+            for scope_id, status, count in rows:
+                counts[scope_id][status] = count
+
+        return counts
+
+    def annotate_counts(self, queryset, scope_type):
+        """
+        Annotate a queryset of the given scope with the STATUS_COUNT_KEYS values
+        """
+
+        if scope_type == "topic":
+            scope_filter = {
+                "scope_type": "project",
+                "scope_id__in": Project.objects.published()
+                .filter(topics=OuterRef(OuterRef("pk")))
+                .values("pk"),
+            }
+        else:
+            scope_filter = {"scope_type": scope_type, "scope_id": OuterRef("pk")}
+
+        return queryset.annotate(
+            **{
+                count_key: Coalesce(
+                    Subquery(
+                        self.filter(status=status, **scope_filter)
+                        .order_by()
+                        .values("status")
+                        .annotate(total=Sum("count"))
+                        .values("total"),
+                        output_field=IntegerField(),
+                    ),
+                    0,
+                )
+                for status, count_key in STATUS_COUNT_KEYS.items()
+            }
+        )
+
+
+class TranscriptionStatusCount(models.Model):
+    """
+    Number of visible assets with each transcription status in a campaign,
+    project or item
+
+    These are maintained by signal handlers as assets change and may be rebuilt
+    using the rebuild_transcription_status_counts management command.
+    """
+
+    SCOPE_TYPES = ("campaign", "project", "item")
+
+    objects = TranscriptionStatusCountQuerySet.as_manager()
+
+    scope_type = models.CharField(
+        max_length=10, choices=[(i, i.title()) for i in SCOPE_TYPES]
+    )
+    scope_id = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=TranscriptionStatus.CHOICES)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope_type", "scope_id", "status"],
+                name="unique_transcription_status_count",
+            )
+        ]
+
+
+class ScopeContributorQuerySet(models.QuerySet):
+    #: Records users as contributors to an asset's item, project and campaign
+    ADD_CONTRIBUTORS_SQL = """
+        INSERT INTO concordia_scopecontributor (scope_type, scope_id, user_id)
+        SELECT s.scope_type, s.scope_id, u.user_id
+        FROM concordia_asset a
+        INNER JOIN concordia_item i ON i.id = a.item_id
+        INNER JOIN concordia_project p ON p.id = i.project_id
+        CROSS JOIN LATERAL (
+            VALUES ('item', i.id), ('project', p.id), ('campaign', p.campaign_id)
+        ) AS s (scope_type, scope_id)
+        CROSS JOIN unnest(%(user_ids)s) AS u (user_id)
+        WHERE a.id = %(asset_id)s
+        ON CONFLICT DO NOTHING
+    """
+
+    #: Recalculates the contributors for the campaigns matched by the scope
+    #: clause from the transcription history
+    REBUILD_SQL = """
+        INSERT INTO concordia_scopecontributor (scope_type, scope_id, user_id)
+        SELECT DISTINCT s.scope_type, s.scope_id, u.user_id
+        FROM concordia_transcription t
+        INNER JOIN concordia_asset a ON a.id = t.asset_id
+        INNER JOIN concordia_item i ON i.id = a.item_id
+        INNER JOIN concordia_project p ON p.id = i.project_id
+        CROSS JOIN LATERAL (
+            VALUES ('item', i.id), ('project', p.id), ('campaign', p.campaign_id)
+        ) AS s (scope_type, scope_id)
+        CROSS JOIN LATERAL (
+            VALUES (t.user_id), (t.reviewed_by_id)
+        ) AS u (user_id)
+        WHERE u.user_id IS NOT NULL AND {scope}
+        ON CONFLICT DO NOTHING
+    """
+
+    def add_contributors(self, asset_id, user_ids):
+        user_ids = [i for i in user_ids if i is not None]
+        if user_ids:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    self.ADD_CONTRIBUTORS_SQL,
+                    {"asset_id": asset_id, "user_ids": user_ids},
+                )
+
+    @transaction.atomic
+    def rebuild(self, *, campaign_ids=None):
+        """
+        Recalculate the contributors for the specified campaigns, or all of them
+        """
+
+        if campaign_ids is None:
+            self.all().delete()
+            scope, params = "TRUE", []
+        else:
+            campaign_ids = list(campaign_ids)
+            self.filter(
+                Q(scope_type="campaign", scope_id__in=campaign_ids)
+                | Q(
+                    scope_type="project",
+                    scope_id__in=Project.objects.filter(
+                        campaign__in=campaign_ids
+                    ).values("pk"),
+                )
+                | Q(
+                    scope_type="item",
+                    scope_id__in=Item.objects.filter(
+                        project__campaign__in=campaign_ids
+                    ).values("pk"),
+                )
+            ).delete()
+            scope, params = "p.campaign_id = ANY(%s)", [campaign_ids]
+
+        with connection.cursor() as cursor:
+            cursor.execute(self.REBUILD_SQL.format(scope=scope), params)
+
+    def get_count(self, scope_type, scope_id):
+        """
+        Return the number of distinct contributors to a scope
+
+        Topics are not stored and are calculated from their published projects.
+        """
+
+        if scope_type == "topic":
+            return (
+                self.filter(
+                    scope_type="project",
+                    scope_id__in=Project.objects.published()
+                    .filter(topics=scope_id)
+                    .values("pk"),
+                )
+                .values("user")
+                .distinct()
+                .count()
+            )
+        else:
+            return self.filter(scope_type=scope_type, scope_id=scope_id).count()
+
+
+class ScopeContributor(models.Model):
+    """
+    Records each user who has transcribed or reviewed an asset in a campaign,
+    project or item
+
+    These are added as transcriptions are created and reviewed so contributor
+    counts do not require scanning the transcription history.
+    """
+
+    objects = ScopeContributorQuerySet.as_manager()
+
+    scope_type = models.CharField(
+        max_length=10,
+        choices=[(i, i.title()) for i in TranscriptionStatusCount.SCOPE_TYPES],
+    )
+    scope_id = models.PositiveIntegerField()
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope_type", "scope_id", "user"],
+                name="unique_scope_contributor",
+            )
+        ]
+
+
+class TranscribableAssetQuerySet(models.QuerySet):
+    #: Rebuilds the queue entries for the assets matched by the scope clause in a
+    #: single statement: eligible assets are inserted or updated and every other
+    #: asset in the scope is removed from the queue
+    REFRESH_SQL = """
+        WITH eligible AS (
+            SELECT a.id AS asset_id, p.campaign_id, i.project_id, a.item_id,
+                a.transcription_status = %(not_started)s AS unstarted, a.sequence
+            FROM concordia_asset a
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            INNER JOIN concordia_project p ON p.id = i.project_id
+            WHERE {scope}
+                AND a.published AND i.published AND p.published
+                AND a.transcription_status IN %(transcribable)s
+        ), removed AS (
+            DELETE FROM concordia_transcribableasset q
+            USING concordia_asset a
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            WHERE q.asset_id = a.id
+                AND {scope}
+                AND q.asset_id NOT IN (SELECT asset_id FROM eligible)
+        )
+        INSERT INTO concordia_transcribableasset
+            (asset_id, campaign_id, project_id, item_id, unstarted, sequence)
+        SELECT asset_id, campaign_id, project_id, item_id, unstarted, sequence
+        FROM eligible
+        ON CONFLICT (asset_id) DO UPDATE SET
+            campaign_id = EXCLUDED.campaign_id,
+            project_id = EXCLUDED.project_id,
+            item_id = EXCLUDED.item_id,
+            unstarted = EXCLUDED.unstarted,
+            sequence = EXCLUDED.sequence
+    """
+
+    def refresh(self, *, asset_ids=None, item_ids=None, project_ids=None):
+        """
+        Update the queue for the specified assets, items or projects
+
+        If no scope is specified the entire queue will be rebuilt.
+        """
+
+        params = {
+            "not_started": TranscriptionStatus.NOT_STARTED,
+            "transcribable": (
+                TranscriptionStatus.NOT_STARTED,
+                TranscriptionStatus.IN_PROGRESS,
+            ),
+        }
+
+        if asset_ids is not None:
+            scope = "a.id = ANY(%(ids)s)"
+            params["ids"] = list(asset_ids)
+        elif item_ids is not None:
+            scope = "a.item_id = ANY(%(ids)s)"
+            params["ids"] = list(item_ids)
+        elif project_ids is not None:
+            scope = "i.project_id = ANY(%(ids)s)"
+            params["ids"] = list(project_ids)
+        else:
+            scope = "TRUE"
+
+        with connection.cursor() as cursor:
+            cursor.execute(self.REFRESH_SQL.format(scope=scope), params)
+
+    #: Probes each campaign in order using the (campaign, unstarted, sequence)
+    #: index and stops at the first one which has a matching entry, so locking
+    #: entries in the probe only locks the single row which was found
+    FIRST_CAMPAIGN_SQL = """
+        SELECT c.id
+        FROM ({campaigns}) c
+        CROSS JOIN LATERAL ({entries}) q
+        ORDER BY c.ordering, c.id
+        LIMIT 1
+    """
+
+    def first_campaign_id(self, campaigns):
+        """
+        Return the ID of the first of the campaigns, by ordering, which has an
+        entry in this queryset, or None
+        """
+
+        campaign_sql, campaign_params = (
+            campaigns.order_by("ordering", "pk")
+            .values("pk", "ordering")
+            .query.sql_with_params()
+        )
+        entry_sql, entry_params = (
+            self.order_by()
+            .filter(campaign=RawSQL("c.id", ()))
+            .values("pk")[:1]
+            .query.sql_with_params()
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.FIRST_CAMPAIGN_SQL.format(
+                    campaigns=campaign_sql, entries=entry_sql
+                ),
+                (*campaign_params, *entry_params),
+            )
+            row = cursor.fetchone()
+
+        return row[0] if row else None
+
+
+class TranscribableAsset(models.Model):
+    """
+    Work queue of the assets which the find-next-page views may select
+
+    Each published asset which has not been submitted for review has an entry
+    with the denormalized hierarchy so the next asset can be found using an
+    indexed probe rather than sorting every asset in a campaign. The entries are
+    maintained by signal handlers and may be rebuilt using the
+    rebuild_transcribable_assets management command.
+    """
+
+    objects = TranscribableAssetQuerySet.as_manager()
+
+    asset = models.OneToOneField(Asset, on_delete=models.CASCADE, primary_key=True)
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    item = models.ForeignKey(Item, on_delete=models.CASCADE)
+    unstarted = models.BooleanField()
+    sequence = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["item", "unstarted", "sequence"]),
+            models.Index(fields=["project", "unstarted", "sequence"]),
+            models.Index(fields=["campaign", "unstarted", "sequence"]),
+        ]
 
 
 class SimpleContentBlock(models.Model):
@@ -681,9 +1358,34 @@ class SiteReport(models.Model):
     users_registered = models.IntegerField(blank=True, null=True)
     users_activated = models.IntegerField(blank=True, null=True)
     registered_contributors = models.IntegerField(blank=True, null=True)
+    #: Identifies the reports generated by the same run of the site_report task
+    report_run = models.UUIDField(blank=True, null=True, editable=False)
+    #: The database snapshot which the report was calculated from, used to find
+    #: the SiteReportEvents committed after it
+    event_snapshot = models.TextField(blank=True, null=True, editable=False)
+
+    #: The field counting assets with each transcription status
+    ASSET_STATUS_FIELDS = {
+        TranscriptionStatus.NOT_STARTED: "assets_not_started",
+        TranscriptionStatus.IN_PROGRESS: "assets_in_progress",
+        TranscriptionStatus.SUBMITTED: "assets_waiting_review",
+        TranscriptionStatus.COMPLETED: "assets_completed",
+    }
 
     class Meta:
         ordering = ("-created_on",)
+        constraints = [
+            models.UniqueConstraint(
+                fields=["report_run", "campaign"],
+                condition=Q(report_run__isnull=False, campaign__isnull=False),
+                name="unique_campaign_report_per_run",
+            ),
+            models.UniqueConstraint(
+                fields=["report_run", "topic"],
+                condition=Q(report_run__isnull=False, topic__isnull=False),
+                name="unique_topic_report_per_run",
+            ),
+        ]
 
     # We have several places where these are exported as CSV/Excel. By default
     # the ORM will be told to retrieve these fields & lookups:
@@ -713,6 +1415,242 @@ class SiteReport(models.Model):
     ]
 
 
+class CurrentTransactionId(Func):
+    """
+    The ID of the database transaction which writes the row
+    """
+
+    template = "pg_current_xact_id()::text::bigint"
+    output_field = models.BigIntegerField()
+
+
+class SiteReportEventQuerySet(models.QuerySet):
+    #: Records an event for the project containing the scope
+    RECORD_SQL = """
+        INSERT INTO concordia_sitereportevent
+            (created_on, xid, event_type, campaign_id, project_id, deltas)
+        SELECT statement_timestamp(), pg_current_xact_id()::text::bigint,
+            %(event_type)s, p.campaign_id, p.id, %(deltas)s::jsonb
+        FROM concordia_project p
+        WHERE p.id = ({project_id})
+    """
+
+    #: Records recalculation events when projects are added to or removed from
+    #: topics
+    RECORD_TOPIC_CHANGES_SQL = """
+        INSERT INTO concordia_sitereportevent
+            (created_on, xid, event_type, campaign_id, project_id, topic_id, deltas)
+        SELECT statement_timestamp(), pg_current_xact_id()::text::bigint,
+            %(event_type)s, p.campaign_id, p.id, t.topic_id, '{}'::jsonb
+        FROM concordia_project p
+        CROSS JOIN unnest(%(topic_ids)s) AS t (topic_id)
+        WHERE p.id = ANY(%(project_ids)s)
+    """
+
+    #: Deletes the events which are visible in the snapshots of a report run and
+    #: of every report saved since it started. Transactions older than a
+    #: snapshot's xmin are visible in it.
+    DELETE_REPORTED_SQL = """
+        DELETE FROM concordia_sitereportevent
+        WHERE xid < (
+            SELECT MIN(pg_snapshot_xmin(event_snapshot::pg_snapshot)::text::bigint)
+            FROM concordia_sitereport
+            WHERE created_on >= (
+                SELECT MIN(created_on)
+                FROM concordia_sitereport
+                WHERE report_run = %(report_run)s
+            )
+        )
+    """
+
+    PROJECT_ID_QUERIES = {
+        "asset_id": """
+            SELECT i.project_id
+            FROM concordia_asset a
+            INNER JOIN concordia_item i ON i.id = a.item_id
+            WHERE a.id = %(scope_id)s
+        """,
+        "item_id": "SELECT project_id FROM concordia_item WHERE id = %(scope_id)s",
+        "project_id": "%(scope_id)s",
+    }
+
+    def record(self, event_type, deltas, **scope):
+        """
+        Record an event for the project containing the scope, which must be
+        provided as exactly one of the asset_id, item_id or project_id keywords
+        """
+
+        ((scope_field, scope_id),) = scope.items()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.RECORD_SQL.format(project_id=self.PROJECT_ID_QUERIES[scope_field]),
+                {
+                    "event_type": event_type,
+                    "deltas": json.dumps(deltas),
+                    "scope_id": scope_id,
+                },
+            )
+
+    def record_asset_change(self, old_values, new_values):
+        """
+        Record the changes to the asset counts for an asset which changed from
+        old to new values
+
+        Each argument is a dictionary of the Asset tracked_fields or None for a
+        newly created or deleted asset.
+        """
+
+        self.record_asset_changes([(old_values, new_values)])
+
+    def record_asset_changes(self, changes):
+        """
+        Record the changes to the asset counts for a list of (old values, new
+        values) pairs as used by record_asset_change, with one event per item
+        """
+
+        deltas_by_item = {}
+        for old_values, new_values in changes:
+            for asset_values, delta in ((old_values, -1), (new_values, 1)):
+                if asset_values is None:
+                    continue
+                published = "published" if asset_values["published"] else "unpublished"
+                status = asset_values["transcription_status"]
+                deltas_by_item.setdefault(asset_values["item_id"], Counter()).update(
+                    {
+                        "assets_total": delta,
+                        f"assets_{published}": delta,
+                        SiteReport.ASSET_STATUS_FIELDS[status]: delta,
+                    }
+                )
+
+        for item_id, deltas in deltas_by_item.items():
+            deltas = {field: delta for field, delta in deltas.items() if delta}
+            if deltas:
+                self.record(SiteReportEvent.EventType.ASSET, deltas, item_id=item_id)
+
+    def record_container_change(self, instance, old_values, new_values):
+        """
+        Record a change to an Item or Project's publication or parent
+
+        old_values and new_values are the tracked fields, or None when the
+        instance was created or deleted. Moving an item or project to a new
+        parent changes more than we can express as deltas so both parents are
+        marked for recalculation instead.
+        """
+
+        if isinstance(instance, Item):
+            event_type, parent_field = SiteReportEvent.EventType.ITEM, "project_id"
+        else:
+            event_type, parent_field = SiteReportEvent.EventType.PROJECT, "campaign_id"
+
+        def record(event_type, deltas, values):
+            if parent_field == "project_id":
+                self.record(event_type, deltas, project_id=values["project_id"])
+            else:
+                # Deleted projects are no longer available to look up:
+                self.create(
+                    event_type=event_type,
+                    campaign_id=values["campaign_id"],
+                    project_id=instance.pk,
+                    deltas=deltas,
+                )
+
+        if (
+            old_values is not None
+            and new_values is not None
+            and old_values[parent_field] != new_values[parent_field]
+        ):
+            for values in (old_values, new_values):
+                record(SiteReportEvent.EventType.RECALCULATE, {}, values)
+            return
+
+        prefix = f"{event_type}s"
+        for values, delta in ((old_values, -1), (new_values, 1)):
+            if values is not None:
+                published = "published" if values["published"] else "unpublished"
+                record(event_type, {f"{prefix}_{published}": delta}, values)
+
+    def record_topic_changes(self, project_ids, topic_ids):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.RECORD_TOPIC_CHANGES_SQL,
+                {
+                    "event_type": SiteReportEvent.EventType.RECALCULATE,
+                    "project_ids": list(project_ids),
+                    "topic_ids": list(topic_ids),
+                },
+            )
+
+    def delete_reported(self, report_run):
+        """
+        Delete the events which are included in every report from the report
+        run and return how many were deleted
+
+        Every scope has a report from a completed run, so the incremental
+        reports will not need those events again.
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(self.DELETE_REPORTED_SQL, {"report_run": report_run})
+            return cursor.rowcount
+
+
+class SiteReportEvent(models.Model):
+    """
+    Append-only log of the changes which affect SiteReport statistics
+
+    Each event stores the change to the report counts for the project where it
+    happened so incremental reports can be produced by adding the events which
+    had not been committed in the snapshot of the previous report for each
+    scope. Recalculation events mark the campaign and topics of a project whose
+    contents changed in a way which cannot be expressed as deltas, such as an
+    item moving to another project.
+    """
+
+    class EventType(models.TextChoices):
+        ASSET = "asset"
+        ITEM = "item"
+        PROJECT = "project"
+        TRANSCRIPTION = "transcription"
+        TAG = "tag"
+        RECALCULATE = "recalculate"
+
+    #: The SiteReport fields which are maintained using event deltas
+    DELTA_FIELDS = (
+        "assets_total",
+        "assets_published",
+        "assets_unpublished",
+        *SiteReport.ASSET_STATUS_FIELDS.values(),
+        "items_published",
+        "items_unpublished",
+        "projects_published",
+        "projects_unpublished",
+        "transcriptions_saved",
+        "anonymous_transcriptions",
+        "tag_uses",
+    )
+
+    objects = SiteReportEventQuerySet.as_manager()
+
+    created_on = models.DateTimeField(editable=False, auto_now_add=True)
+    #: The transaction which recorded the event, checked against the
+    #: SiteReport.event_snapshot of each report
+    xid = models.BigIntegerField(default=CurrentTransactionId, editable=False)
+    event_type = models.CharField(max_length=20, choices=EventType.choices)
+    # These are not foreign keys because events outlive deleted content:
+    campaign_id = models.PositiveIntegerField()
+    project_id = models.PositiveIntegerField()
+    topic_id = models.PositiveIntegerField(blank=True, null=True)
+    deltas = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["xid"]),
+            models.Index(fields=["campaign_id", "xid"]),
+        ]
+
+
 class UserRetiredCampaign(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="User Id")
     campaign = models.ForeignKey(
@@ -742,7 +1680,45 @@ class UserRetiredCampaign(models.Model):
         return self.transcribe_count + self.review_count
 
 
+class UserProfileActivityQuerySet(models.QuerySet):
+    #: Combines the flushed counts with the pending deltas in one statement so
+    #: a concurrent flush can't cause deltas to be counted twice or missed
+    USER_ACTIVITY_SQL = """
+        SELECT MIN(a.id) AS id, %(user_id)s AS user_id, a.campaign_id,
+            MAX(a.asset_count) AS asset_count,
+            MAX(a.asset_tag_count) AS asset_tag_count,
+            SUM(a.transcribe_count) AS transcribe_count,
+            SUM(a.review_count) AS review_count
+        FROM (
+            SELECT id, campaign_id, asset_count, asset_tag_count,
+                COALESCE(transcribe_count, 0) AS transcribe_count,
+                COALESCE(review_count, 0) AS review_count
+            FROM concordia_userprofileactivity
+            WHERE user_id = %(user_id)s
+            UNION ALL
+            SELECT NULL, campaign_id, NULL, NULL, transcribe_count, review_count
+            FROM concordia_userprofileactivitydelta
+            WHERE user_id = %(user_id)s
+        ) a
+        INNER JOIN concordia_campaign c ON c.id = a.campaign_id
+        GROUP BY a.campaign_id, c.title
+        ORDER BY c.title
+    """
+
+    def for_user(self, user):
+        """
+        Return the user's activity for each campaign, ordered by campaign title,
+        including changes which have not been flushed yet
+        """
+
+        activity = list(self.raw(self.USER_ACTIVITY_SQL, {"user_id": user.pk}))
+        prefetch_related_objects(activity, "campaign")
+        return activity
+
+
 class UserProfileActivity(models.Model):
+    objects = UserProfileActivityQuerySet.as_manager()
+
     user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="User Id")
     campaign = models.ForeignKey(
         Campaign, on_delete=models.CASCADE, verbose_name="Campaign Id"
@@ -774,6 +1750,77 @@ class UserProfileActivity(models.Model):
         return self.transcribe_count + self.review_count
 
 
+class UserProfileActivityDeltaQuerySet(models.QuerySet):
+    #: Records a change for the campaign containing the asset
+    RECORD_SQL = """
+        INSERT INTO concordia_userprofileactivitydelta
+            (user_id, campaign_id, transcribe_count, review_count)
+        SELECT %(user_id)s, p.campaign_id, %(transcribe_count)s, %(review_count)s
+        FROM concordia_asset a
+        INNER JOIN concordia_item i ON i.id = a.item_id
+        INNER JOIN concordia_project p ON p.id = i.project_id
+        WHERE a.id = %(asset_id)s
+    """
+
+    #: Moves every pending delta into the UserProfileActivity counts
+    FLUSH_SQL = """
+        WITH deltas AS (
+            DELETE FROM concordia_userprofileactivitydelta
+            RETURNING user_id, campaign_id, transcribe_count, review_count
+        )
+        INSERT INTO concordia_userprofileactivity
+            (user_id, campaign_id, transcribe_count, review_count)
+        SELECT user_id, campaign_id, SUM(transcribe_count), SUM(review_count)
+        FROM deltas
+        GROUP BY user_id, campaign_id
+        ON CONFLICT (user_id, campaign_id) DO UPDATE
+        SET transcribe_count = COALESCE(
+                concordia_userprofileactivity.transcribe_count, 0
+            ) + EXCLUDED.transcribe_count,
+            review_count = COALESCE(
+                concordia_userprofileactivity.review_count, 0
+            ) + EXCLUDED.review_count
+    """
+
+    def record(self, user_id, asset_id, *, transcribe_count=0, review_count=0):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.RECORD_SQL,
+                {
+                    "user_id": user_id,
+                    "asset_id": asset_id,
+                    "transcribe_count": transcribe_count,
+                    "review_count": review_count,
+                },
+            )
+
+    def flush(self):
+        """
+        Apply all of the pending deltas to the UserProfileActivity counts in a
+        single statement, returning the number of rows inserted or updated
+        """
+
+        with connection.cursor() as cursor:
+            cursor.execute(self.FLUSH_SQL)
+            return cursor.rowcount
+
+
+class UserProfileActivityDelta(models.Model):
+    """
+    Records changes to a user's UserProfileActivity counts
+
+    Transcriptions and reviews insert rows here rather than updating the
+    counts directly and flush_user_profile_activity periodically applies them.
+    """
+
+    objects = UserProfileActivityDeltaQuerySet.as_manager()
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    campaign = models.ForeignKey(Campaign, on_delete=models.CASCADE)
+    transcribe_count = models.IntegerField(default=0)
+    review_count = models.IntegerField(default=0)
+
+
 class CampaignRetirementProgress(models.Model):
     campaign = models.OneToOneField(Campaign, on_delete=models.CASCADE)
     project_total = models.IntegerField(default=0)
@@ -0,0 +1,384 @@
+"""
+Storage backends for asset transcription reservations
+
+The backend is selected using the TRANSCRIPTION_RESERVATION_BACKEND setting.
+Every backend implements the same semantics which reserve_asset exposes to
+browsers:
+
+    * a token which already holds the reservation renews it
+    * a token may obtain a reservation if nobody else holds an active one
+    * a token whose reservation has been tombstoned may not reserve the asset
+      again until the tombstone period has ended
+    * review reservations, which find-next-page creates for reviewers, expire
+      after REVIEW_RESERVATION_SECONDS unless renewed as a normal reservation
+"""
+
+from datetime import timedelta
+from functools import lru_cache
+from logging import getLogger
+from time import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Subquery
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from .models import AssetTranscriptionReservation
+from .utils import get_redis_connection
+
+logger = getLogger(__name__)
+
+
+class ReservationStatus(object):
+    """
+    Outcome of an attempt to reserve an asset
+    """
+
+    OBTAINED = "obtained"
+    RENEWED = "renewed"
+    CONFLICT = "conflict"
+    TOMBSTONED = "tombstoned"
+
+    #: Statuses which mean that the caller now holds the reservation:
+    SUCCESSFUL = (OBTAINED, RENEWED)
+
+
+def get_reservation_backend():
+    return _load_reservation_backend(settings.TRANSCRIPTION_RESERVATION_BACKEND)
+
+
+@lru_cache(maxsize=None)
+def _load_reservation_backend(backend_path):
+    return import_string(backend_path)()
+
+
+class BaseReservationBackend(object):
+    def reserve(self, asset_pk, reservation_token, *, review=False):
+        """
+        Create or renew a reservation and return a ReservationStatus value
+
+        A review reservation only lasts for REVIEW_RESERVATION_SECONDS. Renewing
+        a reservation with review=False makes it a normal reservation.
+        """
+
+        raise NotImplementedError
+
+    def release(self, asset_pk, reservation_token):
+        """
+        Remove any reservation held by this token, including tombstones
+        """
+
+        raise NotImplementedError
+
+    def expire(self):
+        """
+        Remove the reservations which have not been renewed in time and return
+        a list of (asset_pk, reservation_token) pairs for them
+        """
+
+        raise NotImplementedError
+
+    def exclude_reserved(self, queryset, field="pk"):
+        """
+        Filter the provided queryset to remove any asset which is reserved
+
+        The field argument names the field which holds the asset ID so this can
+        be used for querysets of models which refer to assets.
+        """
+
+        raise NotImplementedError
+
+
+class DatabaseReservationBackend(BaseReservationBackend):
+    """
+    Stores reservations in the AssetTranscriptionReservation table
+
+    Stale reservations are removed by the expire_inactive_asset_reservations,
+    tombstone_old_active_asset_reservations and
+    delete_old_tombstoned_reservations tasks.
+    """
+
+    #: A single statement which renews the reservation if this token holds it,
+    #: obtains it if nobody holds an active reservation or the holder's review
+    #: reservation has expired, and otherwise leaves the table unchanged. The
+    #: unique_active_asset_reservation constraint guarantees that concurrent
+    #: requests cannot both obtain the reservation.
+    RESERVE_SQL = """
+        WITH tombstone AS (
+            SELECT 1
+            FROM concordia_assettranscriptionreservation
+            WHERE asset_id = %(asset_pk)s
+                AND reservation_token = %(reservation_token)s
+                AND tombstoned
+        ), held AS (
+            SELECT 1
+            FROM concordia_assettranscriptionreservation
+            WHERE asset_id = %(asset_pk)s
+                AND reservation_token = %(reservation_token)s
+                AND NOT tombstoned
+        ), upsert AS (
+            INSERT INTO concordia_assettranscriptionreservation AS atr
+                (asset_id, reservation_token, tombstoned, review, created_on,
+                    updated_on)
+            SELECT %(asset_pk)s, %(reservation_token)s, FALSE, %(review)s,
+                current_timestamp, current_timestamp
+            WHERE NOT EXISTS (SELECT 1 FROM tombstone)
+            ON CONFLICT (asset_id) WHERE tombstoned = FALSE
+            DO UPDATE SET
+                reservation_token = EXCLUDED.reservation_token,
+                -- Renewing a normal reservation as a review must not shorten it:
+                review = CASE
+                    WHEN atr.reservation_token = EXCLUDED.reservation_token
+                    THEN atr.review AND EXCLUDED.review
+                    ELSE EXCLUDED.review
+                END,
+                created_on = CASE
+                    WHEN atr.reservation_token = EXCLUDED.reservation_token
+                    THEN atr.created_on
+                    ELSE current_timestamp
+                END,
+                updated_on = current_timestamp
+            WHERE atr.reservation_token = EXCLUDED.reservation_token
+                OR (
+                    atr.review
+                    AND atr.updated_on < %(review_cutoff)s
+                )
+            RETURNING NOT EXISTS (SELECT 1 FROM held) AS obtained
+        )
+        SELECT EXISTS (SELECT 1 FROM tombstone), (SELECT obtained FROM upsert)
+    """
+
+    def reserve(self, asset_pk, reservation_token, *, review=False):
+        review_cutoff = now() - timedelta(seconds=settings.REVIEW_RESERVATION_SECONDS)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                self.RESERVE_SQL,
+                {
+                    "asset_pk": asset_pk,
+                    "reservation_token": reservation_token,
+                    "review": review,
+                    "review_cutoff": review_cutoff,
+                },
+            )
+            am_i_tombstoned, obtained = cursor.fetchone()
+
+        if am_i_tombstoned:
+            logger.debug("I'm tombstoned %s", reservation_token)
+            return ReservationStatus.TOMBSTONED
+        elif obtained is None:
+            logger.debug("Someone else has this active reservation %s", asset_pk)
+            return ReservationStatus.CONFLICT
+        elif obtained:
+            logger.debug("Obtained reservation %s", reservation_token)
+            return ReservationStatus.OBTAINED
+        else:
+            logger.debug("Updated reservation %s", reservation_token)
+            return ReservationStatus.RENEWED
+
+    def release(self, asset_pk, reservation_token):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM concordia_assettranscriptionreservation
+                WHERE asset_id = %s and reservation_token = %s
+                """,
+                [asset_pk, reservation_token],
+            )
+
+    def expire(self):
+        timestamp = now()
+
+        # Clear old reservations, with a grace period:
+        cutoff = timestamp - timedelta(
+            seconds=2 * settings.TRANSCRIPTION_RESERVATION_SECONDS
+        )
+        review_cutoff = timestamp - timedelta(
+            seconds=settings.REVIEW_RESERVATION_SECONDS
+        )
+
+        logger.debug(
+            "Clearing reservations with last reserve time older than %s", cutoff
+        )
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                DELETE FROM concordia_assettranscriptionreservation
+                WHERE (updated_on < %s OR (review AND updated_on < %s))
+                    AND tombstoned IS NOT TRUE
+                RETURNING asset_id, reservation_token
+                """,
+                [cutoff, review_cutoff],
+            )
+            return cursor.fetchall()
+
+    def exclude_reserved(self, queryset, field="pk"):
+        review_cutoff = now() - timedelta(seconds=settings.REVIEW_RESERVATION_SECONDS)
+
+        # Expired review reservations no longer block anyone:
+        reservations = AssetTranscriptionReservation.objects.exclude(
+            review=True, updated_on__lt=review_cutoff
+        )
+
+        return queryset.exclude(
+            **{f"{field}__in": Subquery(reservations.values("asset_id"))}
+        )
+
+
+class RedisReservationBackend(BaseReservationBackend):
+    """
+    Stores reservations in Redis using key expiry instead of database cleanup
+
+    Each active reservation is a hash holding the token and the time it was
+    obtained, which expires after twice TRANSCRIPTION_RESERVATION_SECONDS to
+    match the grace period used by expire_inactive_asset_reservations, or after
+    REVIEW_RESERVATION_SECONDS for review reservations. A
+    reservation which is renewed for longer than
+    TRANSCRIPTION_RESERVATION_TOMBSTONE_HOURS is replaced by a tombstone key for
+    that token which expires after TRANSCRIPTION_RESERVATION_TOMBSTONE_LENGTH_HOURS.
+
+    A sorted set of asset IDs scored by expiration time allows querysets to
+    exclude reserved assets without scanning the keyspace. The
+    expire_inactive_asset_reservations task removes the expired members, along
+    with their tokens which are kept in a separate hash, so the release can be
+    sent to WebSocket listeners.
+    """
+
+    key_prefix = "concordia:reservation"
+
+    RESERVE_SCRIPT = """
+        if redis.call("EXISTS", KEYS[2]) == 1 then
+            return "tombstoned"
+        end
+
+        local holder = redis.call("HMGET", KEYS[1], "token", "created")
+        local expires = tonumber(ARGV[2]) + tonumber(ARGV[3])
+
+        if not holder[1] then
+            redis.call(
+                "HSET", KEYS[1], "token", ARGV[1], "created", ARGV[2], "review", ARGV[7]
+            )
+            redis.call("EXPIRE", KEYS[1], ARGV[3])
+            redis.call("ZADD", KEYS[3], expires, ARGV[6])
+            redis.call("HSET", KEYS[4], ARGV[6], ARGV[1])
+            return "obtained"
+        end
+
+        if holder[1] ~= ARGV[1] then
+            return "conflict"
+        end
+
+        if tonumber(ARGV[2]) - tonumber(holder[2]) > tonumber(ARGV[4]) then
+            redis.call("DEL", KEYS[1])
+            redis.call("ZREM", KEYS[3], ARGV[6])
+            redis.call("HDEL", KEYS[4], ARGV[6])
+            redis.call("SET", KEYS[2], "1", "EX", ARGV[5])
+            return "tombstoned"
+        end
+
+        -- Renewing a normal reservation as a review must not shorten it:
+        if tonumber(ARGV[7]) == 0 or redis.call("HGET", KEYS[1], "review") == "1" then
+            redis.call("HSET", KEYS[1], "review", ARGV[7])
+            redis.call("EXPIRE", KEYS[1], ARGV[3])
+            redis.call("ZADD", KEYS[3], expires, ARGV[6])
+        end
+        return "renewed"
+    """
+
+    RELEASE_SCRIPT = """
+        redis.call("DEL", KEYS[2])
+
+        if redis.call("HGET", KEYS[1], "token") == ARGV[1] then
+            redis.call("DEL", KEYS[1])
+            redis.call("ZREM", KEYS[3], ARGV[2])
+            redis.call("HDEL", KEYS[4], ARGV[2])
+            return 1
+        end
+
+        return 0
+    """
+
+    #: Removes the assets whose reservations have expired from the sorted set
+    #: and returns them with the token which held each reservation
+    EXPIRE_SCRIPT = """
+        local expired = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1])
+        local released = {}
+
+        for _, asset_pk in ipairs(expired) do
+            released[#released + 1] = {asset_pk, redis.call("HGET", KEYS[2], asset_pk)}
+            redis.call("ZREM", KEYS[1], asset_pk)
+            redis.call("HDEL", KEYS[2], asset_pk)
+        end
+
+        return released
+    """
+
+    def __init__(self):
+        self.redis = get_redis_connection()
+        self._reserve = self.redis.register_script(self.RESERVE_SCRIPT)
+        self._release = self.redis.register_script(self.RELEASE_SCRIPT)
+        self._expire = self.redis.register_script(self.EXPIRE_SCRIPT)
+
+    def get_keys(self, asset_pk, reservation_token):
+        return [
+            f"{self.key_prefix}:asset:{asset_pk}",
+            f"{self.key_prefix}:tombstone:{asset_pk}:{reservation_token}",
+            f"{self.key_prefix}:reserved-assets",
+            f"{self.key_prefix}:reservation-tokens",
+        ]
+
+    def reserve(self, asset_pk, reservation_token, *, review=False):
+        if review:
+            ttl = settings.REVIEW_RESERVATION_SECONDS
+        else:
+            ttl = 2 * settings.TRANSCRIPTION_RESERVATION_SECONDS
+
+        status = self._reserve(
+            keys=self.get_keys(asset_pk, reservation_token),
+            args=[
+                reservation_token,
+                time(),
+                ttl,
+                settings.TRANSCRIPTION_RESERVATION_TOMBSTONE_HOURS * 3600,
+                settings.TRANSCRIPTION_RESERVATION_TOMBSTONE_LENGTH_HOURS * 3600,
+                asset_pk,
+                int(review),
+            ],
+        )
+        return status.decode("utf-8")
+
+    def release(self, asset_pk, reservation_token):
+        self._release(
+            keys=self.get_keys(asset_pk, reservation_token),
+            args=[reservation_token, asset_pk],
+        )
+
+    def expire(self):
+        released = self._expire(
+            keys=[
+                f"{self.key_prefix}:reserved-assets",
+                f"{self.key_prefix}:reservation-tokens",
+            ],
+            args=[time()],
+        )
+
+        return [
+            (int(asset_pk), reservation_token and reservation_token.decode("utf-8"))
+            for asset_pk, reservation_token in released
+        ]
+
+    def get_reserved_asset_ids(self):
+        # Expired members are left for expire() so their release is broadcast:
+        asset_ids = self.redis.zrangebyscore(
+            f"{self.key_prefix}:reserved-assets", f"({time()}", "+inf"
+        )
+
+        return [int(i) for i in asset_ids]
+
+    def exclude_reserved(self, queryset, field="pk"):
+        reserved_asset_ids = self.get_reserved_asset_ids()
+        if not reserved_asset_ids:
+            return queryset
+        return queryset.exclude(**{f"{field}__in": reserved_asset_ids})
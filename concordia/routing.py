@@ -1,5 +1,6 @@
 from channels.auth import AuthMiddlewareStack
 from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.security.websocket import AllowedHostsOriginValidator
 from django.urls import path
 
 from . import consumers
@@ -7,8 +8,14 @@ from . import consumers
 application = ProtocolTypeRouter(
     {
         # (http->django views is added by default)
-        "websocket": AuthMiddlewareStack(
-            URLRouter([path("ws/asset/asset_updates/", consumers.AssetConsumer)])
+        # The asset socket makes reservations using the session cookie so other
+        # sites must not be able to open it on a user's behalf:
+        "websocket": AllowedHostsOriginValidator(
+            AuthMiddlewareStack(
+                URLRouter(
+                    [path("ws/asset/asset_updates/", consumers.AssetConsumer.as_asgi())]
+                )
+            )
         )
     }
 )
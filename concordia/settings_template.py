@@ -202,6 +202,9 @@ if REDIS_PORT.isdigit():
 else:
     REDIS_PORT = 6379
 
+#: Redis database used for application data such as asset reservations
+REDIS_URL = f"redis://{REDIS_ADDRESS}:{REDIS_PORT}/1"
+
 CELERY_BROKER_URL = f"redis://{REDIS_ADDRESS}:{REDIS_PORT}/0"
 CELERY_RESULT_BACKEND = f"redis://{REDIS_ADDRESS}:{REDIS_PORT}/0"
 
@@ -354,12 +357,31 @@ BOOTSTRAP4 = {"required_css_class": "form-group-required", "set_placeholder": Fa
 #: Number of seconds an asset reservation is valid for
 TRANSCRIPTION_RESERVATION_SECONDS = 5 * 60
 
+#: Number of seconds a reviewer sent to an asset by find-next-page holds it
+#: before anyone else may be sent there, unless the asset page renews it
+REVIEW_RESERVATION_SECONDS = 60
+
 #: Number of hours until an asset reservation is tombstoned
 TRANSCRIPTION_RESERVATION_TOMBSTONE_HOURS = 72
 
 #: Number of hours until a tombstoned reservation is deleted
 TRANSCRIPTION_RESERVATION_TOMBSTONE_LENGTH_HOURS = 48
 
+#: Number of seconds to collect changed assets before recalculating their
+#: difficulty values together
+DIFFICULTY_RECALCULATION_DELAY_SECONDS = 15
+
+#: Superseded transcriptions which have not changed for this many days have
+#: their text compacted by the compact_transcription_history task
+TRANSCRIPTION_COMPACTION_MIN_AGE_DAYS = 30
+
+#: Storage for asset reservations. Use
+#: "concordia.reservation_backends.RedisReservationBackend" to keep reservations
+#: in Redis (see REDIS_URL) instead of the database:
+TRANSCRIPTION_RESERVATION_BACKEND = (
+    "concordia.reservation_backends.DatabaseReservationBackend"
+)
+
 #: Web cache policy settings
 DEFAULT_PAGE_TTL = 5 * 60
 
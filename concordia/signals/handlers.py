@@ -1,5 +1,9 @@
 import logging
+import threading
+from collections import defaultdict
+from functools import partial
 from time import time
+from weakref import WeakValueDictionary
 
 from asgiref.sync import AsyncToSync
 from channels.layers import get_channel_layer
@@ -8,18 +12,42 @@ from django.contrib.auth import login as auth_login
 from django.contrib.auth.models import Group
 from django.contrib.auth.signals import user_logged_in, user_login_failed
 from django.core.mail import EmailMultiAlternatives
-from django.db.models.signals import post_delete, post_save
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.template import loader
 from django_registration.signals import user_activated, user_registered
 from flags.state import flag_enabled
-
-from ..models import Asset, Transcription, TranscriptionStatus
-from ..tasks import calculate_difficulty_values
-from .signals import reservation_obtained, reservation_released
+from more_itertools.more import chunked
+
+from ..consumers import get_asset_update_group
+from ..models import (
+    Asset,
+    AssetTranscriber,
+    Item,
+    Project,
+    ScopeContributor,
+    SiteReportEvent,
+    TranscribableAsset,
+    Transcription,
+    TranscriptionStatus,
+    TranscriptionStatusCount,
+    UserAssetTagCollection,
+)
+from ..tasks import queue_difficulty_recalculation
+from ..transcription_history import restore_transcription_texts
+from ..utils import get_anonymous_user
+from .signals import reservation_obtained, reservation_released, reservations_released
 
 ASSET_CHANNEL_LAYER = get_channel_layer()
 
+#: The assets saved in the current thread which have not been sent yet, keyed
+#: by database alias and savepoint IDs. Each set is only referenced strongly by
+#: its on_commit callback so rolling back the transaction or savepoint discards
+#: both of them.
+PENDING_ASSET_UPDATES = threading.local()
+
 logger = logging.getLogger(__name__)
 
 
@@ -96,35 +124,341 @@ def update_asset_status(sender, *, instance, **kwargs):
     elif instance.submitted:
         new_status = TranscriptionStatus.SUBMITTED
 
-    instance.asset.transcription_status = new_status
-    instance.asset.full_clean()
-    instance.asset.save()
+    asset = instance.asset
+    asset.transcription_status = new_status
+
+    # Transcriptions which have been superseded can still be saved when they
+    # are reviewed so the asset only points at the one with the highest ID.
+    # The asset may have been loaded before a newer transcription was committed
+    # so the pointer is only moved forward in the database and is left out of
+    # the save below:
+    if (
+        Asset.objects.filter(pk=asset.pk)
+        .filter(
+            Q(latest_transcription__isnull=True)
+            | Q(latest_transcription_id__lt=instance.pk)
+        )
+        .update(latest_transcription=instance)
+    ):
+        asset.latest_transcription = instance
+
+    asset.full_clean()
+    asset.save(
+        update_fields=[
+            field.name
+            for field in Asset._meta.concrete_fields
+            if not field.primary_key and field.name != "latest_transcription"
+        ]
+    )
+
+    queue_difficulty_recalculation([instance.asset_id])
+
+
+@receiver(pre_delete, sender=Transcription)
+def restore_superseded_transcription_text(*, instance, **kwargs):
+    # A compacted transcription's text is stored as a delta against the one
+    # which superseded it so it needs its full text back before that is gone:
+    if instance.supersedes_id:
+        restore_transcription_texts([instance.supersedes_id])
+
+
+@receiver(post_delete, sender=Transcription)
+def update_latest_transcription(*, instance, **kwargs):
+    Asset.objects.filter(pk=instance.asset_id).update_latest_transcriptions()
+
+
+@receiver(post_save, sender=Transcription)
+def record_asset_transcriber(*, instance, created, **kwargs):
+    if created:
+        AssetTranscriber.objects.bulk_create(
+            [AssetTranscriber(asset_id=instance.asset_id, user_id=instance.user_id)],
+            ignore_conflicts=True,
+        )
+
+
+@receiver(post_save, sender=Transcription)
+def record_scope_contributors(*, instance, created, **kwargs):
+    if created:
+        user_ids = [instance.user_id, instance.reviewed_by_id]
+    else:
+        user_ids = [instance.reviewed_by_id]
+
+    ScopeContributor.objects.add_contributors(instance.asset_id, user_ids)
+
+
+@receiver(post_save, sender=Asset)
+def update_transcribable_asset(*, instance, **kwargs):
+    TranscribableAsset.objects.refresh(asset_ids=[instance.pk])
+
 
-    calculate_difficulty_values(Asset.objects.filter(pk=instance.asset.pk))
+@receiver(post_save, sender=Item)
+def update_item_transcribable_assets(*, instance, **kwargs):
+    TranscribableAsset.objects.refresh(item_ids=[instance.pk])
+
+
+@receiver(post_save, sender=Project)
+def update_project_transcribable_assets(*, instance, **kwargs):
+    TranscribableAsset.objects.refresh(project_ids=[instance.pk])
 
 
 @receiver(post_save, sender=Asset)
-def send_asset_update(*, instance, **kwargs):
-    latest_trans = None
-
-    latest_transcription = instance.transcription_set.order_by("-pk").first()
-    if latest_transcription:
-        latest_trans = {
-            "text": latest_transcription.text,
-            "id": latest_transcription.pk,
-            "submitted_by": latest_transcription.user.pk,
-        }
+def update_asset_status_counts(*, instance, created, **kwargs):
+    old_values = instance.get_loaded_values()
+    new_values = instance.get_tracked_values()
+
+    if created:
+        TranscriptionStatusCount.objects.apply_asset_change(None, new_values)
+        SiteReportEvent.objects.record_asset_change(None, new_values)
+    elif old_values is None:
+        # The asset was loaded without the tracked fields so we don't know what
+        # changed and will recalculate its campaign instead:
+        TranscriptionStatusCount.objects.rebuild(
+            campaign_ids=[instance.item.project.campaign_id]
+        )
+        SiteReportEvent.objects.record(
+            SiteReportEvent.EventType.RECALCULATE, {}, asset_id=instance.pk
+        )
+    elif old_values != new_values:
+        TranscriptionStatusCount.objects.apply_asset_change(old_values, new_values)
+        SiteReportEvent.objects.record_asset_change(old_values, new_values)
 
-    AsyncToSync(ASSET_CHANNEL_LAYER.group_send)(
-        "asset_updates",
-        {
-            "type": "asset_update",
-            "asset_pk": instance.pk,
-            "status": instance.transcription_status,
-            "difficulty": instance.difficulty,
-            "latest_transcription": latest_trans,
-        },
+    instance.reset_loaded_values()
+
+
+@receiver(post_delete, sender=Asset)
+def remove_asset_status_counts(*, instance, **kwargs):
+    TranscriptionStatusCount.objects.apply_asset_change(
+        instance.get_tracked_values(), None
     )
+    SiteReportEvent.objects.record_asset_change(instance.get_tracked_values(), None)
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_save, sender=Project)
+def update_scope_rollups(*, sender, instance, created, **kwargs):
+    # New items and projects do not have any assets yet:
+    if created:
+        SiteReportEvent.objects.record_container_change(
+            instance, None, instance.get_tracked_values()
+        )
+    else:
+        old_values = instance.get_loaded_values()
+
+        if old_values != instance.get_tracked_values():
+            if old_values is None:
+                SiteReportEvent.objects.record(
+                    SiteReportEvent.EventType.RECALCULATE,
+                    {},
+                    **{f"{sender._meta.model_name}_id": instance.pk},
+                )
+            else:
+                SiteReportEvent.objects.record_container_change(
+                    instance, old_values, instance.get_tracked_values()
+                )
+
+            if sender is Item:
+                project_ids = {instance.project_id}
+                if old_values is not None:
+                    project_ids.add(old_values["project_id"])
+                campaign_ids = Project.objects.filter(pk__in=project_ids).values_list(
+                    "campaign_id", flat=True
+                )
+            else:
+                campaign_ids = [instance.campaign_id]
+                if old_values is not None:
+                    campaign_ids.append(old_values["campaign_id"])
+
+            campaign_ids = set(campaign_ids)
+            TranscriptionStatusCount.objects.rebuild(campaign_ids=campaign_ids)
+
+            # Contributors do not depend on publication, only on the hierarchy:
+            parent_field = "project_id" if sender is Item else "campaign_id"
+            if old_values is None or old_values[parent_field] != getattr(
+                instance, parent_field
+            ):
+                ScopeContributor.objects.rebuild(campaign_ids=campaign_ids)
+
+    instance.reset_loaded_values()
+
+
+@receiver(post_delete, sender=Item)
+@receiver(post_delete, sender=Project)
+def record_removed_scope(*, instance, **kwargs):
+    SiteReportEvent.objects.record_container_change(
+        instance, instance.get_tracked_values(), None
+    )
+
+
+@receiver(post_save, sender=Transcription)
+def record_transcription_event(*, instance, created, **kwargs):
+    if created:
+        deltas = {"transcriptions_saved": 1}
+        if instance.user_id == get_anonymous_user().pk:
+            deltas["anonymous_transcriptions"] = 1
+
+        SiteReportEvent.objects.record(
+            SiteReportEvent.EventType.TRANSCRIPTION, deltas, asset_id=instance.asset_id
+        )
+
+
+@receiver(post_delete, sender=Transcription)
+def record_removed_transcription_event(*, instance, **kwargs):
+    deltas = {"transcriptions_saved": -1}
+    if instance.user_id == get_anonymous_user().pk:
+        deltas["anonymous_transcriptions"] = -1
+
+    SiteReportEvent.objects.record(
+        SiteReportEvent.EventType.TRANSCRIPTION, deltas, asset_id=instance.asset_id
+    )
+
+
+@receiver(m2m_changed, sender=UserAssetTagCollection.tags.through)
+def record_tag_event(*, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # Tags are always added through their collections but if a tag's
+        # collections are changed the affected scopes need to be recalculated:
+        if action in ("post_add", "post_remove"):
+            for asset_id in UserAssetTagCollection.objects.filter(
+                pk__in=pk_set
+            ).values_list("asset_id", flat=True):
+                SiteReportEvent.objects.record(
+                    SiteReportEvent.EventType.RECALCULATE, {}, asset_id=asset_id
+                )
+        return
+
+    if action == "post_add":
+        tag_uses = len(pk_set)
+    elif action == "post_remove":
+        tag_uses = -len(pk_set)
+    elif action == "pre_clear":
+        tag_uses = -instance.tags.count()
+    else:
+        return
+
+    if tag_uses:
+        SiteReportEvent.objects.record(
+            SiteReportEvent.EventType.TAG,
+            {"tag_uses": tag_uses},
+            asset_id=instance.asset_id,
+        )
+
+
+@receiver(m2m_changed, sender=Project.topics.through)
+def record_topic_membership_event(*, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        pk_set = set(
+            (instance.project_set if reverse else instance.topics).values_list(
+                "pk", flat=True
+            )
+        )
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    if pk_set:
+        if reverse:
+            project_ids, topic_ids = pk_set, [instance.pk]
+        else:
+            project_ids, topic_ids = [instance.pk], pk_set
+
+        SiteReportEvent.objects.record_topic_changes(project_ids, topic_ids)
+
+
+@receiver(post_save, sender=Asset)
+def send_asset_update(*, instance, using, **kwargs):
+    """
+    Queue an asset_update message which will be sent, together with the other
+    assets changed in the same transaction, once the transaction commits
+    """
+
+    connection = transaction.get_connection(using)
+    key = (using, tuple(connection.savepoint_ids))
+
+    try:
+        pending = PENDING_ASSET_UPDATES.asset_pks
+    except AttributeError:
+        pending = PENDING_ASSET_UPDATES.asset_pks = WeakValueDictionary()
+
+    asset_pks = pending.get(key)
+    if asset_pks is not None:
+        asset_pks.add(instance.pk)
+    else:
+        # The callback runs immediately outside of a transaction:
+        asset_pks = pending[key] = {instance.pk}
+        transaction.on_commit(
+            partial(send_pending_asset_updates, key, asset_pks), using=using
+        )
+
+
+def send_pending_asset_updates(key, asset_pks):
+    # Assets saved after this point, such as by another on_commit callback,
+    # are sent separately:
+    if PENDING_ASSET_UPDATES.asset_pks.get(key) is asset_pks:
+        del PENDING_ASSET_UPDATES.asset_pks[key]
+
+    send_asset_updates(asset_pks)
+
+
+def send_asset_updates(asset_pks):
+    updates_by_group = defaultdict(list)
+
+    for asset in (
+        Asset.objects.filter(pk__in=asset_pks)
+        .order_by("pk")
+        .values(
+            "pk",
+            "transcription_status",
+            "difficulty",
+            "item_id",
+            "item__project_id",
+            "item__project__campaign_id",
+            "latest_transcription_id",
+            "latest_transcription__text",
+            "latest_transcription__user_id",
+        )
+    ):
+        if asset["latest_transcription_id"] is None:
+            latest_transcription = None
+        else:
+            latest_transcription = {
+                "text": asset["latest_transcription__text"],
+                "id": asset["latest_transcription_id"],
+                "submitted_by": asset["latest_transcription__user_id"],
+            }
+
+        update = {
+            "asset_pk": asset["pk"],
+            "status": asset["transcription_status"],
+            "difficulty": asset["difficulty"],
+            "latest_transcription": latest_transcription,
+        }
+        for group in get_asset_update_groups(
+            asset["pk"],
+            item_id=asset["item_id"],
+            project_id=asset["item__project_id"],
+            campaign_id=asset["item__project__campaign_id"],
+        ):
+            updates_by_group[group].append(update)
+
+    for group, updates in updates_by_group.items():
+        for chunk in chunked(updates, 100):
+            AsyncToSync(ASSET_CHANNEL_LAYER.group_send)(
+                group, {"type": "asset_updates", "updates": chunk}
+            )
+
+
+def get_asset_update_groups(asset_pk, *, item_id, project_id, campaign_id):
+    """
+    Return the groups which receive updates for an asset: everything, the asset
+    itself and each scope containing it
+    """
+
+    return [
+        get_asset_update_group(),
+        get_asset_update_group("asset", asset_pk),
+        get_asset_update_group("item", item_id),
+        get_asset_update_group("project", project_id),
+        get_asset_update_group("campaign", campaign_id),
+    ]
 
 
 @receiver(reservation_obtained)
@@ -147,18 +481,46 @@ def send_asset_reservation_released(sender, **kwargs):
     )
 
 
+@receiver(reservations_released)
+def send_asset_reservations_released(sender, **kwargs):
+    reservations = kwargs["reservations"]
+
+    # Reservations are only published to sockets watching everything or the
+    # individual asset so the reservation views don't need to query for the
+    # asset's containers:
+    reservations_by_group = defaultdict(list)
+    for reservation in reservations:
+        for group in get_reservation_groups(reservation["asset_pk"]):
+            reservations_by_group[group].append(reservation)
+
+    for group, group_reservations in reservations_by_group.items():
+        AsyncToSync(ASSET_CHANNEL_LAYER.group_send)(
+            group,
+            {
+                "type": "asset_reservations_released",
+                "reservations": group_reservations,
+                "sent": time(),
+            },
+        )
+
+
+def get_reservation_groups(asset_pk):
+    return [get_asset_update_group(), get_asset_update_group("asset", asset_pk)]
+
+
 def send_asset_reservation_message(
     *, sender, message_type, asset_pk, reservation_token
 ):
-    AsyncToSync(ASSET_CHANNEL_LAYER.group_send)(
-        "asset_updates",
-        {
-            "type": message_type,
-            "asset_pk": asset_pk,
-            "reservation_token": reservation_token,
-            "sent": time(),
-        },
-    )
+    for group in get_reservation_groups(asset_pk):
+        AsyncToSync(ASSET_CHANNEL_LAYER.group_send)(
+            group,
+            {
+                "type": message_type,
+                "asset_pk": asset_pk,
+                "reservation_token": reservation_token,
+                "sent": time(),
+            },
+        )
 
 
 @receiver(post_delete, sender=Asset)
@@ -6,3 +6,8 @@ import django.dispatch
 reservation_obtained = django.dispatch.Signal()
 
 reservation_released = django.dispatch.Signal()
+
+# Batched form of reservation_released - kwargs from handlers
+# ["reservations"], a list of {"asset_pk", "reservation_token"} dicts
+
+reservations_released = django.dispatch.Signal()
@@ -0,0 +1,567 @@
+"""
+Calculates the statistics stored in SiteReport
+
+Rather than counting each campaign and topic separately, every statistic is
+calculated for all of the requested scopes at once using queries which group by
+the campaign or topic and use filtered aggregates for the individual counts.
+"""
+
+from collections import defaultdict
+from functools import wraps
+from logging import getLogger
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Count, F, Q
+
+from concordia.models import (
+    Asset,
+    Campaign,
+    Item,
+    Project,
+    SiteReport,
+    SiteReportEvent,
+    Tag,
+    Topic,
+    Transcription,
+)
+from concordia.utils import get_anonymous_user
+
+logger = getLogger(__name__)
+
+SCOPE_MODELS = {"campaign": Campaign, "topic": Topic}
+
+#: The relationship from each counted model to the campaign or topic containing it
+SCOPE_PATHS = {
+    "campaign": {
+        Asset: "item__project__campaign",
+        Item: "project__campaign",
+        Project: "campaign",
+        Transcription: "asset__item__project__campaign",
+    },
+    "topic": {
+        Asset: "item__project__topics",
+        Item: "project__topics",
+        Project: "topics",
+        Transcription: "asset__item__project__topics",
+    },
+}
+
+#: Counts the distinct users who transcribed or reviewed published assets in
+#: each campaign
+CAMPAIGN_CONTRIBUTORS_SQL = """
+    SELECT p.campaign_id, COUNT(DISTINCT u.user_id)
+    FROM concordia_transcription t
+    INNER JOIN concordia_asset a ON a.id = t.asset_id
+    INNER JOIN concordia_item i ON i.id = a.item_id
+    INNER JOIN concordia_project p ON p.id = i.project_id
+    CROSS JOIN LATERAL (
+        VALUES (t.user_id), (t.reviewed_by_id)
+    ) AS u (user_id)
+    WHERE a.published AND i.published AND p.published AND {scope}
+    GROUP BY p.campaign_id
+"""
+
+#: Counts tag uses and distinct tags for the site, every campaign and every
+#: topic in a single pass over the tagging table. Rows are repeated for each of
+#: a project's topics, so uses are counted by the distinct tagging row ID.
+TAG_STATISTICS_SQL = """
+    SELECT
+        CASE
+            WHEN GROUPING(p.campaign_id) = 0 THEN 'campaign'
+            WHEN GROUPING(pt.topic_id) = 0 THEN 'topic'
+        END AS scope_type,
+        CASE
+            WHEN GROUPING(p.campaign_id) = 0 THEN p.campaign_id
+            ELSE pt.topic_id
+        END AS scope_id,
+        COUNT(DISTINCT ct.id) AS tag_uses,
+        COUNT(DISTINCT ct.tag_id) AS distinct_tags
+    FROM concordia_userassettagcollection_tags ct
+    INNER JOIN concordia_userassettagcollection c
+        ON c.id = ct.userassettagcollection_id
+    INNER JOIN concordia_asset a ON a.id = c.asset_id
+    INNER JOIN concordia_item i ON i.id = a.item_id
+    INNER JOIN concordia_project p ON p.id = i.project_id
+    LEFT OUTER JOIN concordia_project_topics pt ON pt.project_id = p.id
+    WHERE {scope}
+    GROUP BY GROUPING SETS ((), (p.campaign_id), (pt.topic_id))
+"""
+
+TAG_STATISTICS_DEFAULTS = {"tag_uses": 0, "distinct_tags": 0}
+
+#: Sums the deltas of the events which had not been committed in the snapshot
+#: of the latest report for each scope. The site-wide report is treated as a
+#: scope with the ID zero. Transactions older than a snapshot's xmin are always
+#: visible in it, which lets the indexes on xid skip most of the log.
+EVENT_DELTAS_SQL = """
+    WITH latest_reports AS (
+        SELECT DISTINCT ON (scope_id) {report_scope} AS scope_id,
+            r.event_snapshot::pg_snapshot AS event_snapshot
+        FROM concordia_sitereport r
+        WHERE {report_filter}
+        ORDER BY scope_id, r.created_on DESC
+    ), events AS (
+        {event_scopes}
+    )
+    SELECT r.scope_id, d.key, SUM(d.value::integer),
+        bool_or(e.event_type = %(recalculate)s)
+    FROM latest_reports r
+    INNER JOIN events e
+        ON e.scope_id = r.scope_id
+        AND e.xid >= pg_snapshot_xmin(r.event_snapshot)::text::bigint
+        AND NOT pg_visible_in_snapshot(e.xid::text::xid8, r.event_snapshot)
+    LEFT OUTER JOIN LATERAL jsonb_each_text(e.deltas) AS d ON TRUE
+    GROUP BY r.scope_id, d.key
+"""
+
+EVENT_DELTAS_SCOPES = {
+    None: {
+        "report_scope": "0",
+        # Reports for deleted campaigns and topics also have neither set so we
+        # identify the site-wide reports by their site-only statistics:
+        "report_filter": (
+            "r.campaign_id IS NULL AND r.topic_id IS NULL"
+            " AND r.users_registered IS NOT NULL"
+        ),
+        "event_scopes": """
+            SELECT 0 AS scope_id, e.xid, e.event_type, e.deltas
+            FROM concordia_sitereportevent e
+        """,
+    },
+    "campaign": {
+        "report_scope": "r.campaign_id",
+        "report_filter": "r.campaign_id IS NOT NULL",
+        "event_scopes": """
+            SELECT e.campaign_id AS scope_id, e.xid, e.event_type, e.deltas
+            FROM concordia_sitereportevent e
+        """,
+    },
+    "topic": {
+        "report_scope": "r.topic_id",
+        "report_filter": "r.topic_id IS NOT NULL",
+        "event_scopes": """
+            SELECT pt.topic_id AS scope_id, e.xid, e.event_type, e.deltas
+            FROM concordia_sitereportevent e
+            INNER JOIN concordia_project_topics pt ON pt.project_id = e.project_id
+            UNION ALL
+            SELECT e.topic_id, e.xid, e.event_type, e.deltas
+            FROM concordia_sitereportevent e
+            WHERE e.topic_id IS NOT NULL
+        """,
+    },
+}
+
+
+def in_report_snapshot(func):
+    """
+    Run the decorated function in a REPEATABLE READ transaction so every report
+    query sees the same committed changes
+
+    The isolation level of an existing transaction cannot be changed, so nested
+    calls and callers which are already in a transaction use it unchanged.
+    """
+
+    @wraps(func)
+    def inner(*args, **kwargs):
+        if connection.in_atomic_block:
+            return func(*args, **kwargs)
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+            return func(*args, **kwargs)
+
+    return inner
+
+
+def get_event_snapshot():
+    """
+    Return the text form of the current snapshot for SiteReport.event_snapshot
+
+    The SiteReportEvents visible in it are those for the changes which are
+    counted by report queries using the same snapshot. A transaction's own
+    changes are not visible in its snapshot, so reports must not be calculated
+    in a transaction which has recorded events.
+    """
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_current_snapshot()::text")
+        (event_snapshot,) = cursor.fetchone()
+
+    return event_snapshot
+
+
+def get_report_aggregates():
+    """
+    Return the SiteReport fields calculated from each model as a list of
+    (model, {field name: aggregate}) pairs
+    """
+
+    anonymous_user = get_anonymous_user()
+
+    return [
+        (
+            Asset,
+            {
+                "assets_total": Count("pk"),
+                "assets_published": Count("pk", filter=Q(published=True)),
+                "assets_unpublished": Count("pk", filter=Q(published=False)),
+                **{
+                    field_name: Count("pk", filter=Q(transcription_status=status))
+                    for status, field_name in SiteReport.ASSET_STATUS_FIELDS.items()
+                },
+            },
+        ),
+        (
+            Item,
+            {
+                "items_published": Count("pk", filter=Q(published=True)),
+                "items_unpublished": Count("pk", filter=Q(published=False)),
+            },
+        ),
+        (
+            Project,
+            {
+                "projects_published": Count("pk", filter=Q(published=True)),
+                "projects_unpublished": Count("pk", filter=Q(published=False)),
+            },
+        ),
+        (
+            Transcription,
+            {
+                "transcriptions_saved": Count("pk"),
+                "anonymous_transcriptions": Count("pk", filter=Q(user=anonymous_user)),
+            },
+        ),
+    ]
+
+
+def get_campaign_contributor_counts(campaign_ids=None):
+    if campaign_ids is None:
+        scope, params = "TRUE", []
+    else:
+        scope, params = "p.campaign_id = ANY(%s)", [list(campaign_ids)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(CAMPAIGN_CONTRIBUTORS_SQL.format(scope=scope), params)
+        return {
+            campaign_id: {"registered_contributors": count}
+            for campaign_id, count in cursor.fetchall()
+        }
+
+
+def get_tag_statistics(campaign_ids=None, topic_ids=None):
+    """
+    Return a mapping of {(scope type, scope ID): {"tag_uses": …, "distinct_tags": …}}
+    with the site-wide counts stored under (None, None)
+
+    If either campaign_ids or topic_ids is provided, only the counts for those
+    scopes are guaranteed to be complete.
+    """
+
+    if campaign_ids is None and topic_ids is None:
+        scope, params = "TRUE", {}
+    else:
+        scope = (
+            "p.campaign_id = ANY(%(campaign_ids)s) OR pt.topic_id = ANY(%(topic_ids)s)"
+        )
+        params = {
+            "campaign_ids": list(campaign_ids or []),
+            "topic_ids": list(topic_ids or []),
+        }
+
+    tag_statistics = {}
+
+    with connection.cursor() as cursor:
+        cursor.execute(TAG_STATISTICS_SQL.format(scope=scope), params)
+        for scope_type, scope_id, tag_uses, distinct_tags in cursor.fetchall():
+            # Projects without any topics are grouped under a null topic:
+            if scope_type is None or scope_id is not None:
+                tag_statistics[scope_type, scope_id] = {
+                    "tag_uses": tag_uses,
+                    "distinct_tags": distinct_tags,
+                }
+
+    return tag_statistics
+
+
+def get_report_statistics(scope_type=None, scope_ids=None):
+    """
+    Return a mapping of {scope ID: {SiteReport field name: value}}
+
+    If scope_type is None the statistics cover the entire site and are stored
+    under the key None. Otherwise scope_ids may restrict the calculation to
+    specific campaigns or topics. Scopes without any matching records will
+    receive zero counts.
+    """
+
+    defaults = {}
+    results = defaultdict(dict)
+
+    for model, aggregates in get_report_aggregates():
+        defaults.update(dict.fromkeys(aggregates, 0))
+
+        qs = model.objects.order_by()
+
+        if scope_type is None:
+            results[None].update(qs.aggregate(**aggregates))
+            continue
+
+        scope_path = SCOPE_PATHS[scope_type][model]
+        if scope_ids is not None:
+            qs = qs.filter(**{f"{scope_path}__in": scope_ids})
+
+        for row in qs.values(scope_id=F(scope_path)).annotate(**aggregates):
+            results[row.pop("scope_id")].update(row)
+
+    if scope_type == "campaign":
+        defaults["registered_contributors"] = 0
+        for campaign_id, row in get_campaign_contributor_counts(scope_ids).items():
+            results[campaign_id].update(row)
+
+    statistics = defaultdict(lambda: dict(defaults))
+    for scope_id, row in results.items():
+        statistics[scope_id].update(row)
+    return statistics
+
+
+def get_site_wide_statistics():
+    """
+    Return the statistics which are only included in the site-wide report
+    """
+
+    return {
+        # The site-wide report includes tags which are not currently used:
+        "distinct_tags": Tag.objects.count(),
+        **Campaign.objects.aggregate(
+            campaigns_published=Count("pk", filter=Q(published=True)),
+            campaigns_unpublished=Count("pk", filter=Q(published=False)),
+        ),
+        **User.objects.aggregate(
+            users_registered=Count("pk"),
+            users_activated=Count("pk", filter=Q(is_active=True)),
+        ),
+    }
+
+
+def build_site_wide_report(tag_statistics):
+    return SiteReport(
+        **{
+            **get_report_statistics()[None],
+            **tag_statistics.get((None, None), TAG_STATISTICS_DEFAULTS),
+            **get_site_wide_statistics(),
+        }
+    )
+
+
+def build_scope_reports(scope_type, tag_statistics, scope_ids=None):
+    """
+    Return a SiteReport for each of the specified campaigns or topics, or all of
+    them if scope_ids is None
+    """
+
+    scopes = SCOPE_MODELS[scope_type].objects.order_by("pk")
+    if scope_ids is not None:
+        scope_ids = list(scope_ids)
+        scopes = scopes.filter(pk__in=scope_ids)
+
+    statistics = get_report_statistics(scope_type, scope_ids)
+
+    return [
+        SiteReport(
+            **{f"{scope_type}_id": scope_id},
+            **statistics[scope_id],
+            **tag_statistics.get((scope_type, scope_id), TAG_STATISTICS_DEFAULTS),
+        )
+        for scope_id in scopes.values_list("pk", flat=True)
+    ]
+
+
+@in_report_snapshot
+def build_site_reports(*, site=True, campaign_ids=None, topic_ids=None):
+    """
+    Return unsaved SiteReport instances for the entire site and every campaign
+    and topic
+
+    campaign_ids and topic_ids may be used to restrict the reports to specific
+    scopes, with an empty list skipping that type entirely.
+    """
+
+    event_snapshot = get_event_snapshot()
+    reports = []
+
+    if site or campaign_ids is None or topic_ids is None:
+        tag_statistics = get_tag_statistics()
+    else:
+        tag_statistics = get_tag_statistics(campaign_ids, topic_ids)
+
+    if site:
+        reports.append(build_site_wide_report(tag_statistics))
+
+    for scope_type, scope_ids in (("campaign", campaign_ids), ("topic", topic_ids)):
+        if scope_ids is None or scope_ids:
+            reports.extend(build_scope_reports(scope_type, tag_statistics, scope_ids))
+
+    for report in reports:
+        report.event_snapshot = event_snapshot
+
+    logger.debug("Calculated %d site reports", len(reports))
+
+    return reports
+
+
+def get_latest_reports(scope_type=None):
+    """
+    Return a mapping of {scope ID: SiteReport} with the most recent report for
+    each campaign or topic, or for the entire site if scope_type is None
+    """
+
+    if scope_type is None:
+        # Reports for deleted campaigns and topics also have neither set so we
+        # identify the site-wide reports by their site-only statistics:
+        report = (
+            SiteReport.objects.filter(
+                campaign=None, topic=None, users_registered__isnull=False
+            )
+            .order_by("-created_on")
+            .first()
+        )
+        return {None: report} if report else {}
+
+    scope_field = f"{scope_type}_id"
+    reports = (
+        SiteReport.objects.filter(**{f"{scope_field}__isnull": False})
+        .order_by(scope_field, "-created_on")
+        .distinct(scope_field)
+    )
+    return {getattr(report, scope_field): report for report in reports}
+
+
+def get_event_deltas(scope_type=None):
+    """
+    Return a mapping of {scope ID: (recalculate, {field name: delta})} for the
+    events recorded since the latest report for each scope
+
+    Scopes without any events since their latest report are not included.
+    """
+
+    event_deltas = {}
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            EVENT_DELTAS_SQL.format(**EVENT_DELTAS_SCOPES[scope_type]),
+            {"recalculate": SiteReportEvent.EventType.RECALCULATE},
+        )
+        for scope_id, field_name, delta, recalculate in cursor.fetchall():
+            if scope_type is None:
+                scope_id = None
+            scope_recalculate, deltas = event_deltas.get(scope_id, (False, {}))
+            if field_name is not None:
+                deltas[field_name] = delta
+            event_deltas[scope_id] = (scope_recalculate or recalculate, deltas)
+
+    return event_deltas
+
+
+@in_report_snapshot
+def build_incremental_site_reports():
+    """
+    Return unsaved SiteReport instances for the entire site and every campaign
+    and topic by applying the SiteReportEvent deltas to their latest reports
+
+    Scopes without a previous report or with recalculation events are reported
+    from scratch, as are the statistics which cannot be maintained using deltas.
+    """
+
+    event_snapshot = get_event_snapshot()
+    incremental_reports = {}
+    updated_scope_ids = {None: [], "campaign": [], "topic": []}
+    rebuilt_scope_ids = {None: [], "campaign": [], "topic": []}
+
+    for scope_type in (None, "campaign", "topic"):
+        latest_reports = get_latest_reports(scope_type)
+        event_deltas = get_event_deltas(scope_type)
+
+        if scope_type is None:
+            scope_ids = [None]
+        else:
+            scope_ids = (
+                SCOPE_MODELS[scope_type]
+                .objects.order_by("pk")
+                .values_list("pk", flat=True)
+            )
+
+        for scope_id in scope_ids:
+            latest_report = latest_reports.get(scope_id)
+            recalculate, deltas = event_deltas.get(scope_id, (False, {}))
+
+            # Reports from before event snapshots were recorded cannot be
+            # updated either:
+            if latest_report is None or not latest_report.event_snapshot or recalculate:
+                rebuilt_scope_ids[scope_type].append(scope_id)
+                continue
+
+            report = SiteReport(
+                **{
+                    field.attname: getattr(latest_report, field.attname)
+                    for field in SiteReport._meta.concrete_fields
+                    if field.attname
+                    not in ("id", "created_on", "report_run", "event_snapshot")
+                },
+                event_snapshot=event_snapshot,
+            )
+            for field_name, delta in deltas.items():
+                setattr(report, field_name, (getattr(report, field_name) or 0) + delta)
+            incremental_reports[scope_type, scope_id] = report
+
+            if deltas:
+                updated_scope_ids[scope_type].append(scope_id)
+
+    # Distinct tags and contributors cannot be counted using deltas so they are
+    # recalculated for the scopes which have changed:
+    if updated_scope_ids[None]:
+        for field_name, value in get_site_wide_statistics().items():
+            setattr(incremental_reports[None, None], field_name, value)
+
+    if updated_scope_ids["campaign"] or updated_scope_ids["topic"]:
+        tag_statistics = get_tag_statistics(
+            updated_scope_ids["campaign"], updated_scope_ids["topic"]
+        )
+        for scope_type in ("campaign", "topic"):
+            for scope_id in updated_scope_ids[scope_type]:
+                incremental_reports[scope_type, scope_id].distinct_tags = (
+                    tag_statistics.get((scope_type, scope_id), TAG_STATISTICS_DEFAULTS)[
+                        "distinct_tags"
+                    ]
+                )
+
+    if updated_scope_ids["campaign"]:
+        contributor_counts = get_campaign_contributor_counts(
+            updated_scope_ids["campaign"]
+        )
+        for campaign_id in updated_scope_ids["campaign"]:
+            incremental_reports["campaign", campaign_id].registered_contributors = (
+                contributor_counts.get(campaign_id, {}).get(
+                    "registered_contributors", 0
+                )
+            )
+
+    reports = list(incremental_reports.values())
+    reports.extend(
+        build_site_reports(
+            site=bool(rebuilt_scope_ids[None]),
+            campaign_ids=rebuilt_scope_ids["campaign"],
+            topic_ids=rebuilt_scope_ids["topic"],
+        )
+    )
+
+    logger.debug(
+        "Calculated %d incremental site reports, rebuilding %d campaigns and %d"
+        " topics",
+        len(reports),
+        len(rebuilt_scope_ids["campaign"]),
+        len(rebuilt_scope_ids["topic"]),
+    )
+
+    return reports
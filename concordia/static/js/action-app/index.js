@@ -310,71 +310,37 @@ export class ActionApp {
         console.info(`Connecting to ${assetSocketURL}`);
         let assetSocket = (this.assetSocket = new WebSocket(assetSocketURL));
 
+        assetSocket.addEventListener('open', () => {
+            // The action app lists assets from every campaign so it needs
+            // updates for all of them rather than a single scope:
+            assetSocket.send(
+                JSON.stringify({type: 'subscribe', scope_type: 'all'})
+            );
+        });
+
         assetSocket.addEventListener('message', (rawMessage) => {
             console.debug('Asset socket message:', rawMessage);
 
             let data = JSON.parse(rawMessage.data);
-            let message = data.message;
-            let assetId = message.asset_pk;
-
-            switch (message.type) {
-                case 'asset_update': {
-                    let assetUpdate = {
-                        sent: data.sent,
-                        difficulty: message.difficulty,
-                        latest_transcription: message.latest_transcription,
-                        status: message.status,
-                    };
 
-                    this.mergeAssetUpdate(assetId, assetUpdate);
-
-                    break;
-                }
-                case 'asset_reservation_obtained':
-                    /*
-                    If the user is anonymous, or if the user is logged in and
-                    is not the same as the user who obtained the reservation,
-                    then mark it unavailable
-                    */
-
-                    this.mergeAssetUpdate(assetId, {
-                        reservationToken: message.reservation_token,
+            if (data.message.type == 'asset_reservations_released') {
+                // Expired reservations are released in batches:
+                data.message.reservations.forEach((reservation) => {
+                    this.handleAssetSocketMessage(data.sent, {
+                        type: 'asset_reservation_released',
+                        ...reservation,
                     });
-
-                    break;
-                case 'asset_reservation_released':
-                    this.mergeAssetUpdate(assetId, {
-                        reservationToken: null,
+                });
+            } else if (data.message.type == 'asset_updates') {
+                // Asset changes are coalesced by the server and sent in batches:
+                data.message.updates.forEach((update) => {
+                    this.handleAssetSocketMessage(data.sent, {
+                        type: 'asset_update',
+                        ...update,
                     });
-
-                    if (this.openAssetId && this.openAssetId == assetId) {
-                        this.reserveAsset();
-                    }
-
-                    break;
-                default:
-                    console.warn(
-                        `Unknown message type ${message.type}: ${message}`
-                    );
-            }
-
-            if (this.openAssetId && assetId == this.openAssetId) {
-                // Someone may be looking at an asset even if they have not
-                // locked it and this provides real-time updates:
-                this.updateViewer();
-            }
-
-            if (typeof this.assetList.lookup == 'undefined') {
-                console.warn(
-                    `Expected this.assetList to be an initialized List but found ${this.assetList}`
-                );
+                });
             } else {
-                let assetListItem = this.assetList.lookup[assetId];
-                if (assetListItem) {
-                    // If this is visible, we want to update the displayed asset
-                    // list icon using the current value:
-                    assetListItem.update(this.getAssetData(assetId));
-                }
+                this.handleAssetSocketMessage(data.sent, data.message);
             }
         });
 
@@ -388,6 +354,75 @@ export class ActionApp {
         };
     }
 
+    handleAssetSocketMessage(sent, message) {
+        let assetId = message.asset_pk;
+
+        switch (message.type) {
+            case 'asset_update': {
+                let assetUpdate = {
+                    sent: sent,
+                    difficulty: message.difficulty,
+                    latest_transcription: message.latest_transcription,
+                    status: message.status,
+                };
+
+                this.mergeAssetUpdate(assetId, assetUpdate);
+
+                break;
+            }
+            case 'asset_reservation_obtained':
+                /*
+                If the user is anonymous, or if the user is logged in and
+                is not the same as the user who obtained the reservation,
+                then mark it unavailable
+                */
+
+                this.mergeAssetUpdate(assetId, {
+                    reservationToken: message.reservation_token,
+                });
+
+                break;
+            case 'asset_reservation_released':
+                this.mergeAssetUpdate(assetId, {
+                    reservationToken: null,
+                });
+
+                if (this.openAssetId && this.openAssetId == assetId) {
+                    this.reserveAsset();
+                }
+
+                break;
+            case 'asset_subscription_status':
+                console.debug(
+                    `Subscribed to ${message.scope_type} asset updates: ${message.subscribed}`
+                );
+                break;
+            default:
+                console.warn(
+                    `Unknown message type ${message.type}: ${message}`
+                );
+        }
+
+        if (this.openAssetId && assetId == this.openAssetId) {
+            // Someone may be looking at an asset even if they have not
+            // locked it and this provides real-time updates:
+            this.updateViewer();
+        }
+
+        if (typeof this.assetList.lookup == 'undefined') {
+            console.warn(
+                `Expected this.assetList to be an initialized List but found ${this.assetList}`
+            );
+        } else {
+            let assetListItem = this.assetList.lookup[assetId];
+            if (assetListItem) {
+                // If this is visible, we want to update the displayed asset
+                // list icon using the current value:
+                assetListItem.update(this.getAssetData(assetId));
+            }
+        }
+    }
+
     refreshData() {
         console.time('Refreshing asset editability');
 
@@ -1,9 +1,37 @@
 /* global jQuery displayMessage displayHtmlMessage buildErrorMessage */
 /* exported attemptToReserveAsset */
 
-function attemptToReserveAsset(reservationURL, findANewPageURL, actionType) {
+function handleReservationStatus(status, findANewPageURL, actionType) {
     var $transcriptionEditor = jQuery('#transcription-editor');
 
+    if (status == 'obtained' || status == 'renewed') {
+        $transcriptionEditor
+            .data('hasReservation', true)
+            .trigger('update-ui-state');
+        return true;
+    }
+
+    if (status == 'conflict' && actionType != 'transcribe') {
+        displayHtmlMessage(
+            'warning',
+            'There are other reviewers on this page.' +
+                ' <a href="' +
+                findANewPageURL +
+                '">Find a new page to review</a>',
+            'transcription-reservation'
+        );
+    } else {
+        // Another user holds the reservation or ours has been tombstoned:
+        $transcriptionEditor
+            .data('hasReservation', false)
+            .trigger('update-ui-state');
+        jQuery('#asset-reservation-failure-modal').modal();
+    }
+
+    return false;
+}
+
+function reserveAssetOverHTTP(reservationURL, findANewPageURL, actionType) {
     jQuery
         .ajax({
             url: reservationURL,
@@ -11,13 +39,11 @@ function attemptToReserveAsset(reservationURL, findANewPageURL, actionType) {
             dataType: 'json',
         })
         .done(function () {
-            $transcriptionEditor
-                .data('hasReservation', true)
-                .trigger('update-ui-state');
+            handleReservationStatus('renewed', findANewPageURL, actionType);
 
             // If the asset was successfully reserved, continue reserving it
             window.setTimeout(
-                attemptToReserveAsset,
+                reserveAssetOverHTTP,
                 60000,
                 reservationURL,
                 findANewPageURL,
@@ -26,26 +52,17 @@ function attemptToReserveAsset(reservationURL, findANewPageURL, actionType) {
         })
         .fail(function (jqXHR, textStatus, errorThrown) {
             if (jqXHR.status == 409) {
-                if (actionType == 'transcribe') {
-                    $transcriptionEditor
-                        .data('hasReservation', false)
-                        .trigger('update-ui-state');
-                    jQuery('#asset-reservation-failure-modal').modal();
-                } else {
-                    displayHtmlMessage(
-                        'warning',
-                        'There are other reviewers on this page.' +
-                            ' <a href="' +
-                            findANewPageURL +
-                            '">Find a new page to review</a>',
-                        'transcription-reservation'
-                    );
-                }
+                handleReservationStatus(
+                    'conflict',
+                    findANewPageURL,
+                    actionType
+                );
             } else if (jqXHR.status == 408) {
-                $transcriptionEditor
-                    .data('hasReservation', false)
-                    .trigger('update-ui-state');
-                jQuery('#asset-reservation-failure-modal').modal();
+                handleReservationStatus(
+                    'tombstoned',
+                    findANewPageURL,
+                    actionType
+                );
             } else {
                 displayMessage(
                     'error',
@@ -55,25 +72,130 @@ function attemptToReserveAsset(reservationURL, findANewPageURL, actionType) {
                 );
             }
         });
+}
 
-    window.addEventListener('beforeunload', function () {
-        var payload = {
-            release: true,
-            csrfmiddlewaretoken: jQuery(
-                'input[name="csrfmiddlewaretoken"]'
-            ).val(),
-        };
-
-        // We'll try Beacon since that's reliable but until we can drop support for IE11 we need a fallback:
-        if ('sendBeacon' in navigator) {
-            navigator.sendBeacon(
+function releaseAssetOverHTTP(reservationURL) {
+    var payload = {
+        release: true,
+        csrfmiddlewaretoken: jQuery('input[name="csrfmiddlewaretoken"]').val(),
+    };
+
+    // We'll try Beacon since that's reliable but until we can drop support for IE11 we need a fallback:
+    if ('sendBeacon' in navigator) {
+        navigator.sendBeacon(
+            reservationURL,
+            new Blob([jQuery.param(payload)], {
+                type: 'application/x-www-form-urlencoded',
+            })
+        );
+    } else {
+        jQuery.ajax({url: reservationURL, type: 'POST', data: payload});
+    }
+}
+
+function reserveAssetOverSocket(
+    assetId,
+    reservationURL,
+    findANewPageURL,
+    actionType
+) {
+    /*
+    The server renews the reservation when we send a heartbeat and releases it
+    as soon as the last socket for our session closes. If the socket cannot be
+    opened at all, or the server cannot reserve over it because we do not have
+    a session yet, we fall back to polling the reservation view.
+    */
+
+    var socketURL =
+        (window.location.protocol == 'https:' ? 'wss://' : 'ws://') +
+        window.location.host +
+        '/ws/asset/asset_updates/';
+    var socket = new WebSocket(socketURL);
+    var opened = false;
+    var unavailable = false;
+    var finished = false;
+    var heartbeat;
+
+    var sendReservationMessage = function (messageType) {
+        socket.send(JSON.stringify({type: messageType, asset_pk: assetId}));
+    };
+
+    socket.addEventListener('open', function () {
+        opened = true;
+        sendReservationMessage('reserve');
+        heartbeat = window.setInterval(sendReservationMessage, 60000, 'renew');
+    });
+
+    socket.addEventListener('message', function (event) {
+        var message = JSON.parse(event.data).message;
+
+        if (
+            message.type != 'asset_reservation_status' ||
+            message.asset_pk != assetId
+        ) {
+            return;
+        }
+
+        if (message.status == 'unavailable') {
+            unavailable = true;
+            socket.close();
+        } else if (
+            !handleReservationStatus(
+                message.status,
+                findANewPageURL,
+                actionType
+            )
+        ) {
+            // Like the HTTP version, we stop trying after a failure:
+            finished = true;
+            socket.close();
+        }
+    });
+
+    socket.addEventListener('close', function () {
+        window.clearInterval(heartbeat);
+
+        if (finished) {
+            return;
+        } else if (opened && !unavailable) {
+            window.setTimeout(
+                reserveAssetOverSocket,
+                1000,
+                assetId,
                 reservationURL,
-                new Blob([jQuery.param(payload)], {
-                    type: 'application/x-www-form-urlencoded',
-                })
+                findANewPageURL,
+                actionType
             );
         } else {
-            jQuery.ajax({url: reservationURL, type: 'POST', data: payload});
+            reserveAssetOverHTTP(reservationURL, findANewPageURL, actionType);
+            window.addEventListener('beforeunload', function () {
+                releaseAssetOverHTTP(reservationURL);
+            });
         }
     });
+
+    window.addEventListener('beforeunload', function () {
+        finished = true;
+    });
+}
+
+function attemptToReserveAsset(
+    reservationURL,
+    findANewPageURL,
+    actionType,
+    assetId
+) {
+    if (assetId && 'WebSocket' in window) {
+        reserveAssetOverSocket(
+            assetId,
+            reservationURL,
+            findANewPageURL,
+            actionType
+        );
+    } else {
+        reserveAssetOverHTTP(reservationURL, findANewPageURL, actionType);
+        window.addEventListener('beforeunload', function () {
+            releaseAssetOverHTTP(reservationURL);
+        });
+    }
 }
@@ -1,12 +1,14 @@
 import datetime
+import uuid
 from logging import getLogger
+from timeit import default_timer
 
 from celery import chord
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.management import call_command
-from django.db import transaction
-from django.db.models import Count, F, Q
+from django.db import connection, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from more_itertools.more import chunked
 
@@ -18,66 +20,81 @@ from concordia.models import (
     Item,
     Project,
     SiteReport,
+    SiteReportEvent,
     Tag,
     Topic,
     Transcription,
     UserAssetTagCollection,
+    UserProfileActivityDelta,
     UserRetiredCampaign,
 )
-from concordia.signals.signals import reservation_released
-from concordia.utils import get_anonymous_user
+from concordia.reservation_backends import get_reservation_backend
+from concordia.signals.signals import reservations_released
+from concordia.site_reports import build_incremental_site_reports, build_site_reports
+from concordia.transcription_history import compact_transcriptions
+from concordia.utils import get_redis_connection
 
 from .celery import app as celery_app
 
 logger = getLogger(__name__)
 
 
+def send_reservations_released(sender, released_reservations):
+    """
+    Notify WebSocket listeners about released reservations in batches rather
+    than sending one message per reservation
+    """
+
+    for chunk in chunked(released_reservations, 500):
+        reservations_released.send(
+            sender=sender,
+            reservations=[
+                {"asset_pk": asset_pk, "reservation_token": reservation_token}
+                for asset_pk, reservation_token in chunk
+            ],
+        )
+
+
 @celery_app.task
 def expire_inactive_asset_reservations():
-    timestamp = datetime.datetime.now()
+    expired_reservations = get_reservation_backend().expire()
 
-    # Clear old reservations, with a grace period:
-    cutoff = timestamp - (
-        datetime.timedelta(seconds=2 * settings.TRANSCRIPTION_RESERVATION_SECONDS)
-    )
-
-    logger.debug("Clearing reservations with last reserve time older than %s" % cutoff)
-    expired_reservations = AssetTranscriptionReservation.objects.filter(
-        updated_on__lt=cutoff, tombstoned__in=(None, False)
-    )
+    logger.debug("Expired %d reservations", len(expired_reservations))
 
-    for reservation in expired_reservations:
-        logger.debug(
-            "Expired reservation with token %s" % reservation.reservation_token
-        )
-        reservation_released.send(
-            sender="reserve_asset",
-            asset_pk=reservation.asset.pk,
-            reservation_token=reservation.reservation_token,
-        )
-        reservation.delete()
+    send_reservations_released("reserve_asset", expired_reservations)
 
 
 @celery_app.task
 def tombstone_old_active_asset_reservations():
-    timestamp = datetime.datetime.now()
+    timestamp = timezone.now()
 
     cutoff = timestamp - (
         datetime.timedelta(hours=settings.TRANSCRIPTION_RESERVATION_TOMBSTONE_HOURS)
     )
 
-    old_reservations = AssetTranscriptionReservation.objects.filter(
-        created_on__lt=cutoff, tombstoned__in=(None, False)
-    )
-    for reservation in old_reservations:
-        logger.debug("Tombstoning reservation %s " % reservation.reservation_token)
-        reservation.tombstoned = True
-        reservation.save()
+    # The tombstone period is measured from updated_on so we update it at the
+    # same time. Tombstoned reservations no longer block other users so we'll
+    # let the WebSocket listeners know that these assets are available:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            UPDATE concordia_assettranscriptionreservation
+            SET tombstoned = TRUE, updated_on = %s
+            WHERE created_on < %s AND tombstoned IS NOT TRUE
+            RETURNING asset_id, reservation_token
+            """,
+            [timestamp, cutoff],
+        )
+        tombstoned_reservations = cursor.fetchall()
+
+    logger.debug("Tombstoned %d reservations", len(tombstoned_reservations))
+
+    send_reservations_released("reserve_asset", tombstoned_reservations)
 
 
 @celery_app.task
 def delete_old_tombstoned_reservations():
-    timestamp = datetime.datetime.now()
+    timestamp = timezone.now()
 
     cutoff = timestamp - (
         datetime.timedelta(
@@ -85,252 +102,230 @@ def delete_old_tombstoned_reservations():
         )
     )
 
-    old_reservations = AssetTranscriptionReservation.objects.filter(
+    deleted_count, _ = AssetTranscriptionReservation.objects.filter(
         tombstoned__exact=True, updated_on__lt=cutoff
-    )
-    for reservation in old_reservations:
-        logger.debug(
-            "Deleting old tombstoned reservation %s" % reservation.reservation_token
-        )
-        reservation.delete()
+    ).delete()
+
+    logger.debug("Deleted %d old tombstoned reservations", deleted_count)
 
 
 @celery_app.task
-def site_report():
-    report = {
-        "assets_not_started": 0,
-        "assets_in_progress": 0,
-        "assets_submitted": 0,
-        "assets_completed": 0,
-    }
-
-    asset_count_qs = Asset.objects.values_list("transcription_status").annotate(
-        Count("transcription_status")
-    )
-    for status, count in asset_count_qs:
-        logger.debug("Assets %s: %d", status, count)
-        report[f"assets_{status}"] = count
-
-    assets_total = Asset.objects.count()
-    assets_published = Asset.objects.published().count()
-    assets_unpublished = Asset.objects.unpublished().count()
-
-    items_published = Item.objects.published().count()
-    items_unpublished = Item.objects.unpublished().count()
-
-    projects_published = Project.objects.published().count()
-    projects_unpublished = Project.objects.unpublished().count()
-
-    campaigns_published = Campaign.objects.published().count()
-    campaigns_unpublished = Campaign.objects.unpublished().count()
-
-    users_registered = User.objects.all().count()
-    users_activated = User.objects.filter(is_active=True).count()
-
-    anonymous_transcriptions = Transcription.objects.filter(
-        user=get_anonymous_user()
-    ).count()
-    transcriptions_saved = Transcription.objects.all().count()
-
-    stats = UserAssetTagCollection.objects.aggregate(Count("tags"))
-    tag_count = stats["tags__count"]
-
-    distinct_tag_count = Tag.objects.all().count()
-
-    site_report = SiteReport()
-    site_report.assets_total = assets_total
-    site_report.assets_published = assets_published
-    site_report.assets_not_started = report["assets_not_started"]
-    site_report.assets_in_progress = report["assets_in_progress"]
-    site_report.assets_waiting_review = report["assets_submitted"]
-    site_report.assets_completed = report["assets_completed"]
-    site_report.assets_unpublished = assets_unpublished
-    site_report.items_published = items_published
-    site_report.items_unpublished = items_unpublished
-    site_report.projects_published = projects_published
-    site_report.projects_unpublished = projects_unpublished
-    site_report.anonymous_transcriptions = anonymous_transcriptions
-    site_report.transcriptions_saved = transcriptions_saved
-    site_report.distinct_tags = distinct_tag_count
-    site_report.tag_uses = tag_count
-    site_report.campaigns_published = campaigns_published
-    site_report.campaigns_unpublished = campaigns_unpublished
-    site_report.users_registered = users_registered
-    site_report.users_activated = users_activated
-    site_report.save()
-
-    for campaign in Campaign.objects.all():
-        campaign_report(campaign)
-
-    for topic in Topic.objects.all():
-        topic_report(topic)
-
-
-def topic_report(topic):
-    report = {
-        "assets_not_started": 0,
-        "assets_in_progress": 0,
-        "assets_submitted": 0,
-        "assets_completed": 0,
-    }
-
-    asset_count_qs = (
-        Asset.objects.filter(item__project__topics=topic)
-        .values_list("transcription_status")
-        .annotate(Count("transcription_status"))
-    )
+def site_report(report_run=None):
+    """
+    Generate the SiteReport rows for the entire site and every campaign and topic
 
-    for status, count in asset_count_qs:
-        logger.debug("Topic %s assets %s: %d", topic.slug, status, count)
-        report[f"assets_{status}"] = count
+    Each campaign and topic is reported by a separate subtask so the work can be
+    spread across workers, and the site-wide report is saved once all of them
+    have completed. Every report is tagged with the report run so retrying the
+    task with the same report_run only calculates the missing reports.
+    """
 
-    assets_total = Asset.objects.filter(item__project__topics=topic).count()
-    assets_published = (
-        Asset.objects.published().filter(item__project__topics=topic).count()
-    )
-    assets_unpublished = (
-        Asset.objects.unpublished().filter(item__project__topics=topic).count()
-    )
+    if report_run is None:
+        report_run = str(uuid.uuid4())
 
-    items_published = Item.objects.published().filter(project__topics=topic).count()
-    items_unpublished = Item.objects.unpublished().filter(project__topics=topic).count()
+    subtasks = [
+        scope_site_report.si(report_run, scope_type, scope_id)
+        for scope_type, model in (("campaign", Campaign), ("topic", Topic))
+        for scope_id in model.objects.order_by("pk").values_list("pk", flat=True)
+    ]
 
-    projects_published = Project.objects.published().filter(topics=topic).count()
-    projects_unpublished = Project.objects.unpublished().filter(topics=topic).count()
+    logger.info("Starting site report %s with %d subtasks", report_run, len(subtasks))
 
-    anonymous_transcriptions = Transcription.objects.filter(
-        asset__item__project__topics=topic, user=get_anonymous_user()
-    ).count()
-    transcriptions_saved = Transcription.objects.filter(
-        asset__item__project__topics=topic
-    ).count()
+    if subtasks:
+        chord(subtasks)(site_wide_report.si(report_run))
+    else:
+        site_wide_report.delay(report_run)
 
-    asset_tag_collections = UserAssetTagCollection.objects.filter(
-        asset__item__project__topics=topic
-    )
+    return report_run
 
-    stats = asset_tag_collections.order_by().aggregate(tag_count=Count("tags"))
-    tag_count = stats["tag_count"]
-
-    distinct_tag_list = set()
-
-    for tag_collection in asset_tag_collections:
-        distinct_tag_list.update(tag_collection.tags.values_list("pk", flat=True))
-
-    distinct_tag_count = len(distinct_tag_list)
-
-    site_report = SiteReport()
-    site_report.topic = topic
-    site_report.assets_total = assets_total
-    site_report.assets_published = assets_published
-    site_report.assets_not_started = report["assets_not_started"]
-    site_report.assets_in_progress = report["assets_in_progress"]
-    site_report.assets_waiting_review = report["assets_submitted"]
-    site_report.assets_completed = report["assets_completed"]
-    site_report.assets_unpublished = assets_unpublished
-    site_report.items_published = items_published
-    site_report.items_unpublished = items_unpublished
-    site_report.projects_published = projects_published
-    site_report.projects_unpublished = projects_unpublished
-    site_report.anonymous_transcriptions = anonymous_transcriptions
-    site_report.transcriptions_saved = transcriptions_saved
-    site_report.distinct_tags = distinct_tag_count
-    site_report.tag_uses = tag_count
-    site_report.save()
-
-
-def campaign_report(campaign):
-    report = {
-        "assets_not_started": 0,
-        "assets_in_progress": 0,
-        "assets_submitted": 0,
-        "assets_completed": 0,
-    }
-
-    asset_count_qs = (
-        Asset.objects.filter(item__project__campaign=campaign)
-        .values_list("transcription_status")
-        .annotate(Count("transcription_status"))
-    )
 
-    for status, count in asset_count_qs:
-        logger.debug("Campaign %s assets %s: %d", campaign.slug, status, count)
-        report[f"assets_{status}"] = count
+@celery_app.task
+def scope_site_report(report_run, scope_type, scope_id):
+    """
+    Save the SiteReport for a single campaign or topic in a site report run
+    """
 
-    assets_total = Asset.objects.filter(item__project__campaign=campaign).count()
-    assets_published = (
-        Asset.objects.published().filter(item__project__campaign=campaign).count()
-    )
-    assets_unpublished = (
-        Asset.objects.unpublished().filter(item__project__campaign=campaign).count()
-    )
+    if SiteReport.objects.filter(
+        report_run=report_run, **{f"{scope_type}_id": scope_id}
+    ).exists():
+        logger.info(
+            "Site report %s already includes %s %s", report_run, scope_type, scope_id
+        )
+        return
+
+    start_time = default_timer()
 
-    items_published = (
-        Item.objects.published().filter(project__campaign=campaign).count()
+    reports = build_site_reports(
+        site=False,
+        campaign_ids=[scope_id] if scope_type == "campaign" else [],
+        topic_ids=[scope_id] if scope_type == "topic" else [],
     )
-    items_unpublished = (
-        Item.objects.published().filter(project__campaign=campaign).count()
+    for report in reports:
+        report.report_run = report_run
+
+    # A concurrent retry of this subtask may already have saved the same report:
+    SiteReport.objects.bulk_create(reports, ignore_conflicts=True)
+
+    logger.debug(
+        "Saved site report %s for %s %s in %0.1f seconds",
+        report_run,
+        scope_type,
+        scope_id,
+        default_timer() - start_time,
     )
 
-    projects_published = Project.objects.published().filter(campaign=campaign).count()
-    projects_unpublished = (
-        Project.objects.unpublished().filter(campaign=campaign).count()
+
+@celery_app.task(ignore_result=True)
+def site_wide_report(report_run):
+    """
+    Save the site-wide SiteReport after every campaign and topic was reported
+    """
+
+    if SiteReport.objects.filter(
+        report_run=report_run, campaign=None, topic=None
+    ).exists():
+        logger.info("Site report %s has already been completed", report_run)
+        return
+
+    (report,) = build_site_reports(campaign_ids=[], topic_ids=[])
+    report.report_run = report_run
+    report.save()
+
+    deleted_count = SiteReportEvent.objects.delete_reported(report_run)
+
+    logger.info(
+        "Completed site report %s and deleted %d old events",
+        report_run,
+        deleted_count,
     )
 
-    anonymous_transcriptions = Transcription.objects.filter(
-        asset__item__project__campaign=campaign, user=get_anonymous_user()
-    ).count()
-    transcriptions_saved = Transcription.objects.filter(
-        asset__item__project__campaign=campaign
-    ).count()
 
-    asset_tag_collections = UserAssetTagCollection.objects.filter(
-        asset__item__project__campaign=campaign
+@celery_app.task
+def incremental_site_report():
+    """
+    Generate the SiteReport rows by applying the changes recorded since the
+    previous reports
+
+    This is much cheaper than site_report, which should still be run
+    periodically to verify the incremental reports and provide a new baseline.
+    """
+
+    start_time = default_timer()
+
+    report_run = uuid.uuid4()
+    reports = build_incremental_site_reports()
+    for report in reports:
+        report.report_run = report_run
+    SiteReport.objects.bulk_create(reports)
+
+    logger.info(
+        "Saved %d incremental site reports in %0.1f seconds",
+        len(reports),
+        default_timer() - start_time,
     )
 
-    stats = asset_tag_collections.order_by().aggregate(tag_count=Count("tags"))
-    tag_count = stats["tag_count"]
+    return str(report_run)
 
-    distinct_tag_list = set()
 
-    for tag_collection in asset_tag_collections:
-        distinct_tag_list.update(tag_collection.tags.values_list("pk", flat=True))
+@celery_app.task(ignore_result=True)
+def flush_user_profile_activity():
+    """
+    Apply the buffered changes to the UserProfileActivity counts
+
+    This should be scheduled to run every few minutes. The profile page
+    includes pending changes so users see their own activity immediately.
+    """
+
+    updated_count = UserProfileActivityDelta.objects.flush()
 
-    distinct_tag_count = len(distinct_tag_list)
+    logger.debug("Flushed activity changes for %d users and campaigns", updated_count)
 
-    campaign_assets = Asset.objects.filter(
-        item__project__campaign=campaign,
-        item__project__published=True,
-        item__published=True,
-        published=True,
+
+@celery_app.task
+def compact_transcription_history(min_age_days=None):
+    """
+    Replace the text of old superseded transcriptions with compressed deltas
+
+    Transcriptions which have not changed for min_age_days, which defaults to
+    the TRANSCRIPTION_COMPACTION_MIN_AGE_DAYS setting, are compacted.
+    """
+
+    if min_age_days is None:
+        min_age_days = settings.TRANSCRIPTION_COMPACTION_MIN_AGE_DAYS
+
+    compacted_count = compact_transcriptions(
+        updated_before=timezone.now() - datetime.timedelta(days=min_age_days)
     )
-    asset_transcriptions = Transcription.objects.filter(
-        asset__in=campaign_assets
-    ).values_list("user_id", "reviewed_by")
-    user_ids = set(
-        [user_id for transcription in asset_transcriptions for user_id in transcription]
+
+    logger.info("Compacted the text of %d transcriptions", compacted_count)
+
+    return compacted_count
+
+
+#: Redis set of the asset IDs waiting for their difficulty to be recalculated
+DIFFICULTY_QUEUE_KEY = "concordia:difficulty:queued-assets"
+#: Set while a recalculate_queued_difficulty_values task is waiting to run
+DIFFICULTY_SCHEDULED_KEY = "concordia:difficulty:scheduled"
+
+
+def queue_difficulty_recalculation(asset_ids):
+    """
+    Recalculate the difficulty values for the assets shortly after the current
+    transaction commits
+
+    Changes made within DIFFICULTY_RECALCULATION_DELAY_SECONDS of each other are
+    handled by the same task rather than updating each asset as it is saved.
+    """
+
+    asset_ids = list(asset_ids)
+    delay = settings.DIFFICULTY_RECALCULATION_DELAY_SECONDS
+
+    def queue():
+        # The change has already been committed so a failure here must not turn
+        # the request into an error. The calculate_incremental_difficulty_values
+        # task will pick up the change on its next run instead:
+        try:
+            redis = get_redis_connection()
+            redis.sadd(DIFFICULTY_QUEUE_KEY, *asset_ids)
+
+            # The expiration ensures that a lost task can only delay updates
+            # until the next change is queued:
+            if redis.set(DIFFICULTY_SCHEDULED_KEY, 1, nx=True, ex=delay + 60):
+                recalculate_queued_difficulty_values.apply_async(countdown=delay)
+        except Exception:
+            logger.exception(
+                "Unable to queue difficulty recalculation for %d assets",
+                len(asset_ids),
+            )
+
+    if asset_ids:
+        transaction.on_commit(queue)
+
+
+@celery_app.task(ignore_result=True)
+def recalculate_queued_difficulty_values():
+    redis = get_redis_connection()
+
+    # This is cleared before taking the queued IDs so changes queued while we
+    # are running will schedule another task:
+    redis.delete(DIFFICULTY_SCHEDULED_KEY)
+
+    pipeline = redis.pipeline()
+    pipeline.smembers(DIFFICULTY_QUEUE_KEY)
+    pipeline.delete(DIFFICULTY_QUEUE_KEY)
+    asset_ids, _ = pipeline.execute()
+
+    updated_count = 0
+    for asset_id_chunk in chunked(sorted(int(i) for i in asset_ids), 500):
+        updated_count += calculate_difficulty_values(
+            Asset.objects.filter(pk__in=asset_id_chunk)
+        )
+
+    logger.debug(
+        "Recalculated difficulty for %d queued assets and updated %d",
+        len(asset_ids),
+        updated_count,
     )
-    registered_contributor_count = len(user_ids)
-
-    site_report = SiteReport()
-    site_report.campaign = campaign
-    site_report.assets_total = assets_total
-    site_report.assets_published = assets_published
-    site_report.assets_not_started = report["assets_not_started"]
-    site_report.assets_in_progress = report["assets_in_progress"]
-    site_report.assets_waiting_review = report["assets_submitted"]
-    site_report.assets_completed = report["assets_completed"]
-    site_report.assets_unpublished = assets_unpublished
-    site_report.items_published = items_published
-    site_report.items_unpublished = items_unpublished
-    site_report.projects_published = projects_published
-    site_report.projects_unpublished = projects_unpublished
-    site_report.anonymous_transcriptions = anonymous_transcriptions
-    site_report.transcriptions_saved = transcriptions_saved
-    site_report.distinct_tags = distinct_tag_count
-    site_report.tag_uses = tag_count
-    site_report.registered_contributors = registered_contributor_count
-    site_report.save()
 
 
 @celery_app.task
@@ -343,31 +338,45 @@ def calculate_difficulty_values(asset_qs=None):
     if asset_qs is None:
         asset_qs = Asset.objects.published()
 
-    asset_qs = asset_qs.add_contribution_counts()
+    return asset_qs.update_difficulty_values()
 
-    updated_count = 0
 
-    # We'll process assets in chunks using an iterator to avoid saving objects
-    # which will never be used again in memory. We will find assets which have a
-    # difficulty value which is not the same as the value stored in the database
-    # and pass them to bulk_update() to be saved in a single query.
-    for asset_chunk in chunked(asset_qs.iterator(), 500):
-        changed_assets = []
+#: Redis key storing when calculate_incremental_difficulty_values last started
+DIFFICULTY_WATERMARK_KEY = "concordia:difficulty:watermark"
+#: Transactions may commit after a later run has started, so each run also
+#: rechecks the changes from shortly before the previous one
+DIFFICULTY_WATERMARK_OVERLAP = datetime.timedelta(minutes=5)
 
-        for asset in asset_chunk:
-            difficulty = asset.transcription_count * (
-                asset.transcriber_count + asset.reviewer_count
+
+@celery_app.task
+def calculate_incremental_difficulty_values(full=False):
+    """
+    Calculate the difficulty scores for the assets whose transcriptions have
+    changed since the previous run, or for every published asset if full is
+    True or the previous run is unknown
+    """
+
+    redis = get_redis_connection()
+    started = timezone.now()
+
+    watermark = None if full else redis.get(DIFFICULTY_WATERMARK_KEY)
+
+    if watermark is None:
+        asset_qs = Asset.objects.published()
+    else:
+        since = (
+            datetime.datetime.fromisoformat(watermark.decode("utf-8"))
+            - DIFFICULTY_WATERMARK_OVERLAP
+        )
+        asset_qs = Asset.objects.published().filter(
+            pk__in=Transcription.objects.filter(updated_on__gte=since).values(
+                "asset_id"
             )
-            if difficulty != asset.difficulty:
-                asset.difficulty = difficulty
-                changed_assets.append(asset)
+        )
 
-        if changed_assets:
-            # We will only save the new difficulty score both for performance
-            # and to avoid any possibility of race conditions causing stale data
-            # to be saved:
-            Asset.objects.bulk_update(changed_assets, ["difficulty"])
-            updated_count += len(changed_assets)
+    updated_count = calculate_difficulty_values(asset_qs)
+
+    redis.set(DIFFICULTY_WATERMARK_KEY, started.isoformat())
 
     return updated_count
 
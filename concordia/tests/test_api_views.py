@@ -11,6 +11,7 @@ from concordia.models import (
     Topic,
     Transcription,
     TranscriptionStatus,
+    TranscriptionStatusCount,
     User,
 )
 from concordia.utils import get_anonymous_user
@@ -58,20 +59,26 @@ class ConcordiaViewTests(JSONAssertMixin, TestCase):
         Asset.objects.bulk_create(cls.assets)
 
         cls.transcriptions = []
-        for asset in cls.assets:
-            last_t = None
-
-            for n in range(0, 3):
-                cls.transcriptions.append(
-                    Transcription(
-                        asset=asset,
-                        supersedes=last_t,
-                        text=f"{asset} — {n}",
-                        user=cls.anon_user,
-                    )
+        last_transcriptions = dict.fromkeys(cls.assets)
+
+        # Each round supersedes the previous one so the chains must be saved
+        # one level at a time:
+        for n in range(0, 3):
+            transcriptions = Transcription.objects.bulk_create(
+                Transcription(
+                    asset=asset,
+                    supersedes=last_transcriptions[asset],
+                    text=f"{asset} — {n}",
+                    user=cls.anon_user,
                 )
+                for asset in cls.assets
+            )
+            last_transcriptions = {i.asset: i for i in transcriptions}
+            cls.transcriptions.extend(transcriptions)
 
-        Transcription.objects.bulk_create(cls.transcriptions)
+        # bulk_create() doesn't send the signals which maintain these:
+        Asset.objects.all().update_latest_transcriptions()
+        TranscriptionStatusCount.objects.rebuild()
 
         submitted_t = cls.transcriptions[-1]
         submitted_t.submitted = now()
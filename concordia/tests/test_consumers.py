@@ -0,0 +1,365 @@
+from unittest import mock
+
+import msgpack
+from asgiref.sync import async_to_sync
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from concordia.models import AssetTranscriptionReservation, Transcription
+from concordia.routing import application
+from concordia.tasks import send_reservations_released
+from concordia.utils import get_anonymous_user, get_redis_connection
+
+from .utils import create_asset
+
+ORIGIN = "http://127.0.0.1"
+
+
+def get_communicator(path="/ws/asset/asset_updates/", *, origin=ORIGIN, headers=()):
+    return WebsocketCommunicator(
+        application,
+        path,
+        headers=[(b"origin", origin.encode("utf-8")), *headers],
+    )
+
+
+class AssetConsumerReservationTests(TransactionTestCase):
+    def setUp(self):
+        self.asset = create_asset()
+
+        self.session = import_string(f"{settings.SESSION_ENGINE}.SessionStore")()
+        self.session["reservation_token"] = "test-token"
+        self.session.save()
+
+        self.addCleanup(
+            get_redis_connection().delete,
+            f"concordia:reservation-sockets:{self.asset.pk}:test-token",
+        )
+
+    def get_communicator(self, session_key=None):
+        cookie = (
+            f"{settings.SESSION_COOKIE_NAME}={session_key or self.session.session_key}"
+        )
+        return get_communicator(headers=[(b"cookie", cookie.encode("utf-8"))])
+
+    @database_sync_to_async
+    def reservation_exists(self):
+        return AssetTranscriptionReservation.objects.exists()
+
+    @database_sync_to_async
+    def get_reservation_tokens(self):
+        return list(
+            AssetTranscriptionReservation.objects.values_list(
+                "reservation_token", flat=True
+            )
+        )
+
+    async def receive_reservation_status(self, communicator):
+        # Reservation changes are also broadcast to every socket so we skip
+        # those until we receive the reply to our own request:
+        while True:
+            data = await communicator.receive_json_from()
+            if data["message"]["type"] == "asset_reservation_status":
+                return data["message"]
+
+    @async_to_sync
+    async def test_reserve_renew_and_release(self):
+        communicator = self.get_communicator()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({"type": "reserve", "asset_pk": self.asset.pk})
+        message = await self.receive_reservation_status(communicator)
+        self.assertEqual("obtained", message["status"])
+        self.assertEqual(self.asset.pk, message["asset_pk"])
+
+        await communicator.send_json_to({"type": "renew", "asset_pk": self.asset.pk})
+        message = await self.receive_reservation_status(communicator)
+        self.assertEqual("renewed", message["status"])
+
+        await communicator.send_json_to({"type": "release", "asset_pk": self.asset.pk})
+        message = await self.receive_reservation_status(communicator)
+        self.assertEqual("released", message["status"])
+
+        await communicator.disconnect()
+
+        self.assertFalse(await self.reservation_exists())
+
+    @async_to_sync
+    async def test_release_on_disconnect(self):
+        communicator = self.get_communicator()
+        await communicator.connect()
+
+        await communicator.send_json_to({"type": "reserve", "asset_pk": self.asset.pk})
+        await self.receive_reservation_status(communicator)
+
+        self.assertEqual(["test-token"], await self.get_reservation_tokens())
+
+        await communicator.disconnect()
+
+        self.assertFalse(await self.reservation_exists())
+
+    @async_to_sync
+    async def test_shared_reservation_released_by_last_socket(self):
+        # Every tab in a browser uses the same session and so shares the same
+        # reservation, which must be held until the last of them closes:
+        first, second = self.get_communicator(), self.get_communicator()
+        await first.connect()
+        await second.connect()
+
+        for communicator in (first, second):
+            await communicator.send_json_to(
+                {"type": "reserve", "asset_pk": self.asset.pk}
+            )
+            message = await self.receive_reservation_status(communicator)
+            self.assertIn(message["status"], ("obtained", "renewed"))
+
+        await first.disconnect()
+        self.assertEqual(["test-token"], await self.get_reservation_tokens())
+
+        await second.disconnect()
+        self.assertFalse(await self.reservation_exists())
+
+    def test_reservation_without_session(self):
+        # A WebSocket cannot set a session cookie so any session created for it
+        # would be orphaned:
+        with mock.patch.object(type(self.session), "create") as create_session:
+            self.check_reservation_without_session()
+
+        self.assertFalse(create_session.called)
+
+    @async_to_sync
+    async def check_reservation_without_session(self):
+        for communicator in (get_communicator(), self.get_communicator("missing")):
+            await communicator.connect()
+
+            await communicator.send_json_to(
+                {"type": "reserve", "asset_pk": self.asset.pk}
+            )
+            message = await self.receive_reservation_status(communicator)
+            self.assertEqual("unavailable", message["status"])
+
+            await communicator.disconnect()
+
+        self.assertFalse(await self.reservation_exists())
+
+    def test_reservation_conflict(self):
+        AssetTranscriptionReservation.objects.create(
+            asset=self.asset, reservation_token="other-token"
+        )
+        self.check_reservation_conflict()
+
+    @async_to_sync
+    async def check_reservation_conflict(self):
+        communicator = self.get_communicator()
+        await communicator.connect()
+
+        await communicator.send_json_to({"type": "reserve", "asset_pk": self.asset.pk})
+        message = await self.receive_reservation_status(communicator)
+        self.assertEqual("conflict", message["status"])
+
+        await communicator.disconnect()
+
+        # Another user's reservation must not be released by our socket:
+        self.assertEqual(["other-token"], await self.get_reservation_tokens())
+
+
+class AssetConsumerUpdateTests(TransactionTestCase):
+    def setUp(self):
+        self.asset = create_asset()
+        self.other_asset = create_asset(item=self.asset.item, slug="other-asset")
+
+    def test_updates_are_batched(self):
+        self.check_updates_are_batched()
+
+    async def subscribe(self, scope_type, scope_id=None):
+        communicator = get_communicator()
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to(
+            {"type": "subscribe", "scope_type": scope_type, "scope_id": scope_id}
+        )
+        data = await communicator.receive_json_from()
+        self.assertEqual("asset_subscription_status", data["message"]["type"])
+        self.assertTrue(data["message"]["subscribed"])
+
+        return communicator
+
+    @async_to_sync
+    async def check_updates_are_batched(self):
+        communicator = await self.subscribe("all")
+
+        await self.save_assets()
+
+        data = await communicator.receive_json_from()
+        self.assertEqual("asset_updates", data["message"]["type"])
+        updates = data["message"]["updates"]
+        self.assertEqual(
+            [self.asset.pk, self.other_asset.pk], [i["asset_pk"] for i in updates]
+        )
+        self.assertEqual("submitted", updates[0]["status"])
+        self.assertEqual("test", updates[0]["latest_transcription"]["text"])
+        self.assertIsNone(updates[1]["latest_transcription"])
+
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.disconnect()
+
+    def test_scope_subscriptions(self):
+        self.check_scope_subscriptions()
+
+    @async_to_sync
+    async def check_scope_subscriptions(self):
+        asset_communicator = await self.subscribe("asset", self.other_asset.pk)
+        item_communicator = await self.subscribe("item", self.asset.item_id)
+        unsubscribed = get_communicator()
+        await unsubscribed.connect()
+
+        await self.save_assets()
+
+        data = await asset_communicator.receive_json_from()
+        self.assertEqual(
+            [self.other_asset.pk],
+            [i["asset_pk"] for i in data["message"]["updates"]],
+        )
+
+        data = await item_communicator.receive_json_from()
+        self.assertEqual(
+            [self.asset.pk, self.other_asset.pk],
+            [i["asset_pk"] for i in data["message"]["updates"]],
+        )
+
+        self.assertTrue(await unsubscribed.receive_nothing())
+
+        for communicator in (asset_communicator, item_communicator, unsubscribed):
+            await communicator.disconnect()
+
+    def test_rolled_back_updates_are_not_sent(self):
+        self.check_rolled_back_updates_are_not_sent()
+
+    @async_to_sync
+    async def check_rolled_back_updates_are_not_sent(self):
+        communicator = await self.subscribe("all")
+
+        await self.save_after_rollback()
+
+        data = await communicator.receive_json_from()
+        self.assertEqual(
+            [self.asset.pk], [i["asset_pk"] for i in data["message"]["updates"]]
+        )
+        self.assertTrue(await communicator.receive_nothing())
+
+        await communicator.disconnect()
+
+    @database_sync_to_async
+    def save_after_rollback(self):
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    self.other_asset.save()
+                    raise RuntimeError("Roll back the savepoint")
+            except RuntimeError:
+                pass
+
+        try:
+            with transaction.atomic():
+                self.other_asset.save()
+                raise RuntimeError("Roll back the transaction")
+        except RuntimeError:
+            pass
+
+        with transaction.atomic():
+            self.asset.save()
+
+    def test_compact_msgpack_updates(self):
+        self.check_compact_msgpack_updates()
+
+    @async_to_sync
+    async def check_compact_msgpack_updates(self):
+        communicator = get_communicator(
+            "/ws/asset/asset_updates/?format=compact&encoding=msgpack"
+        )
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_to(
+            bytes_data=msgpack.packb({"type": "subscribe", "scope_type": "all"})
+        )
+        data = msgpack.unpackb(await communicator.receive_from())
+        self.assertEqual("asset_subscription_status", data["message"]["type"])
+
+        await self.save_assets()
+
+        data = msgpack.unpackb(await communicator.receive_from())
+        latest_transcription = data["message"]["updates"][0]["latest_transcription"]
+        self.assertIn("id", latest_transcription)
+        self.assertNotIn("text", latest_transcription)
+
+        await communicator.disconnect()
+
+    def test_released_reservations_are_forwarded(self):
+        self.check_released_reservations_are_forwarded()
+
+    @async_to_sync
+    async def check_released_reservations_are_forwarded(self):
+        all_communicator = await self.subscribe("all")
+        asset_communicator = await self.subscribe("asset", self.other_asset.pk)
+
+        await database_sync_to_async(send_reservations_released)(
+            "test", [(self.asset.pk, "first"), (self.other_asset.pk, "second")]
+        )
+
+        data = await all_communicator.receive_json_from()
+        self.assertEqual("asset_reservations_released", data["message"]["type"])
+        self.assertEqual(
+            [
+                {"asset_pk": self.asset.pk, "reservation_token": "first"},
+                {"asset_pk": self.other_asset.pk, "reservation_token": "second"},
+            ],
+            data["message"]["reservations"],
+        )
+
+        data = await asset_communicator.receive_json_from()
+        self.assertEqual(
+            [{"asset_pk": self.other_asset.pk, "reservation_token": "second"}],
+            data["message"]["reservations"],
+        )
+
+        for communicator in (all_communicator, asset_communicator):
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+
+    @async_to_sync
+    async def test_unknown_payload_format(self):
+        communicator = get_communicator("/ws/asset/asset_updates/?encoding=xml")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    @async_to_sync
+    async def test_foreign_origin(self):
+        communicator = get_communicator(origin="https://example.com")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+        communicator = WebsocketCommunicator(application, "/ws/asset/asset_updates/")
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    @database_sync_to_async
+    def save_assets(self):
+        # Every save in the transaction is sent together when it commits:
+        with transaction.atomic():
+            Transcription.objects.create(
+                asset=self.asset,
+                user=get_anonymous_user(),
+                text="test",
+                submitted=now(),
+            )
+            self.other_asset.save()
+            self.asset.save()
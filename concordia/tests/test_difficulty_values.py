@@ -0,0 +1,134 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils.timezone import now
+
+from concordia.models import Asset, Transcription
+from concordia.tasks import (
+    DIFFICULTY_QUEUE_KEY,
+    DIFFICULTY_SCHEDULED_KEY,
+    DIFFICULTY_WATERMARK_KEY,
+    DIFFICULTY_WATERMARK_OVERLAP,
+    calculate_difficulty_values,
+    calculate_incremental_difficulty_values,
+    recalculate_queued_difficulty_values,
+)
+from concordia.utils import get_anonymous_user, get_redis_connection
+
+from .utils import create_asset
+
+
+class QueuedDifficultyRecalculationTests(TestCase):
+    def setUp(self):
+        self.asset = create_asset()
+
+        self.redis = get_redis_connection()
+        self.redis.delete(DIFFICULTY_QUEUE_KEY, DIFFICULTY_SCHEDULED_KEY)
+        self.addCleanup(
+            self.redis.delete, DIFFICULTY_QUEUE_KEY, DIFFICULTY_SCHEDULED_KEY
+        )
+
+    @patch("concordia.tasks.recalculate_queued_difficulty_values.apply_async")
+    def test_saves_are_coalesced(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=True):
+            transcription = Transcription.objects.create(
+                asset=self.asset, user=get_anonymous_user(), text="test"
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transcription.submitted = now()
+            transcription.save()
+
+        # The difficulty is not updated during the save:
+        self.assertEqual(0, Asset.objects.get(pk=self.asset.pk).difficulty)
+        self.assertEqual(1, apply_async.call_count)
+        self.assertEqual(
+            {str(self.asset.pk).encode()}, self.redis.smembers(DIFFICULTY_QUEUE_KEY)
+        )
+
+        recalculate_queued_difficulty_values()
+
+        self.assertEqual(1, Asset.objects.get(pk=self.asset.pk).difficulty)
+        self.assertFalse(self.redis.exists(DIFFICULTY_QUEUE_KEY))
+
+        # Once the task has started, new changes schedule another run:
+        with self.captureOnCommitCallbacks(execute=True):
+            transcription.save()
+        self.assertEqual(2, apply_async.call_count)
+
+    @patch("concordia.tasks.recalculate_queued_difficulty_values.apply_async")
+    def test_rolled_back_changes_are_not_queued(self, apply_async):
+        with self.captureOnCommitCallbacks(execute=False):
+            Transcription.objects.create(
+                asset=self.asset, user=get_anonymous_user(), text="test"
+            )
+
+        self.assertFalse(apply_async.called)
+        self.assertFalse(self.redis.exists(DIFFICULTY_QUEUE_KEY))
+
+    @patch("concordia.tasks.recalculate_queued_difficulty_values.apply_async")
+    def test_queue_failures_are_logged(self, apply_async):
+        with (
+            patch(
+                "concordia.tasks.get_redis_connection",
+                side_effect=ConnectionError("Redis is unavailable"),
+            ),
+            self.assertLogs("concordia.tasks", "ERROR"),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                transcription = Transcription.objects.create(
+                    asset=self.asset, user=get_anonymous_user(), text="test"
+                )
+
+        # The transcription is still saved and the periodic incremental task
+        # will update the difficulty instead:
+        self.assertTrue(Transcription.objects.filter(pk=transcription.pk).exists())
+        self.assertFalse(apply_async.called)
+
+
+class IncrementalDifficultyValueTests(TestCase):
+    def setUp(self):
+        self.asset = create_asset()
+        self.other_asset = create_asset(item=self.asset.item, slug="other-asset")
+
+        for asset in (self.asset, self.other_asset):
+            Transcription.objects.create(
+                asset=asset, user=get_anonymous_user(), text="test"
+            )
+
+        self.redis = get_redis_connection()
+        self.redis.delete(DIFFICULTY_WATERMARK_KEY)
+        self.addCleanup(self.redis.delete, DIFFICULTY_WATERMARK_KEY)
+
+    def test_full_and_incremental_runs(self):
+        # Without a watermark every published asset is recalculated:
+        self.assertEqual(2, calculate_incremental_difficulty_values())
+        self.assertEqual(1, Asset.objects.get(pk=self.asset.pk).difficulty)
+        self.assertTrue(self.redis.exists(DIFFICULTY_WATERMARK_KEY))
+
+        Asset.objects.update(difficulty=0)
+        self.redis.set(
+            DIFFICULTY_WATERMARK_KEY,
+            (now() + DIFFICULTY_WATERMARK_OVERLAP).isoformat(),
+        )
+        Transcription.objects.filter(asset=self.asset).update(
+            updated_on=now() + DIFFICULTY_WATERMARK_OVERLAP
+        )
+
+        # Only the asset with a recently changed transcription is updated:
+        self.assertEqual(1, calculate_incremental_difficulty_values())
+        self.assertEqual(1, Asset.objects.get(pk=self.asset.pk).difficulty)
+        self.assertEqual(0, Asset.objects.get(pk=self.other_asset.pk).difficulty)
+
+        self.assertEqual(1, calculate_incremental_difficulty_values(full=True))
+        self.assertEqual(1, Asset.objects.get(pk=self.other_asset.pk).difficulty)
+
+    def test_matches_contribution_counts(self):
+        calculate_difficulty_values()
+
+        for asset in Asset.objects.add_contribution_counts():
+            self.assertEqual(
+                asset.transcription_count
+                * (asset.transcriber_count + asset.reviewer_count),
+                asset.difficulty,
+            )
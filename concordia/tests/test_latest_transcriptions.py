@@ -0,0 +1,69 @@
+from django.test import TestCase
+from django.utils.timezone import now
+
+from concordia.models import Asset, Transcription
+from concordia.utils import get_anonymous_user
+
+from .utils import create_asset
+
+
+class LatestTranscriptionTests(TestCase):
+    def setUp(self):
+        self.asset = create_asset()
+        self.user = get_anonymous_user()
+
+    def get_latest_transcription_id(self):
+        return Asset.objects.get(pk=self.asset.pk).latest_transcription_id
+
+    def test_transcription_changes(self):
+        self.assertIsNone(self.get_latest_transcription_id())
+
+        first = Transcription.objects.create(
+            asset=self.asset, user=self.user, text="first"
+        )
+        self.assertEqual(first.pk, self.get_latest_transcription_id())
+
+        second = Transcription.objects.create(
+            asset=self.asset, user=self.user, text="second", supersedes=first
+        )
+        self.assertEqual(second.pk, self.get_latest_transcription_id())
+
+        # Saving an older transcription doesn't move the pointer back:
+        first = Transcription.objects.get(pk=first.pk)
+        first.rejected = now()
+        first.save()
+        self.assertEqual(second.pk, self.get_latest_transcription_id())
+
+        second.delete()
+        self.assertEqual(first.pk, self.get_latest_transcription_id())
+
+        first.delete()
+        self.assertIsNone(self.get_latest_transcription_id())
+
+    def test_stale_asset_does_not_move_pointer_back(self):
+        first = Transcription.objects.create(
+            asset=self.asset, user=self.user, text="first"
+        )
+        second = Transcription.objects.create(
+            asset=Asset.objects.get(pk=self.asset.pk),
+            user=self.user,
+            text="second",
+            supersedes=first,
+        )
+
+        # first.asset was loaded before the second transcription was saved:
+        first.rejected = now()
+        first.save()
+        self.assertEqual(second.pk, self.get_latest_transcription_id())
+
+    def test_update_latest_transcriptions(self):
+        transcription = Transcription.objects.create(
+            asset=self.asset, user=self.user, text="test"
+        )
+        Asset.objects.update(latest_transcription=None)
+
+        self.assertEqual(1, Asset.objects.all().update_latest_transcriptions())
+        self.assertEqual(transcription.pk, self.get_latest_transcription_id())
+
+        # Assets which are already correct are not updated:
+        self.assertEqual(0, Asset.objects.all().update_latest_transcriptions())
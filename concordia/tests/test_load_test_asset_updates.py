@@ -0,0 +1,31 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+
+from concordia.models import Campaign, Transcription
+
+
+class LoadTestAssetUpdatesTests(TransactionTestCase):
+    def test_load_test(self):
+        stdout = StringIO()
+        call_command(
+            "load_test_asset_updates",
+            clients=3,
+            assets=2,
+            transcriptions=4,
+            reservations=2,
+            reservers=1,
+            rate=100,
+            stdout=stdout,
+        )
+
+        output = stdout.getvalue()
+        # Updates to the same asset may be coalesced so only the final state of
+        # each asset has to reach every client:
+        self.assertRegex(output, r"Asset updates: \d+ received, 0 of [36] missing")
+        self.assertIn("Reservation messages: 12 received, 0 of 12 missing", output)
+
+        # The temporary assets are removed afterwards:
+        self.assertFalse(Campaign.objects.exists())
+        self.assertFalse(Transcription.objects.exists())
@@ -0,0 +1,209 @@
+from datetime import timedelta
+from secrets import token_hex
+from time import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.timezone import now
+
+from concordia.models import Asset, AssetTranscriptionReservation
+from concordia.reservation_backends import (
+    DatabaseReservationBackend,
+    RedisReservationBackend,
+    ReservationStatus,
+)
+
+from .utils import create_asset
+
+
+class DatabaseReservationBackendTests(TestCase):
+    def setUp(self):
+        self.backend = DatabaseReservationBackend()
+        self.asset = create_asset()
+
+    def test_reserve(self):
+        with self.assertNumQueries(1):
+            status = self.backend.reserve(self.asset.pk, "a")
+        self.assertEqual(ReservationStatus.OBTAINED, status)
+
+        with self.assertNumQueries(1):
+            status = self.backend.reserve(self.asset.pk, "a")
+        self.assertEqual(ReservationStatus.RENEWED, status)
+
+        with self.assertNumQueries(1):
+            status = self.backend.reserve(self.asset.pk, "b")
+        self.assertEqual(ReservationStatus.CONFLICT, status)
+
+        self.assertEqual(1, AssetTranscriptionReservation.objects.count())
+
+    def test_reserve_tombstoned(self):
+        self.backend.reserve(self.asset.pk, "a")
+        AssetTranscriptionReservation.objects.update(tombstoned=True)
+
+        self.assertEqual(
+            ReservationStatus.TOMBSTONED, self.backend.reserve(self.asset.pk, "a")
+        )
+        self.assertEqual(
+            ReservationStatus.OBTAINED, self.backend.reserve(self.asset.pk, "b")
+        )
+
+    def test_unique_active_reservation(self):
+        self.backend.reserve(self.asset.pk, "a")
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AssetTranscriptionReservation.objects.create(
+                asset=self.asset, reservation_token="b"
+            )
+
+    def test_review_reservation(self):
+        self.assertEqual(
+            ReservationStatus.OBTAINED,
+            self.backend.reserve(self.asset.pk, "a", review=True),
+        )
+        self.assertEqual(
+            ReservationStatus.CONFLICT,
+            self.backend.reserve(self.asset.pk, "b", review=True),
+        )
+        self.assertQuerysetEqual(self.backend.exclude_reserved(Asset.objects.all()), [])
+
+        # Once the review reservation has expired it no longer blocks anyone:
+        AssetTranscriptionReservation.objects.update(
+            updated_on=now() - timedelta(seconds=settings.REVIEW_RESERVATION_SECONDS)
+        )
+        self.assertQuerysetEqual(
+            self.backend.exclude_reserved(Asset.objects.all()), [self.asset]
+        )
+        self.assertEqual(
+            ReservationStatus.OBTAINED, self.backend.reserve(self.asset.pk, "b")
+        )
+
+        reservation = AssetTranscriptionReservation.objects.get()
+        self.assertEqual("b", reservation.reservation_token)
+        self.assertFalse(reservation.review)
+
+        # Renewing as a review must not turn this back into a review reservation:
+        self.assertEqual(
+            ReservationStatus.RENEWED,
+            self.backend.reserve(self.asset.pk, "b", review=True),
+        )
+        self.assertFalse(AssetTranscriptionReservation.objects.get().review)
+
+
+class RedisReservationBackendTests(TestCase):
+    def setUp(self):
+        self.backend = RedisReservationBackend()
+        # Each test uses its own keys so we don't interfere with anything else
+        # using the same Redis database:
+        self.backend.key_prefix = f"test:{token_hex(8)}"
+
+    def tearDown(self):
+        keys = list(self.backend.redis.scan_iter(f"{self.backend.key_prefix}:*"))
+        if keys:
+            self.backend.redis.delete(*keys)
+
+    def test_reserve_and_release(self):
+        self.assertEqual(ReservationStatus.OBTAINED, self.backend.reserve(1, "a"))
+        self.assertEqual(ReservationStatus.RENEWED, self.backend.reserve(1, "a"))
+        self.assertEqual(ReservationStatus.CONFLICT, self.backend.reserve(1, "b"))
+
+        self.backend.release(1, "b")
+        self.assertEqual(ReservationStatus.CONFLICT, self.backend.reserve(1, "b"))
+
+        self.backend.release(1, "a")
+        self.assertEqual(ReservationStatus.OBTAINED, self.backend.reserve(1, "b"))
+
+    def test_reservation_expiration(self):
+        self.backend.reserve(1, "a")
+        self.backend.redis.delete(f"{self.backend.key_prefix}:asset:1")
+
+        self.assertEqual(ReservationStatus.OBTAINED, self.backend.reserve(1, "b"))
+
+    def test_review_reservation(self):
+        key = f"{self.backend.key_prefix}:asset:1"
+
+        self.backend.reserve(1, "a", review=True)
+        self.assertLessEqual(
+            self.backend.redis.ttl(key), settings.REVIEW_RESERVATION_SECONDS
+        )
+        self.assertEqual(ReservationStatus.CONFLICT, self.backend.reserve(1, "b"))
+
+        self.assertEqual(ReservationStatus.RENEWED, self.backend.reserve(1, "a"))
+        self.assertGreater(
+            self.backend.redis.ttl(key), settings.REVIEW_RESERVATION_SECONDS
+        )
+
+    @override_settings(TRANSCRIPTION_RESERVATION_TOMBSTONE_HOURS=0)
+    def test_reservation_tombstone(self):
+        self.assertEqual(ReservationStatus.OBTAINED, self.backend.reserve(1, "a"))
+        self.assertEqual(ReservationStatus.TOMBSTONED, self.backend.reserve(1, "a"))
+        self.assertEqual(ReservationStatus.TOMBSTONED, self.backend.reserve(1, "a"))
+
+        # Other users may obtain the reservation during the tombstone period:
+        self.assertEqual(ReservationStatus.OBTAINED, self.backend.reserve(1, "b"))
+
+    def test_expire(self):
+        self.backend.reserve(1, "a")
+        self.backend.reserve(2, "b")
+        self.backend.reserve(3, "c")
+        self.backend.release(3, "c")
+
+        # Simulate the first reservation's key expiring:
+        self.backend.redis.delete(f"{self.backend.key_prefix}:asset:1")
+        self.backend.redis.zadd(
+            f"{self.backend.key_prefix}:reserved-assets", {1: time() - 1}
+        )
+
+        # Expired reservations are left for expire() to release:
+        self.assertEqual([2], self.backend.get_reserved_asset_ids())
+
+        self.assertEqual([(1, "a")], self.backend.expire())
+        self.assertEqual([], self.backend.expire())
+
+        self.assertEqual(ReservationStatus.OBTAINED, self.backend.reserve(1, "b"))
+        self.assertEqual([1, 2], sorted(self.backend.get_reserved_asset_ids()))
+
+    def test_exclude_reserved(self):
+        asset1 = create_asset(slug="test-asset-1")
+        asset2 = create_asset(item=asset1.item, slug="test-asset-2")
+
+        self.backend.reserve(asset1.pk, "a")
+
+        self.assertQuerysetEqual(
+            self.backend.exclude_reserved(Asset.objects.all()), [asset2]
+        )
+
+        self.backend.release(asset1.pk, "a")
+
+        self.assertEqual(2, self.backend.exclude_reserved(Asset.objects.all()).count())
+
+
+@override_settings(
+    RATELIMIT_ENABLE=False,
+    SESSION_ENGINE="django.contrib.sessions.backends.cache",
+    TRANSCRIPTION_RESERVATION_BACKEND=(
+        "concordia.reservation_backends.RedisReservationBackend"
+    ),
+)
+class RedisReservationViewTests(TestCase):
+    def test_asset_reservation(self):
+        asset = create_asset()
+        url = reverse("reserve-asset", args=(asset.pk,))
+
+        # The database is not used to reserve assets:
+        with self.assertNumQueries(0):
+            resp = self.client.post(url)
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(asset.pk, resp.json()["asset_pk"])
+
+        with self.assertNumQueries(0):
+            resp = self.client.post(url)
+        self.assertEqual(200, resp.status_code)
+
+        other_client = self.client_class()
+        self.assertEqual(409, other_client.post(url).status_code)
+
+        self.client.post(url, data={"release": True})
+        self.assertEqual(200, other_client.post(url).status_code)
+        other_client.post(url, data={"release": True})
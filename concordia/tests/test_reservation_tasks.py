@@ -0,0 +1,138 @@
+from datetime import timedelta
+from secrets import token_hex
+from time import time
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils.timezone import now
+
+from concordia.models import AssetTranscriptionReservation
+from concordia.reservation_backends import RedisReservationBackend
+from concordia.signals.signals import reservations_released
+from concordia.tasks import (
+    expire_inactive_asset_reservations,
+    send_reservations_released,
+    tombstone_old_active_asset_reservations,
+)
+
+from .utils import create_asset
+
+
+class ReservationTaskTests(TestCase):
+    def setUp(self):
+        self.released = []
+
+        def receiver(sender, reservations, **kwargs):
+            self.released.append(reservations)
+
+        reservations_released.connect(receiver, weak=False)
+        self.addCleanup(reservations_released.disconnect, receiver)
+
+        self.asset = create_asset()
+
+    def create_reservation(self, token, *, age, review=False, tombstoned=False):
+        asset = create_asset(item=self.asset.item, slug=f"asset-{token}")
+        reservation = AssetTranscriptionReservation.objects.create(
+            asset=asset, reservation_token=token, review=review, tombstoned=tombstoned
+        )
+        timestamp = now() - age
+        AssetTranscriptionReservation.objects.filter(pk=reservation.pk).update(
+            created_on=timestamp, updated_on=timestamp
+        )
+        return reservation
+
+    def get_tokens(self, **filters):
+        return set(
+            AssetTranscriptionReservation.objects.filter(**filters).values_list(
+                "reservation_token", flat=True
+            )
+        )
+
+    def test_expire_inactive_reservations(self):
+        expired_age = timedelta(seconds=2 * settings.TRANSCRIPTION_RESERVATION_SECONDS)
+        review_age = timedelta(seconds=settings.REVIEW_RESERVATION_SECONDS)
+
+        expired = self.create_reservation("expired", age=expired_age * 2)
+        self.create_reservation("active", age=timedelta())
+        review = self.create_reservation("review", age=review_age * 2, review=True)
+        self.create_reservation("recent", age=review_age * 2)
+        self.create_reservation("tombstoned", age=expired_age * 2, tombstoned=True)
+
+        with self.assertNumQueries(1):
+            expire_inactive_asset_reservations()
+
+        self.assertEqual({"active", "recent", "tombstoned"}, self.get_tokens())
+
+        self.assertEqual(1, len(self.released))
+        self.assertCountEqual(
+            [
+                {"asset_pk": expired.asset_id, "reservation_token": "expired"},
+                {"asset_pk": review.asset_id, "reservation_token": "review"},
+            ],
+            self.released[0],
+        )
+
+    def test_expire_redis_reservations(self):
+        backend = RedisReservationBackend()
+        backend.key_prefix = f"test:{token_hex(8)}"
+        self.addCleanup(
+            backend.redis.delete, *backend.get_keys(self.asset.pk, "expired")
+        )
+
+        backend.reserve(self.asset.pk, "expired")
+        backend.redis.zadd(
+            f"{backend.key_prefix}:reserved-assets", {self.asset.pk: time() - 1}
+        )
+
+        with mock.patch(
+            "concordia.tasks.get_reservation_backend", return_value=backend
+        ):
+            expire_inactive_asset_reservations()
+
+        self.assertEqual(
+            [[{"asset_pk": self.asset.pk, "reservation_token": "expired"}]],
+            self.released,
+        )
+
+    def test_tombstone_old_reservations(self):
+        tombstone_age = timedelta(
+            hours=settings.TRANSCRIPTION_RESERVATION_TOMBSTONE_HOURS + 1
+        )
+
+        old = self.create_reservation("old", age=tombstone_age)
+        self.create_reservation("new", age=timedelta())
+        self.create_reservation("tombstoned", age=tombstone_age, tombstoned=True)
+
+        with self.assertNumQueries(1):
+            tombstone_old_active_asset_reservations()
+
+        self.assertEqual({"old", "tombstoned"}, self.get_tokens(tombstoned=True))
+        self.assertEqual({"new"}, self.get_tokens(tombstoned=False))
+
+        # The tombstone period starts now rather than when the reservation was
+        # last updated:
+        old.refresh_from_db()
+        self.assertGreater(old.updated_on, now() - timedelta(minutes=1))
+
+        self.assertEqual(
+            [[{"asset_pk": old.asset_id, "reservation_token": "old"}]], self.released
+        )
+
+    def test_nothing_released(self):
+        expire_inactive_asset_reservations()
+        tombstone_old_active_asset_reservations()
+
+        self.assertEqual([], self.released)
+
+    def test_released_reservations_are_chunked(self):
+        with mock.patch("concordia.signals.handlers.AsyncToSync") as async_to_sync:
+            send_reservations_released("test", [(i, f"token-{i}") for i in range(1001)])
+
+        self.assertEqual([500, 500, 1], [len(i) for i in self.released])
+        self.assertEqual(
+            {"asset_pk": 1000, "reservation_token": "token-1000"}, self.released[2][0]
+        )
+
+        # Each chunk is sent once to the all-assets group and once per asset:
+        self.assertEqual(3 + 1001, async_to_sync.return_value.call_count)
@@ -0,0 +1,68 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from concordia.models import ScopeContributor, Transcription
+
+from .utils import CreateTestUsers, create_asset, create_topic
+
+
+class ScopeContributorTests(CreateTestUsers, TestCase):
+    def setUp(self):
+        self.asset = create_asset()
+        self.item = self.asset.item
+        self.project = self.item.project
+        self.campaign = self.project.campaign
+
+        self.transcriber = self.create_test_user("transcriber")
+        self.reviewer = self.create_test_user("reviewer")
+
+    def assertContributorCounts(self, expected):
+        for scope_type, scope_id in (
+            ("campaign", self.campaign.pk),
+            ("project", self.project.pk),
+            ("item", self.item.pk),
+        ):
+            self.assertEqual(
+                expected, ScopeContributor.objects.get_count(scope_type, scope_id)
+            )
+
+    def test_contributors(self):
+        self.assertContributorCounts(0)
+
+        transcription = Transcription(
+            asset=self.asset, user=self.transcriber, text="test", submitted=now()
+        )
+        transcription.full_clean()
+        transcription.save()
+        self.assertContributorCounts(1)
+
+        # Saving another transcription by the same user does not count twice:
+        Transcription.objects.create(
+            asset=self.asset, user=self.transcriber, supersedes=transcription
+        )
+        self.assertContributorCounts(1)
+
+        transcription.accepted = now()
+        transcription.reviewed_by = self.reviewer
+        transcription.save()
+        self.assertContributorCounts(2)
+
+        topic = create_topic(project=self.project)
+        self.assertEqual(2, ScopeContributor.objects.get_count("topic", topic.pk))
+
+        ScopeContributor.objects.all().delete()
+        ScopeContributor.objects.rebuild(campaign_ids=[self.campaign.pk])
+        self.assertContributorCounts(2)
+
+    def test_detail_view(self):
+        Transcription.objects.create(asset=self.asset, user=self.transcriber)
+
+        resp = self.client.get(
+            reverse(
+                "transcriptions:project-detail",
+                args=(self.campaign.slug, self.project.slug),
+            )
+        )
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(1, resp.context["contributor_count"])
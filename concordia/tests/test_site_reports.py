@@ -0,0 +1,315 @@
+import uuid
+from threading import Event, Thread
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils.timezone import now
+
+from concordia import site_reports
+from concordia.celery import app as celery_app
+from concordia.models import (
+    Asset,
+    SiteReport,
+    SiteReportEvent,
+    Tag,
+    Transcription,
+    UserAssetTagCollection,
+)
+from concordia.site_reports import build_site_reports
+from concordia.tasks import (
+    incremental_site_report,
+    scope_site_report,
+    site_report,
+    site_wide_report,
+)
+from concordia.utils import get_anonymous_user
+
+from .utils import (
+    create_asset,
+    create_campaign,
+    create_item,
+    create_project,
+    create_topic,
+    import_assets,
+)
+
+
+class SiteReportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester")
+
+        self.asset = create_asset()
+        self.item = self.asset.item
+        self.project = self.item.project
+        self.campaign = self.project.campaign
+        self.topic = create_topic(project=self.project)
+
+        create_asset(item=self.item, slug="unpublished-asset", published=False)
+
+        transcription = Transcription.objects.create(
+            asset=self.asset,
+            user=self.user,
+            text="test",
+            submitted=now(),
+            reviewed_by=get_anonymous_user(),
+        )
+        Transcription.objects.create(
+            asset=self.asset,
+            user=get_anonymous_user(),
+            text="test",
+            supersedes=transcription,
+        )
+
+        tag_collection = UserAssetTagCollection.objects.create(
+            asset=self.asset, user=self.user
+        )
+        tag_collection.tags.add(
+            Tag.objects.create(value="foo"), Tag.objects.create(value="bar")
+        )
+        Tag.objects.create(value="unused")
+
+        self.empty_campaign = create_campaign(slug="empty-campaign")
+
+    def test_site_report(self):
+        self.addCleanup(setattr, celery_app.conf, "task_always_eager", False)
+        celery_app.conf.task_always_eager = True
+
+        report_run = site_report()
+        self.assertEqual(
+            SiteReport.objects.count(),
+            SiteReport.objects.filter(report_run=report_run).count(),
+        )
+
+        site = SiteReport.objects.get(campaign=None, topic=None)
+        self.assertEqual(2, site.assets_total)
+        self.assertEqual(1, site.assets_published)
+        self.assertEqual(1, site.assets_unpublished)
+        self.assertEqual(2, site.transcriptions_saved)
+        self.assertEqual(1, site.anonymous_transcriptions)
+        self.assertEqual(2, site.tag_uses)
+        self.assertEqual(3, site.distinct_tags)
+        self.assertEqual(2, site.campaigns_published)
+        self.assertEqual(User.objects.count(), site.users_registered)
+
+        campaign = SiteReport.objects.get(campaign=self.campaign)
+        self.assertEqual(2, campaign.assets_total)
+        self.assertEqual(1, campaign.assets_in_progress)
+        self.assertEqual(1, campaign.assets_not_started)
+        self.assertEqual(1, campaign.items_published)
+        self.assertEqual(0, campaign.items_unpublished)
+        self.assertEqual(1, campaign.projects_published)
+        self.assertEqual(2, campaign.transcriptions_saved)
+        self.assertEqual(2, campaign.tag_uses)
+        self.assertEqual(2, campaign.distinct_tags)
+        self.assertEqual(2, campaign.registered_contributors)
+
+        empty = SiteReport.objects.get(campaign=self.empty_campaign)
+        self.assertEqual(0, empty.assets_total)
+        self.assertEqual(0, empty.registered_contributors)
+
+        topic = SiteReport.objects.get(topic=self.topic)
+        self.assertEqual(2, topic.assets_total)
+        self.assertEqual(1, topic.anonymous_transcriptions)
+        self.assertEqual(2, topic.distinct_tags)
+        self.assertIsNone(topic.registered_contributors)
+
+    def test_query_count_does_not_grow_with_scopes(self):
+        for i in range(3):
+            project = create_project(
+                campaign=create_campaign(slug=f"campaign-{i}"), slug=f"project-{i}"
+            )
+            create_topic(project=project, slug=f"topic-{i}")
+
+        get_anonymous_user()
+
+        # 1 for the event snapshot, 1 for tags, 8 for the site, 7 for campaigns
+        # and 6 for topics:
+        with self.assertNumQueries(23):
+            reports = build_site_reports()
+
+        self.assertEqual(1 + 5 + 4, len(reports))
+
+    def test_restricted_scopes(self):
+        reports = build_site_reports(
+            site=False, campaign_ids=[self.campaign.pk], topic_ids=[]
+        )
+        self.assertEqual([self.campaign.pk], [i.campaign_id for i in reports])
+        self.assertEqual(2, reports[0].assets_total)
+
+    def test_tag_counts_with_multiple_topics(self):
+        second_topic = create_topic(project=self.project, slug="second-topic")
+
+        reports = {
+            (i.campaign_id, i.topic_id): i
+            for i in build_site_reports(campaign_ids=[self.campaign.pk])
+        }
+
+        for key in ((None, None), (self.campaign.pk, None), (None, second_topic.pk)):
+            self.assertEqual(2, reports[key].tag_uses)
+        self.assertEqual(2, reports[self.campaign.pk, None].distinct_tags)
+        self.assertEqual(3, reports[None, None].distinct_tags)
+
+    def test_report_run_is_idempotent(self):
+        report_run = str(uuid.uuid4())
+
+        for i in range(2):
+            scope_site_report(report_run, "campaign", self.campaign.pk)
+            scope_site_report(report_run, "topic", self.topic.pk)
+            site_wide_report(report_run)
+
+        self.assertEqual(3, SiteReport.objects.filter(report_run=report_run).count())
+        self.assertTrue(
+            SiteReport.objects.filter(
+                report_run=report_run, campaign=None, topic=None
+            ).exists()
+        )
+
+        # A different run saves its own reports:
+        scope_site_report(str(uuid.uuid4()), "campaign", self.campaign.pk)
+        self.assertEqual(2, SiteReport.objects.filter(campaign=self.campaign).count())
+
+
+class IncrementalSiteReportTests(TransactionTestCase):
+    """
+    Events are matched to reports by the transaction which recorded them, so
+    these tests commit each change separately
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="tester")
+
+        self.asset = create_asset()
+        self.item = self.asset.item
+        self.project = self.item.project
+        self.campaign = self.project.campaign
+        self.topic = create_topic(project=self.project)
+
+        SiteReport.objects.bulk_create(build_site_reports())
+        self.last_event_pk = SiteReportEvent.objects.latest("pk").pk
+
+    def assertReportsMatchFullRebuild(self):
+        def get_values(reports):
+            return {
+                (report.campaign_id, report.topic_id): {
+                    field.attname: getattr(report, field.attname)
+                    for field in SiteReport._meta.concrete_fields
+                    if field.attname
+                    not in ("id", "created_on", "report_run", "event_snapshot")
+                }
+                for report in reports
+            }
+
+        report_run = incremental_site_report()
+        self.assertEqual(
+            get_values(build_site_reports()),
+            get_values(SiteReport.objects.filter(report_run=report_run)),
+        )
+
+    def test_activity(self):
+        second_asset = create_asset(item=self.item, slug="second-asset")
+        Transcription.objects.create(
+            asset=second_asset, user=get_anonymous_user(), text="test"
+        )
+        tag_collection = UserAssetTagCollection.objects.create(
+            asset=self.asset, user=self.user
+        )
+        tag_collection.tags.add(Tag.objects.create(value="foo"))
+
+        self.assertEqual(
+            ["asset", "asset", "transcription", "tag"],
+            list(
+                SiteReportEvent.objects.filter(pk__gt=self.last_event_pk)
+                .order_by("pk")
+                .values_list("event_type", flat=True)
+            ),
+        )
+
+        self.assertReportsMatchFullRebuild()
+
+        # Reports without any new events are copied forward:
+        self.assertReportsMatchFullRebuild()
+
+    def test_imported_assets(self):
+        item = create_item(project=self.project, item_id="imported-item")
+        import_assets(item, 3)
+
+        self.assertEqual(3, item.asset_set.count())
+        self.assertReportsMatchFullRebuild()
+
+    def test_publication_changes(self):
+        self.item.published = False
+        self.item.save()
+        Asset.objects.filter(pk=self.asset.pk).get().delete()
+        create_project(campaign=self.campaign, slug="second-project", published=False)
+
+        self.assertReportsMatchFullRebuild()
+
+    def test_structural_changes(self):
+        other_project = create_project(
+            campaign=create_campaign(slug="other-campaign"), slug="other-project"
+        )
+        self.item.project = other_project
+        self.item.save()
+        other_project.topics.add(self.topic)
+
+        self.assertTrue(
+            SiteReportEvent.objects.filter(
+                event_type=SiteReportEvent.EventType.RECALCULATE
+            ).exists()
+        )
+
+        self.assertReportsMatchFullRebuild()
+
+    def run_in_thread(self, func):
+        def target():
+            try:
+                func()
+            finally:
+                connection.close()
+
+        thread = Thread(target=target)
+        thread.start()
+        return thread
+
+    def test_changes_committed_during_report(self):
+        get_tag_statistics = site_reports.get_tag_statistics
+
+        def commit_during_report(*args, **kwargs):
+            self.run_in_thread(
+                lambda: create_asset(item=self.item, slug="concurrent-asset")
+            ).join()
+            return get_tag_statistics(*args, **kwargs)
+
+        with mock.patch.object(
+            site_reports, "get_tag_statistics", side_effect=commit_during_report
+        ):
+            report_run = incremental_site_report()
+
+        # The report was calculated before the asset was committed:
+        self.assertEqual(
+            1,
+            SiteReport.objects.get(
+                report_run=report_run, campaign=self.campaign
+            ).assets_total,
+        )
+
+        self.assertReportsMatchFullRebuild()
+
+    def test_changes_committed_after_report(self):
+        created, committed = Event(), Event()
+
+        def create_and_wait():
+            with transaction.atomic():
+                create_asset(item=self.item, slug="concurrent-asset")
+                created.set()
+                committed.wait(timeout=10)
+
+        thread = self.run_in_thread(create_and_wait)
+        created.wait(timeout=10)
+        incremental_site_report()
+        committed.set()
+        thread.join()
+
+        self.assertReportsMatchFullRebuild()
@@ -0,0 +1,116 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.timezone import now
+
+from concordia.models import Transcription, TranscriptionTextDelta
+from concordia.transcription_history import (
+    apply_text_delta,
+    compact_transcriptions,
+    get_compacted_texts,
+    make_text_delta,
+)
+from concordia.utils import get_anonymous_user
+
+from .utils import create_asset
+
+
+class TextDeltaTests(TestCase):
+    def test_round_trip(self):
+        successor_text = "first line\nsecond line\nthird line\n"
+
+        for text in (
+            "first line\nthird line\n",
+            "first line\nsecond line\nthird line\nfourth line",
+            "zeroth line\nfirst line\nchanged line\nthird line\n",
+            "",
+        ):
+            delta = make_text_delta(successor_text, text)
+            self.assertEqual(text, apply_text_delta(successor_text, delta))
+
+
+class TranscriptionCompactionTests(TestCase):
+    def setUp(self):
+        self.asset = create_asset()
+        self.texts = ["first\nline", "first\nsecond\nline", "first\nsecond\nthird"]
+
+        self.transcriptions = []
+        supersedes = None
+        for text in self.texts:
+            supersedes = Transcription.objects.create(
+                asset=self.asset,
+                user=get_anonymous_user(),
+                text=text,
+                supersedes=supersedes,
+            )
+            self.transcriptions.append(supersedes)
+
+        self.pks = [i.pk for i in self.transcriptions]
+
+    def get_stored_texts(self):
+        return list(
+            Transcription.objects.filter(pk__in=self.pks)
+            .order_by("pk")
+            .values_list("text", flat=True)
+        )
+
+    def test_compaction(self):
+        self.assertEqual(
+            0, compact_transcriptions(updated_before=now() - timedelta(days=1))
+        )
+
+        self.assertEqual(
+            2, compact_transcriptions(updated_before=now() + timedelta(days=1))
+        )
+        self.assertEqual(["", "", self.texts[2]], self.get_stored_texts())
+
+        self.assertEqual(
+            dict(zip(self.pks[:2], self.texts[:2])), get_compacted_texts(self.pks)
+        )
+
+        # Compacted transcriptions are skipped by later runs:
+        self.assertEqual(
+            0, compact_transcriptions(updated_before=now() + timedelta(days=1))
+        )
+
+    def test_later_compaction(self):
+        compact_transcriptions(updated_before=now() + timedelta(days=1))
+
+        Transcription.objects.create(
+            asset=self.asset,
+            user=get_anonymous_user(),
+            text="replaced",
+            supersedes=self.transcriptions[2],
+        )
+
+        # The previous head is compacted against its new successor without
+        # changing the deltas which depend on its text:
+        self.assertEqual(
+            1, compact_transcriptions(updated_before=now() + timedelta(days=1))
+        )
+        self.assertEqual(dict(zip(self.pks, self.texts)), get_compacted_texts(self.pks))
+
+    def test_deleting_the_head_restores_its_predecessor(self):
+        compact_transcriptions(updated_before=now() + timedelta(days=1))
+
+        self.transcriptions[2].delete()
+
+        # Older transcriptions stay compacted against the restored text:
+        self.assertEqual(["", self.texts[1]], self.get_stored_texts())
+        self.assertEqual(
+            [self.pks[0]],
+            list(
+                TranscriptionTextDelta.objects.values_list(
+                    "transcription_id", flat=True
+                )
+            ),
+        )
+        self.assertEqual(
+            {self.pks[0]: self.texts[0]}, get_compacted_texts(self.pks[:2])
+        )
+
+    def test_command(self):
+        call_command("compact_transcription_history", min_age_days=0, verbosity=0)
+
+        self.assertEqual(["", "", self.texts[2]], self.get_stored_texts())
@@ -0,0 +1,155 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from concordia.models import (
+    Asset,
+    Campaign,
+    Topic,
+    Transcription,
+    TranscriptionStatus,
+    TranscriptionStatusCount,
+)
+from concordia.utils import get_anonymous_user
+
+from .utils import create_asset, create_item, create_topic, import_assets
+
+
+class TranscriptionStatusCountTests(TestCase):
+    def setUp(self):
+        self.asset = create_asset()
+        self.item = self.asset.item
+        self.project = self.item.project
+        self.campaign = self.project.campaign
+
+    def get_counts(self, scope_type, scope_id):
+        return TranscriptionStatusCount.objects.get_counts(scope_type, [scope_id])[
+            scope_id
+        ]
+
+    def assertStatusCounts(self, expected):
+        expected = {**dict.fromkeys(TranscriptionStatus.CHOICE_MAP, 0), **expected}
+        for scope_type, scope_id in (
+            ("campaign", self.campaign.pk),
+            ("project", self.project.pk),
+            ("item", self.item.pk),
+        ):
+            self.assertEqual(expected, self.get_counts(scope_type, scope_id))
+
+    def test_stale_asset_saves(self):
+        first = Asset.objects.get(pk=self.asset.pk)
+        second = Asset.objects.get(pk=self.asset.pk)
+
+        # Both were loaded as not started but the second save must only
+        # subtract the status stored by the first:
+        first.transcription_status = TranscriptionStatus.IN_PROGRESS
+        first.save()
+        second.transcription_status = TranscriptionStatus.SUBMITTED
+        second.save()
+
+        self.assertStatusCounts({TranscriptionStatus.SUBMITTED: 1})
+
+    def test_imported_assets(self):
+        item = create_item(project=self.project, item_id="imported-item")
+        import_assets(item, 2)
+
+        # Imported assets are unpublished so they are not counted until later:
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 1})
+
+        asset = item.asset_set.order_by("pk").first()
+        asset.published = True
+        asset.save()
+
+        self.assertEqual(
+            {TranscriptionStatus.NOT_STARTED: 2},
+            {
+                status: count
+                for status, count in self.get_counts(
+                    "campaign", self.campaign.pk
+                ).items()
+                if count
+            },
+        )
+        self.assertEqual(
+            {TranscriptionStatus.NOT_STARTED: 1},
+            {
+                status: count
+                for status, count in self.get_counts("item", item.pk).items()
+                if count
+            },
+        )
+
+    def test_asset_changes(self):
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 1})
+
+        create_asset(item=self.item, slug="test-asset-2")
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 2})
+
+        transcription = Transcription(
+            asset=self.asset, user=get_anonymous_user(), text="test", submitted=now()
+        )
+        transcription.full_clean()
+        transcription.save()
+        self.assertStatusCounts(
+            {TranscriptionStatus.NOT_STARTED: 1, TranscriptionStatus.SUBMITTED: 1}
+        )
+
+        # Only published assets are counted:
+        asset = Asset.objects.get(pk=self.asset.pk)
+        asset.published = False
+        asset.save()
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 1})
+
+        asset.delete()
+        Asset.objects.get(slug="test-asset-2").delete()
+        self.assertStatusCounts({})
+
+    def test_unpublished_parents(self):
+        self.item.published = False
+        self.item.save()
+        self.assertStatusCounts({})
+
+        self.item.published = True
+        self.item.save()
+        self.project.published = False
+        self.project.save()
+        self.assertStatusCounts({})
+
+        self.project.published = True
+        self.project.save()
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 1})
+
+    def test_rebuild(self):
+        TranscriptionStatusCount.objects.update(count=42)
+
+        TranscriptionStatusCount.objects.rebuild(campaign_ids=[self.campaign.pk])
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 1})
+
+        TranscriptionStatusCount.objects.all().delete()
+        TranscriptionStatusCount.objects.rebuild()
+        self.assertStatusCounts({TranscriptionStatus.NOT_STARTED: 1})
+
+    def test_topic_counts(self):
+        topic = create_topic(project=self.project)
+
+        self.assertEqual(
+            {**dict.fromkeys(TranscriptionStatus.CHOICE_MAP, 0), "not_started": 1},
+            self.get_counts("topic", topic.pk),
+        )
+
+        annotated = Topic.objects.filter(pk=topic.pk).annotated().get()
+        self.assertEqual(1, annotated.asset_count)
+        self.assertEqual(1, annotated.not_started_count)
+
+        annotated = Campaign.objects.filter(pk=self.campaign.pk).annotated().get()
+        self.assertEqual(1, annotated.asset_count)
+        self.assertEqual(0, annotated.completed_percent)
+
+    def test_campaign_detail_view(self):
+        resp = self.client.get(
+            reverse("transcriptions:campaign-detail", args=(self.campaign.slug,))
+        )
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual(1, resp.context["not_started_count"])
+        self.assertEqual(100, resp.context["not_started_percent"])
+        self.assertEqual(1, resp.context["projects"][0].not_started_count)
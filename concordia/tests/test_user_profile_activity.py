@@ -0,0 +1,62 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from concordia.models import (
+    Transcription,
+    UserProfileActivity,
+    UserProfileActivityDelta,
+)
+from concordia.tasks import flush_user_profile_activity
+
+from .utils import CreateTestUsers, create_asset
+
+
+class UserProfileActivityTests(CreateTestUsers, TestCase):
+    def setUp(self):
+        self.login_user()
+        self.reviewer = self.create_user("reviewer")
+
+        self.asset = create_asset()
+        self.campaign = self.asset.item.project.campaign
+
+    def get_counts(self, user):
+        return [
+            (i.campaign, i.transcribe_count, i.review_count)
+            for i in UserProfileActivity.objects.for_user(user)
+        ]
+
+    def test_buffered_counts(self):
+        transcription = Transcription.objects.create(
+            asset=self.asset, user=self.user, text="test", submitted=now()
+        )
+        transcription.accepted = now()
+        transcription.reviewed_by = self.reviewer
+        transcription.save()
+
+        self.assertFalse(UserProfileActivity.objects.exists())
+        self.assertEqual([(self.campaign, 1, 0)], self.get_counts(self.user))
+        self.assertEqual([(self.campaign, 0, 1)], self.get_counts(self.reviewer))
+
+        flush_user_profile_activity()
+        self.assertFalse(UserProfileActivityDelta.objects.exists())
+        self.assertEqual([(self.campaign, 1, 0)], self.get_counts(self.user))
+
+        # Pending changes are added to the flushed counts:
+        Transcription.objects.create(
+            asset=self.asset, user=self.user, text="test", supersedes=transcription
+        )
+        self.assertEqual([(self.campaign, 2, 0)], self.get_counts(self.user))
+
+        flush_user_profile_activity()
+        flush_user_profile_activity()
+        activity = UserProfileActivity.objects.get(user=self.user)
+        self.assertEqual(2, activity.transcribe_count)
+
+    def test_profile_includes_pending_counts(self):
+        Transcription.objects.create(asset=self.asset, user=self.user, text="test")
+
+        response = self.client.get(reverse("user-profile"))
+        self.assertEqual(1, len(response.context["user_profile_activity"]))
+        self.assertEqual(1, response.context["totalTranscriptions"])
+        self.assertEqual(0, response.context["totalReviews"])
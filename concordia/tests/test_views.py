@@ -20,7 +20,13 @@ from django.utils.timezone import now
 
 from concordia.models import (
     Asset,
+    AssetTranscriber,
     AssetTranscriptionReservation,
+    Campaign,
+    Item,
+    SiteReportEvent,
+    Tag,
+    TranscribableAsset,
     Transcription,
     TranscriptionStatus,
 )
@@ -475,12 +481,11 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
         asset = create_asset()
 
         # Acquire the reservation: 1 acquire
-        # + 1 reservation check
         # + 1 session if not anonymous and using a database:
         if not anonymous and settings.SESSION_ENGINE.endswith("db"):
-            expected_acquire_queries = 3
-        else:
             expected_acquire_queries = 2
+        else:
+            expected_acquire_queries = 1
 
         # Release the reservation:
         # 1 release + 1 session if not anonymous and using a database:
@@ -534,9 +539,8 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
         # We'll reserve the test asset as the anonymous user and then attempt
         # to edit it after logging in
 
-        # 3 queries =
-        # 1 expiry + 1 acquire
-        with self.assertNumQueries(2):
+        # 1 acquire
+        with self.assertNumQueries(1):
             resp = self.client.post(reverse("reserve-asset", args=(asset.pk,)))
         self.assertEqual(200, resp.status_code)
         self.assertEqual(1, AssetTranscriptionReservation.objects.count())
@@ -572,11 +576,11 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
 
         self.login_user()
 
-        # 1 session check + 1 reservation check + 1 acquire
+        # 1 session check + 1 acquire
         if settings.SESSION_ENGINE.endswith("db"):
-            expected_queries = 3
-        else:
             expected_queries = 2
+        else:
+            expected_queries = 1
 
         with self.assertNumQueries(expected_queries):
             resp = self.client.post(reverse("reserve-asset", args=(asset.pk,)))
@@ -640,11 +644,11 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
 
         self.client.logout()
 
-        # 1 session check + 1 reservation check + 1 acquire
+        # 1 session check + 1 acquire
         if settings.SESSION_ENGINE.endswith("db"):
-            expected_queries = 3
-        else:
             expected_queries = 2
+        else:
+            expected_queries = 1
 
         with self.assertNumQueries(expected_queries):
             resp = self.client.post(reverse("reserve-asset", args=(asset.pk,)))
@@ -691,11 +695,11 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
         delete_old_tombstoned_reservations()
         self.assertEqual(0, AssetTranscriptionReservation.objects.count())
 
-        # 1 session check + 1 reservation check + 1 acquire
+        # 1 session check + 1 acquire
         if settings.SESSION_ENGINE.endswith("db"):
-            expected_queries = 3
-        else:
             expected_queries = 2
+        else:
+            expected_queries = 1
 
         with self.assertNumQueries(expected_queries):
             resp = self.client.post(reverse("reserve-asset", args=(asset.pk,)))
@@ -763,6 +767,28 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
         data = self.assertValidJSON(resp, expected_status=409)
         self.assertIn("error", data)
 
+        # Transcriptions for other assets cannot be superseded:
+        other_asset = create_asset(item=asset.item, slug="other-asset")
+        other_transcription = Transcription.objects.create(
+            asset=other_asset, user=get_anonymous_user(), text="test"
+        )
+        resp = self.client.post(
+            reverse("save-transcription", args=(asset.pk,)),
+            data={"text": "test", "supersedes": other_transcription.pk},
+        )
+        data = self.assertValidJSON(resp, expected_status=400)
+        self.assertEqual("Invalid supersedes value", data["error"])
+
+        # Neither can transcriptions which don't exist, including values which
+        # are out of range for the primary key:
+        for supersedes in (-1, 99999999, 99999999999, -99999999999):
+            resp = self.client.post(
+                reverse("save-transcription", args=(asset.pk,)),
+                data={"text": "test", "supersedes": supersedes},
+            )
+            data = self.assertValidJSON(resp, expected_status=400)
+            self.assertEqual("Invalid supersedes value", data["error"])
+
         # A logged in user can take over from an anonymous user:
         self.login_user()
         resp = self.client.post(
@@ -1095,6 +1121,32 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
         # user didn't send the "baaz" tag, it was removed
         self.assertEqual(["bar", "foo", "quux"], data["all_tags"])
 
+    def test_tag_submission_changes(self):
+        asset = create_asset()
+        self.login_user()
+        submit_url = reverse("submit-tags", kwargs={"asset_pk": asset.pk})
+
+        self.client.post(submit_url, data={"tags": ["foo", "bar", "baaz"]})
+        last_event_pk = SiteReportEvent.objects.latest("pk").pk
+
+        # The number of queries doesn't depend on how many tags change:
+        with self.assertNumQueries(12):
+            resp = self.client.post(
+                submit_url, data={"tags": ["foo", "quux", "corge", "grault"]}
+            )
+        data = self.assertValidJSON(resp, expected_status=200)
+        self.assertEqual(["corge", "foo", "grault", "quux"], data["user_tags"])
+
+        self.assertEqual(
+            [{"tag_uses": 1}],
+            list(
+                SiteReportEvent.objects.filter(pk__gt=last_event_pk).values_list(
+                    "deltas", flat=True
+                )
+            ),
+        )
+        self.assertEqual(1, Tag.objects.filter(value="quux").count())
+
     def test_tag_deletion(self):
         asset = create_asset()
         self.login_user()
@@ -1474,3 +1526,169 @@ class TransactionalViewTests(CreateTestUsers, JSONAssertMixin, TransactionTestCa
             ),
             in_progress_asset_in_item.get_absolute_url(),
         )
+
+    def test_find_next_transcribable_skips_reserved(self):
+        asset1 = create_asset(slug="test-asset-1")
+        asset2 = create_asset(item=asset1.item, slug="test-asset-2", sequence=2)
+        campaign = asset1.item.project.campaign
+
+        AssetTranscriptionReservation.objects.create(
+            asset=asset1, reservation_token="other-token"
+        )
+
+        resp = self.client.get(
+            reverse(
+                "transcriptions:redirect-to-next-transcribable-campaign-asset",
+                kwargs={"campaign_slug": campaign.slug},
+            )
+        )
+
+        self.assertRedirects(resp, expected_url=asset2.get_absolute_url())
+
+    def test_transcribable_asset_queue(self):
+        asset = create_asset()
+        item = asset.item
+
+        queued = TranscribableAsset.objects.get()
+        self.assertEqual(asset.pk, queued.asset_id)
+        self.assertEqual(item.project.campaign_id, queued.campaign_id)
+        self.assertTrue(queued.unstarted)
+
+        asset.transcription_status = TranscriptionStatus.IN_PROGRESS
+        asset.save()
+        self.assertFalse(TranscribableAsset.objects.get().unstarted)
+
+        asset.transcription_status = TranscriptionStatus.SUBMITTED
+        asset.save()
+        self.assertFalse(TranscribableAsset.objects.exists())
+
+        asset.transcription_status = TranscriptionStatus.NOT_STARTED
+        asset.save()
+        item.published = False
+        item.save()
+        self.assertFalse(TranscribableAsset.objects.exists())
+
+        # Bulk updates are handled by rebuilding the queue:
+        Item.objects.update(published=True)
+        TranscribableAsset.objects.refresh()
+        self.assertEqual(asset.pk, TranscribableAsset.objects.get().asset_id)
+
+    def test_find_next_transcribable_no_campaign_ordering(self):
+        asset1 = create_asset(transcription_status=TranscriptionStatus.SUBMITTED)
+        campaign1 = asset1.item.project.campaign
+
+        campaign2 = create_campaign(slug="second-campaign", ordering=1)
+        asset2 = create_asset(
+            item=create_item(
+                project=create_project(campaign=campaign2, slug="second-project"),
+                item_id="second-item",
+            ),
+            slug="second-asset",
+        )
+        campaign3 = create_campaign(slug="third-campaign", ordering=2)
+        create_asset(
+            item=create_item(
+                project=create_project(campaign=campaign3, slug="third-project"),
+                item_id="third-item",
+            ),
+            slug="third-asset",
+        )
+        self.assertLess(campaign1.ordering, campaign2.ordering)
+
+        resp = self.client.get(reverse("redirect-to-next-transcribable-asset"))
+        self.assertRedirects(resp, expected_url=asset2.get_absolute_url())
+
+    def test_find_next_transcribable_no_campaign_skips_reserved(self):
+        asset1 = create_asset()
+        AssetTranscriptionReservation.objects.create(
+            asset=asset1, reservation_token="other-token"
+        )
+
+        campaign2 = create_campaign(slug="second-campaign", ordering=1)
+        asset2 = create_asset(
+            item=create_item(
+                project=create_project(campaign=campaign2, slug="second-project"),
+                item_id="second-item",
+            ),
+            slug="second-asset",
+        )
+
+        # The first campaign with an available asset is found in one query:
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                campaign2.pk,
+                TranscribableAsset.objects.exclude(asset=asset1).first_campaign_id(
+                    Campaign.objects.published().listed()
+                ),
+            )
+
+        resp = self.client.get(reverse("redirect-to-next-transcribable-asset"))
+        self.assertRedirects(resp, expected_url=asset2.get_absolute_url())
+
+    def test_find_next_transcribable_no_campaign_exhausted(self):
+        create_asset(transcription_status=TranscriptionStatus.SUBMITTED)
+
+        resp = self.client.get(reverse("redirect-to-next-transcribable-asset"))
+        self.assertRedirects(resp, expected_url=reverse("homepage"))
+
+    def test_find_next_reviewable_skips_own_transcriptions(self):
+        self.login_user()
+        anon = get_anonymous_user()
+
+        asset1 = create_asset(slug="test-review-asset-1")
+        asset2 = create_asset(item=asset1.item, slug="test-review-asset-2")
+
+        for asset, user in ((asset1, self.user), (asset2, anon)):
+            transcription = Transcription(
+                asset=asset, user=user, text="test", submitted=now()
+            )
+            transcription.full_clean()
+            transcription.save()
+
+        self.assertQuerysetEqual(
+            AssetTranscriber.objects.filter(user=self.user).values_list(
+                "asset_id", flat=True
+            ),
+            [asset1.pk],
+        )
+
+        response = self.client.get(
+            reverse(
+                "transcriptions:redirect-to-next-reviewable-campaign-asset",
+                kwargs={"campaign_slug": asset1.item.project.campaign.slug},
+            )
+        )
+
+        self.assertRedirects(response, expected_url=asset2.get_absolute_url())
+
+    def test_find_next_reviewable_review_reservation(self):
+        anon = get_anonymous_user()
+
+        asset1 = create_asset(slug="test-review-asset-1")
+        asset2 = create_asset(item=asset1.item, slug="test-review-asset-2")
+
+        for asset in (asset1, asset2):
+            transcription = Transcription(
+                asset=asset, user=anon, text="test", submitted=now()
+            )
+            transcription.full_clean()
+            transcription.save()
+
+        url = reverse(
+            "transcriptions:redirect-to-next-reviewable-campaign-asset",
+            kwargs={"campaign_slug": asset1.item.project.campaign.slug},
+        )
+
+        # Each reviewer is sent to a different asset:
+        self.assertRedirects(self.client.get(url), asset1.get_absolute_url())
+        self.assertRedirects(self.client_class().get(url), asset2.get_absolute_url())
+
+        reservation = AssetTranscriptionReservation.objects.get(asset=asset1)
+        self.assertTrue(reservation.review)
+
+        # Review reservations expire quickly:
+        AssetTranscriptionReservation.objects.update(
+            updated_on=now() - timedelta(seconds=settings.REVIEW_RESERVATION_SECONDS)
+        )
+        expire_inactive_asset_reservations()
+        self.assertFalse(AssetTranscriptionReservation.objects.exists())
@@ -1,10 +1,14 @@
 import json
+import uuid
 from functools import wraps
 from secrets import token_hex
+from unittest import mock
 
 from django.utils.text import slugify
 
 from concordia.models import Asset, Campaign, Item, MediaType, Project, Topic, User
+from importer.models import ImportItem, ImportJob
+from importer.tasks import import_item
 
 
 def ensure_slug(original_function):
@@ -160,6 +164,41 @@ def create_asset(
     return asset
 
 
+def import_assets(item, asset_count):
+    """
+    Create assets for the item using the importer without downloading them
+    """
+
+    item.metadata = {
+        "resources": [
+            {
+                "url": f"https://www.loc.gov/resource/{item.item_id}/",
+                "files": [
+                    [
+                        {
+                            "url": f"https://tile.loc.gov/{item.item_id}/{i}.jpg",
+                            "mimetype": "image/jpeg",
+                            "height": 100,
+                            "width": 100,
+                        }
+                    ]
+                    for i in range(asset_count)
+                ],
+            }
+        ]
+    }
+    item.save()
+
+    job = ImportJob.objects.create(project=item.project, url=item.item_url)
+    task = mock.Mock()
+    task.request.id = str(uuid.uuid4())
+    # The downloads are started by calling the group of download tasks:
+    with mock.patch("importer.tasks.group"):
+        import_item(
+            task, ImportItem.objects.create(job=job, item=item, url=item.item_url)
+        )
+
+
 class JSONAssertMixin(object):
     def assertValidJSON(self, response, expected_status=200):
         """
@@ -0,0 +1,213 @@
+"""
+Compaction of the text of superseded transcriptions
+
+Every save creates a new Transcription which supersedes the previous one so a
+long document accumulates many nearly identical copies of its text. Compaction
+replaces the text of a superseded transcription with a compressed delta against
+the text of the transcription which superseded it, stored as a
+TranscriptionTextDelta, so only the head of each chain keeps its full text.
+
+The transcription rows themselves are kept since they record who worked on an
+asset and are counted by the difficulty values and site reports.
+"""
+
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from more_itertools.more import chunked
+
+from .models import Transcription, TranscriptionTextDelta
+
+
+def make_text_delta(successor_text, text):
+    """
+    Return a compressed delta which recreates text from successor_text
+
+    The delta is a list of either [start, end] ranges of the successor's lines
+    or literal strings for the lines which are not in the successor.
+    """
+
+    successor_lines = successor_text.splitlines(keepends=True)
+    lines = text.splitlines(keepends=True)
+
+    operations = []
+    matcher = SequenceMatcher(None, successor_lines, lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            operations.append([i1, i2])
+        elif j1 < j2:
+            operations.append("".join(lines[j1:j2]))
+
+    return zlib.compress(json.dumps(operations, separators=(",", ":")).encode("utf-8"))
+
+
+def apply_text_delta(successor_text, delta):
+    """
+    Return the text recreated by a delta from make_text_delta
+    """
+
+    successor_lines = successor_text.splitlines(keepends=True)
+
+    parts = []
+    for operation in json.loads(zlib.decompress(delta)):
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            start, end = operation
+            parts.extend(successor_lines[start:end])
+
+    return "".join(parts)
+
+
+def reconstruct_texts(transcriptions, deltas):
+    """
+    Return the full text of each transcription
+
+    transcriptions must be a list of (pk, supersedes_id, text) tuples which
+    includes the successors of every compacted transcription and deltas must be
+    a {transcription_id: delta} mapping.
+    """
+
+    stored_texts = {}
+    successors = {}
+    for pk, supersedes_id, text in transcriptions:
+        stored_texts[pk] = text
+        if supersedes_id is not None:
+            successors[supersedes_id] = pk
+
+    texts = {}
+    for pk in stored_texts:
+        # Walk forward to the first transcription with its full text and then
+        # apply the deltas back to the one we started from:
+        compacted_pks = []
+        while pk not in texts and pk in deltas:
+            compacted_pks.append(pk)
+            pk = successors[pk]
+
+        text = texts.setdefault(pk, stored_texts[pk])
+        for compacted_pk in reversed(compacted_pks):
+            text = texts[compacted_pk] = apply_text_delta(text, deltas[compacted_pk])
+
+    return texts
+
+
+def get_asset_transcription_texts(asset_ids):
+    """
+    Return {transcription_pk: text} for every transcription of the assets
+    """
+
+    transcriptions = Transcription.objects.filter(asset__in=asset_ids).values_list(
+        "pk", "supersedes_id", "text"
+    )
+    deltas = dict(
+        TranscriptionTextDelta.objects.filter(
+            transcription__asset__in=asset_ids
+        ).values_list("transcription_id", "delta")
+    )
+
+    return reconstruct_texts(transcriptions, deltas)
+
+
+def get_compacted_texts(transcription_ids):
+    """
+    Return {transcription_pk: text} for the transcriptions which have been
+    compacted, which won't include any whose text is stored normally
+    """
+
+    compacted_asset_ids = dict(
+        TranscriptionTextDelta.objects.filter(
+            transcription__in=transcription_ids
+        ).values_list("transcription_id", "transcription__asset_id")
+    )
+    if not compacted_asset_ids:
+        return {}
+
+    texts = get_asset_transcription_texts(set(compacted_asset_ids.values()))
+    return {pk: texts[pk] for pk in compacted_asset_ids}
+
+
+@transaction.atomic
+def compact_asset_transcriptions(asset_ids, *, updated_before):
+    """
+    Compact the superseded transcriptions for the assets which have not been
+    updated since updated_before, returning the number compacted
+    """
+
+    transcriptions = list(
+        Transcription.objects.filter(asset__in=asset_ids).values_list(
+            "pk", "supersedes_id", "text", "updated_on"
+        )
+    )
+    deltas = dict(
+        TranscriptionTextDelta.objects.filter(
+            transcription__asset__in=asset_ids
+        ).values_list("transcription_id", "delta")
+    )
+
+    texts = reconstruct_texts([i[:3] for i in transcriptions], deltas)
+    successors = {
+        supersedes_id: pk
+        for pk, supersedes_id, _, _ in transcriptions
+        if supersedes_id is not None
+    }
+
+    new_deltas = [
+        TranscriptionTextDelta(
+            transcription_id=pk,
+            delta=make_text_delta(texts[successors[pk]], texts[pk]),
+        )
+        for pk, _, text, updated_on in transcriptions
+        if pk in successors
+        and pk not in deltas
+        and text
+        and updated_on < updated_before
+    ]
+
+    TranscriptionTextDelta.objects.bulk_create(new_deltas, ignore_conflicts=True)
+    # This intentionally doesn't change updated_on, which is used to find the
+    # assets whose transcriptions have changed:
+    Transcription.objects.filter(
+        pk__in=[i.transcription_id for i in new_deltas]
+    ).update(text="")
+
+    return len(new_deltas)
+
+
+def compact_transcriptions(*, updated_before, chunk_size=100):
+    """
+    Compact every superseded transcription which has not been updated since
+    updated_before, returning the number compacted
+    """
+
+    asset_ids = (
+        Transcription.objects.filter(
+            superseded_by__isnull=False,
+            text_delta__isnull=True,
+            updated_on__lt=updated_before,
+        )
+        .exclude(text="")
+        .order_by()
+        .values_list("asset_id", flat=True)
+        .distinct()
+    )
+
+    compacted_count = 0
+    for asset_id_chunk in chunked(asset_ids.iterator(), chunk_size):
+        compacted_count += compact_asset_transcriptions(
+            asset_id_chunk, updated_before=updated_before
+        )
+
+    return compacted_count
+
+
+@transaction.atomic
+def restore_transcription_texts(transcription_ids):
+    """
+    Store the full text of any compacted transcriptions again
+    """
+
+    for pk, text in get_compacted_texts(transcription_ids).items():
+        Transcription.objects.filter(pk=pk).update(text=text)
+        TranscriptionTextDelta.objects.filter(transcription=pk).delete()
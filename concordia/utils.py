@@ -1,5 +1,8 @@
+from functools import lru_cache
 from secrets import token_hex
 
+import redis
+from django.conf import settings
 from django.contrib.auth.models import User
 
 from .templatetags.concordia_media_tags import asset_media_url
@@ -25,9 +28,22 @@ def request_accepts_json(request):
 
 
 def get_or_create_reservation_token(request):
-    if "reservation_token" not in request.session:
-        request.session["reservation_token"] = token_hex(25)
-    return request.session["reservation_token"]
+    return get_or_create_session_reservation_token(request.session)
+
+
+def get_or_create_session_reservation_token(session):
+    if "reservation_token" not in session:
+        session["reservation_token"] = token_hex(25)
+    return session["reservation_token"]
+
+
+@lru_cache(maxsize=None)
+def get_redis_connection():
+    """
+    Return a shared client for the Redis database used for application data
+    """
+
+    return redis.Redis.from_url(settings.REDIS_URL)
 
 
 def get_image_urls_from_asset(asset):
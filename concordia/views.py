@@ -25,7 +25,7 @@ from django.contrib.messages import get_messages
 from django.core.exceptions import ValidationError
 from django.core.mail import EmailMultiAlternatives, send_mail
 from django.core.paginator import Paginator
-from django.db import connection
+from django.db import IntegrityError, connection
 from django.db.models import Case, Count, IntegerField, Max, OuterRef, Q, Subquery, When
 from django.db.models.functions import Greatest
 from django.db.transaction import atomic
@@ -60,22 +60,27 @@ from concordia.forms import (
 from concordia.models import (
     STATUS_COUNT_KEYS,
     Asset,
-    AssetTranscriptionReservation,
+    AssetTranscriber,
     Banner,
     Campaign,
     CarouselSlide,
     Item,
     Project,
+    ScopeContributor,
     SimplePage,
     SiteReport,
+    SiteReportEvent,
     Tag,
     Topic,
+    TranscribableAsset,
     Transcription,
     TranscriptionStatus,
+    TranscriptionStatusCount,
     UserAssetTagCollection,
     UserProfileActivity,
     UserRetiredCampaign,
 )
+from concordia.reservation_backends import ReservationStatus, get_reservation_backend
 from concordia.signals.signals import reservation_obtained, reservation_released
 from concordia.templatetags.concordia_media_tags import asset_media_url
 from concordia.utils import (
@@ -527,9 +532,7 @@ class AccountProfileView(LoginRequiredMixin, FormView, ListView):
             ctx["start"] = start
 
         user = self.request.user
-        user_profile_activity = UserProfileActivity.objects.filter(user=user).order_by(
-            "campaign__title"
-        )
+        user_profile_activity = UserProfileActivity.objects.for_user(user)
         ctx["user_profile_activity"] = user_profile_activity
 
         q = Q(transcription__user=user) | Q(transcription__reviewed_by=user)
@@ -622,31 +625,15 @@ class CampaignListView(APIListView):
 
         object_list = data["objects"]
 
-        campaign_stats_qs = (
-            Campaign.objects.filter(pk__in=[i["id"] for i in object_list])
-            .annotate(
-                **{
-                    v: Count(
-                        "project__item__asset",
-                        filter=Q(
-                            project__published=True,
-                            project__item__published=True,
-                            project__item__asset__published=True,
-                            project__item__asset__transcription_status=k,
-                        ),
-                    )
-                    for k, v in STATUS_COUNT_KEYS.items()
-                }
-            )
-            .values("pk", *STATUS_COUNT_KEYS.values())
+        campaign_status_counts = TranscriptionStatusCount.objects.get_counts(
+            "campaign", [i["id"] for i in object_list]
         )
 
-        campaign_asset_counts = {}
-        for campaign_stats in campaign_stats_qs:
-            campaign_asset_counts[campaign_stats.pop("pk")] = campaign_stats
-
         for obj in object_list:
-            obj["asset_stats"] = campaign_asset_counts[obj["id"]]
+            obj["asset_stats"] = {
+                STATUS_COUNT_KEYS[status]: count
+                for status, count in campaign_status_counts[obj["id"]].items()
+            }
 
         return data
 
@@ -664,22 +651,18 @@ class CompletedCampaignListView(APIListView):
     context_object_name = "campaigns"
 
 
-def calculate_asset_stats(asset_qs, ctx):
-    asset_count = asset_qs.count()
-
-    trans_qs = Transcription.objects.filter(asset__in=asset_qs).values_list(
-        "user_id", "reviewed_by"
-    )
-    user_ids = set()
-    for i, j in trans_qs.iterator():
-        user_ids.add(i)
-        user_ids.add(j)
+def calculate_asset_stats(ctx, scope_type, scope_id):
+    """
+    Add contributor and status counts for a campaign, topic, project or item to
+    the template context
+    """
 
-    ctx["contributor_count"] = len(user_ids)
+    status_counts_by_key = TranscriptionStatusCount.objects.get_counts(
+        scope_type, [scope_id]
+    )[scope_id]
+    asset_count = sum(status_counts_by_key.values())
 
-    asset_state_qs = asset_qs.values_list("transcription_status")
-    asset_state_qs = asset_state_qs.annotate(Count("transcription_status")).order_by()
-    status_counts_by_key = dict(asset_state_qs)
+    ctx["contributor_count"] = ScopeContributor.objects.get_count(scope_type, scope_id)
 
     ctx["transcription_status_counts"] = labeled_status_counts = []
 
@@ -734,31 +717,15 @@ class TopicListView(APIListView):
 
         object_list = data["objects"]
 
-        topic_stats_qs = (
-            Topic.objects.filter(pk__in=[i["id"] for i in object_list])
-            .annotate(
-                **{
-                    v: Count(
-                        "project__item__asset",
-                        filter=Q(
-                            project__published=True,
-                            project__item__published=True,
-                            project__item__asset__published=True,
-                            project__item__asset__transcription_status=k,
-                        ),
-                    )
-                    for k, v in STATUS_COUNT_KEYS.items()
-                }
-            )
-            .values("pk", *STATUS_COUNT_KEYS.values())
+        topic_status_counts = TranscriptionStatusCount.objects.get_counts(
+            "topic", [i["id"] for i in object_list]
         )
 
-        topic_asset_counts = {}
-        for topic_stats in topic_stats_qs:
-            topic_asset_counts[topic_stats.pop("pk")] = topic_stats
-
         for obj in object_list:
-            obj["asset_stats"] = topic_asset_counts[obj["id"]]
+            obj["asset_stats"] = {
+                STATUS_COUNT_KEYS[status]: count
+                for status, count in topic_status_counts[obj["id"]].items()
+            }
 
         return data
 
@@ -805,24 +772,9 @@ class TopicDetailView(APIDetailView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
-        projects = (
-            ctx["topic"]
-            .project_set.published()
-            .annotate(
-                **{
-                    f"{key}_count": Count(
-                        "item__asset",
-                        filter=Q(
-                            item__published=True,
-                            item__asset__published=True,
-                            item__asset__transcription_status=key,
-                        ),
-                    )
-                    for key in TranscriptionStatus.CHOICE_MAP.keys()
-                }
-            )
-            .order_by("campaign", "ordering", "title")
-        )
+        projects = TranscriptionStatusCount.objects.annotate_counts(
+            ctx["topic"].project_set.published(), "project"
+        ).order_by("campaign", "ordering", "title")
 
         ctx["filters"] = filters = {}
         status = self.request.GET.get("transcription_status")
@@ -835,14 +787,7 @@ class TopicDetailView(APIDetailView):
         annotate_children_with_progress_stats(projects)
         ctx["projects"] = projects
 
-        topic_assets = Asset.objects.filter(
-            item__project__topics=self.object,
-            item__project__published=True,
-            item__published=True,
-            published=True,
-        )
-
-        calculate_asset_stats(topic_assets, ctx)
+        calculate_asset_stats(ctx, "topic", self.object.pk)
 
         return ctx
 
@@ -874,24 +819,9 @@ class CampaignDetailView(APIDetailView):
             ctx["completed_count"] = latest_report.assets_completed
             ctx["contributor_count"] = latest_report.registered_contributors
         else:
-            projects = (
-                ctx["campaign"]
-                .project_set.published()
-                .annotate(
-                    **{
-                        f"{key}_count": Count(
-                            "item__asset",
-                            filter=Q(
-                                item__published=True,
-                                item__asset__published=True,
-                                item__asset__transcription_status=key,
-                            ),
-                        )
-                        for key in TranscriptionStatus.CHOICE_MAP
-                    }
-                )
-                .order_by("ordering", "title")
-            )
+            projects = TranscriptionStatusCount.objects.annotate_counts(
+                ctx["campaign"].project_set.published(), "project"
+            ).order_by("ordering", "title")
 
             ctx["filters"] = filters = {}
             status = self.request.GET.get("transcription_status")
@@ -905,14 +835,7 @@ class CampaignDetailView(APIDetailView):
             annotate_children_with_progress_stats(projects)
             ctx["projects"] = projects
 
-            campaign_assets = Asset.objects.filter(
-                item__project__campaign=self.object,
-                item__project__published=True,
-                item__published=True,
-                published=True,
-            )
-
-            calculate_asset_stats(campaign_assets, ctx)
+            calculate_asset_stats(ctx, "campaign", self.object.pk)
 
         return ctx
 
@@ -949,14 +872,7 @@ class ProjectDetailView(APIListView):
         )
 
         item_qs = self.project.item_set.published().order_by("item_id")
-        item_qs = item_qs.annotate(
-            **{
-                f"{key}_count": Count(
-                    "asset", filter=Q(asset__transcription_status=key)
-                )
-                for key in TranscriptionStatus.CHOICE_MAP
-            }
-        )
+        item_qs = TranscriptionStatusCount.objects.annotate_counts(item_qs, "item")
 
         self.filters = {}
         status = self.request.GET.get("transcription_status")
@@ -977,11 +893,7 @@ class ProjectDetailView(APIListView):
             ctx["sublevel_querystring"] = urlencode(self.filters)
             ctx["filters"] = self.filters
 
-        project_assets = Asset.objects.filter(
-            item__project=project, published=True, item__published=True
-        )
-
-        calculate_asset_stats(project_assets, ctx)
+        calculate_asset_stats(ctx, "project", project.pk)
 
         annotate_children_with_progress_stats(ctx["items"])
 
@@ -1043,9 +955,7 @@ class ItemDetailView(APIListView):
             }
         )
 
-        item_assets = self.item.asset_set.published()
-
-        calculate_asset_stats(item_assets, ctx)
+        calculate_asset_stats(ctx, "item", self.item.pk)
 
         return ctx
 
@@ -1078,7 +988,9 @@ class AssetDetailView(APIDetailView):
             item__item_id=self.kwargs["item_id"],
             slug=self.kwargs["slug"],
         )
-        asset_qs = asset_qs.select_related("item__project__campaign")
+        asset_qs = asset_qs.select_related(
+            "item__project__campaign", "latest_transcription"
+        )
 
         return asset_qs
 
@@ -1095,7 +1007,7 @@ class AssetDetailView(APIDetailView):
         ctx["project"] = project = item.project
         ctx["campaign"] = project.campaign
 
-        transcription = asset.transcription_set.order_by("-pk").first()
+        transcription = asset.latest_transcription
         ctx["transcription"] = transcription
 
         ctx["next_open_asset_url"] = "%s?%s" % (
@@ -1228,6 +1140,18 @@ def validate_anonymous_captcha(view):
     return inner
 
 
+#: Maps the Transcription constraints which save_transcription relies on to
+#: the error message and status code returned when they are violated
+SAVE_TRANSCRIPTION_CONSTRAINT_ERRORS = {
+    "unique_open_transcription_per_asset": (
+        "An open transcription already exists",
+        409,
+    ),
+    "unique_transcription_supersedes": ("This transcription has been superseded", 409),
+    "transcription_supersedes_same_asset": ("Invalid supersedes value", 400),
+}
+
+
 @require_POST
 @validate_anonymous_captcha
 @atomic
@@ -1252,29 +1176,38 @@ def save_transcription(request, *, asset_pk):
             status=400,
         )
 
-    supersedes_pk = request.POST.get("supersedes")
-    if not supersedes_pk:
-        superseded = None
-        if asset.transcription_set.filter(supersedes=None).exists():
-            return JsonResponse(
-                {"error": "An open transcription already exists"}, status=409
-            )
-    else:
-        if asset.transcription_set.filter(supersedes=supersedes_pk).exists():
-            return JsonResponse(
-                {"error": "This transcription has been superseded"}, status=409
-            )
-
-        try:
-            superseded = asset.transcription_set.get(pk=supersedes_pk)
-        except Transcription.DoesNotExist:
-            return JsonResponse({"error": "Invalid supersedes value"}, status=400)
+    # Values outside the primary key's range would fail the INSERT with a
+    # DataError rather than the constraint violation handled below:
+    min_pk, max_pk = connection.ops.integer_field_range(
+        Transcription._meta.pk.get_internal_type()
+    )
+    try:
+        supersedes_pk = int(request.POST.get("supersedes") or 0) or None
+    except ValueError:
+        return JsonResponse({"error": "Invalid supersedes value"}, status=400)
+    if supersedes_pk is not None and not min_pk <= supersedes_pk <= max_pk:
+        return JsonResponse({"error": "Invalid supersedes value"}, status=400)
 
     transcription = Transcription(
-        asset=asset, user=user, supersedes=superseded, text=transcription_text
+        asset=asset, user=user, supersedes_id=supersedes_pk, text=transcription_text
+    )
+    # The related objects are checked by the database constraints below rather
+    # than by querying for them first:
+    transcription.full_clean(
+        exclude=["asset", "user", "supersedes"], validate_unique=False
     )
-    transcription.full_clean()
-    transcription.save()
+
+    try:
+        with atomic():
+            transcription.save()
+    except IntegrityError as exc:
+        constraint_name = getattr(
+            getattr(exc.__cause__, "diag", None), "constraint_name", None
+        )
+        if constraint_name not in SAVE_TRANSCRIPTION_CONSTRAINT_ERRORS:
+            raise
+        error, status = SAVE_TRANSCRIPTION_CONSTRAINT_ERRORS[constraint_name]
+        return JsonResponse({"error": error}, status=status)
 
     return JsonResponse(
         {
@@ -1384,41 +1317,68 @@ def review_transcription(request, *, pk):
 def submit_tags(request, *, asset_pk):
     asset = get_object_or_404(Asset, pk=asset_pk)
 
-    user_tags, created = UserAssetTagCollection.objects.get_or_create(
-        asset=asset, user=request.user
-    )
+    # Locking the collection serializes concurrent submissions from the same
+    # user so the changes below are calculated from the current tags:
+    user_tags, created = UserAssetTagCollection.objects.select_for_update(
+        of=("self",)
+    ).get_or_create(asset=asset, user=request.user)
 
-    tags = set(request.POST.getlist("tags"))
-    existing_tags = Tag.objects.filter(value__in=tags)
-    new_tag_values = tags.difference(i.value for i in existing_tags)
-    new_tags = [Tag(value=i) for i in new_tag_values]
+    tag_values = set(request.POST.getlist("tags"))
+    submitted_tag_ids = dict(
+        Tag.objects.filter(value__in=tag_values).values_list("value", "pk")
+    )
+    new_tags = [Tag(value=i) for i in tag_values.difference(submitted_tag_ids)]
     try:
         for i in new_tags:
-            i.full_clean()
+            i.clean_fields()
     except ValidationError as exc:
         return JsonResponse({"error": exc.messages}, status=400)
 
-    Tag.objects.bulk_create(new_tags)
+    if new_tags:
+        # Another request may create the same tags first so we load the IDs
+        # rather than relying on the inserted objects:
+        Tag.objects.bulk_create(new_tags, ignore_conflicts=True)
+        submitted_tag_ids.update(
+            Tag.objects.filter(value__in=[i.value for i in new_tags]).values_list(
+                "value", "pk"
+            )
+        )
+    submitted_tag_ids = set(submitted_tag_ids.values())
 
     # At this point we now have Tag objects for everything in the POSTed
     # request. We'll add anything which wasn't previously in this user's tag
-    # collection and remove anything which is no longer present.
-
-    all_submitted_tags = list(existing_tags) + new_tags
+    # collection and remove anything which is no longer present from every
+    # collection for the asset. The through table is updated directly so the
+    # tag usage change is recorded here rather than by the m2m_changed handler.
 
-    existing_user_tags = user_tags.tags.all()
+    TagCollectionTags = UserAssetTagCollection.tags.through
+    asset_tag_collections = TagCollectionTags.objects.filter(
+        userassettagcollection__asset=asset
+    )
 
-    for tag in all_submitted_tags:
-        if tag not in existing_user_tags:
-            user_tags.tags.add(tag)
+    added_tag_ids = submitted_tag_ids.difference(
+        TagCollectionTags.objects.filter(userassettagcollection=user_tags).values_list(
+            "tag_id", flat=True
+        )
+    )
+    TagCollectionTags.objects.bulk_create(
+        [
+            TagCollectionTags(userassettagcollection=user_tags, tag_id=i)
+            for i in added_tag_ids
+        ],
+        ignore_conflicts=True,
+    )
 
-    all_tags_qs = Tag.objects.filter(userassettagcollection__asset__pk=asset_pk)
+    removed_count, _ = asset_tag_collections.exclude(tag__in=submitted_tag_ids).delete()
 
-    for tag in all_tags_qs:
-        if tag not in all_submitted_tags:
-            for collection in asset.userassettagcollection_set.all():
-                collection.tags.remove(tag)
+    if added_tag_ids or removed_count:
+        SiteReportEvent.objects.record(
+            SiteReportEvent.EventType.TAG,
+            {"tag_uses": len(added_tag_ids) - removed_count},
+            asset_id=asset.pk,
+        )
 
+    all_tags_qs = Tag.objects.filter(userassettagcollection__asset__pk=asset_pk)
     all_tags = all_tags_qs.order_by("value")
 
     final_user_tags = user_tags.tags.order_by("value").values_list("value", flat=True)
@@ -1605,136 +1565,40 @@ def reserve_asset(request, *, asset_pk):
     """
 
     reservation_token = get_or_create_reservation_token(request)
+    backend = get_reservation_backend()
+
+    # We'll pass the message to the WebSocket listeners before returning it:
+    msg = {"asset_pk": asset_pk, "reservation_token": reservation_token}
 
     # If the browser is letting us know of a specific reservation release,
     # let it go even if it's within the grace period.
     if request.POST.get("release"):
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                DELETE FROM concordia_assettranscriptionreservation
-                WHERE asset_id = %s and reservation_token = %s
-                """,
-                [asset_pk, reservation_token],
-            )
+        backend.release(asset_pk, reservation_token)
 
-        # We'll pass the message to the WebSocket listeners before returning it:
-        msg = {"asset_pk": asset_pk, "reservation_token": reservation_token}
         logger.info("Releasing reservation with token %s", reservation_token)
         reservation_released.send(sender="reserve_asset", **msg)
         return JsonResponse(msg)
 
-    # We're relying on the database to meet our integrity requirements and since
-    # this is called periodically we want to be fairly fast until we switch to
-    # something like Redis.
+    status = backend.reserve(asset_pk, reservation_token)
 
-    reservations = AssetTranscriptionReservation.objects.filter(
-        asset_id__exact=asset_pk
-    )
+    if status == ReservationStatus.TOMBSTONED:
+        return HttpResponse(status=408)  # Request Timed Out
 
-    # Default: pretend there is no activity on the asset
-    is_it_already_mine = False
-    am_i_tombstoned = False
-    is_someone_else_tombstoned = False
-    is_someone_else_active = False
-
-    if reservations:
-        for reservation in reservations:
-            if reservation.tombstoned:
-                if reservation.reservation_token == reservation_token:
-                    am_i_tombstoned = True
-                    logger.debug("I'm tombstoned %s", reservation_token)
-                else:
-                    is_someone_else_tombstoned = True
-                    logger.debug(
-                        "Someone else is tombstoned %s", reservation.reservation_token
-                    )
-            else:
-                if reservation.reservation_token == reservation_token:
-                    is_it_already_mine = True
-                    logger.debug(
-                        "I already have this active reservation %s", reservation_token
-                    )
-                if not is_it_already_mine:
-                    is_someone_else_active = True
-                    logger.debug(
-                        "Someone else has this active reservation %s",
-                        reservation.reservation_token,
-                    )
-
-        if am_i_tombstoned:
-            return HttpResponse(status=408)  # Request Timed Out
-
-        if is_someone_else_active:
-            return HttpResponse(status=409)  # Conflict
-
-        if is_it_already_mine:
-            # This user already has the reservation and it's not tombstoned
-            msg = update_reservation(asset_pk, reservation_token)
-            logger.debug("Updating reservation %s", reservation_token)
-
-        if is_someone_else_tombstoned:
-            msg = obtain_reservation(asset_pk, reservation_token)
-            logger.debug(
-                "Obtaining reservation for %s from tombstoned user", reservation_token
-            )
-
-    else:
-        # No reservations = no activity = go ahead and do an insert
-        msg = obtain_reservation(asset_pk, reservation_token)
-        logger.debug("No activity, just get the reservation %s", reservation_token)
+    if status == ReservationStatus.CONFLICT:
+        return HttpResponse(status=409)  # Conflict
 
-    return JsonResponse(msg)
-
-
-def update_reservation(asset_pk, reservation_token):
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-        UPDATE concordia_assettranscriptionreservation AS atr
-            SET updated_on = current_timestamp
-            WHERE (
-                atr.asset_id = %s
-                AND atr.reservation_token = %s
-                AND atr.tombstoned != TRUE
-                )
-        """.strip(),
-            [asset_pk, reservation_token],
-        )
-    # We'll pass the message to the WebSocket listeners before returning it:
-    msg = {"asset_pk": asset_pk, "reservation_token": reservation_token}
-    reservation_obtained.send(sender="reserve_asset", **msg)
-    return msg
-
-
-def obtain_reservation(asset_pk, reservation_token):
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-        INSERT INTO concordia_assettranscriptionreservation AS atr
-            (asset_id, reservation_token, tombstoned, created_on,
-            updated_on)
-            VALUES (%s, %s, FALSE, current_timestamp,
-            current_timestamp)
-        """.strip(),
-            [asset_pk, reservation_token],
-        )
-    # We'll pass the message to the WebSocket listeners before returning it:
-    msg = {"asset_pk": asset_pk, "reservation_token": reservation_token}
     reservation_obtained.send(sender="reserve_asset", **msg)
-    return msg
+    return JsonResponse(msg)
 
 
-def redirect_to_next_asset(potential_assets, mode, request, project_slug, user):
-    asset = potential_assets.first()
+def redirect_to_next_asset(asset, mode, request, project_slug, user):
     reservation_token = get_or_create_reservation_token(request)
     if asset:
-        if mode == "transcribe":
-            res = AssetTranscriptionReservation(
-                asset=asset, reservation_token=reservation_token
-            )
-            res.full_clean()
-            res.save()
+        # Reviewers receive a short reservation so concurrent requests are sent
+        # to different assets. The asset page renews it as a normal reservation:
+        get_reservation_backend().reserve(
+            asset.pk, reservation_token, review=(mode == "review")
+        )
         return redirect(
             "transcriptions:asset-detail",
             asset.item.project.campaign.slug,
@@ -1750,40 +1614,45 @@ def redirect_to_next_asset(potential_assets, mode, request, project_slug, user):
         return redirect("homepage")
 
 
-def filter_and_order_transcribable_assets(
-    potential_assets, project_slug, item_id, asset_id
-):
-    potential_assets = potential_assets.filter(
-        Q(transcription_status=TranscriptionStatus.NOT_STARTED)
-        | Q(transcription_status=TranscriptionStatus.IN_PROGRESS)
-    )
+def find_next_transcribable_asset(queue, project_slug, item_id, asset_id):
+    """
+    Return the next asset from a TranscribableAsset queryset, or None
+
+    Candidates are ranked the same way as for review: assets after the current
+    one first, then unstarted assets before those in progress, then assets in
+    the same item, the same project and finally anywhere else in the queue.
+    Rather than sorting the entire queue we probe each tier in that order using
+    the queue indexes and return the first row which is neither reserved nor
+    locked by a concurrent request.
+    """
 
-    potential_assets = potential_assets.exclude(
-        pk__in=Subquery(AssetTranscriptionReservation.objects.values("asset_id"))
-    )
-    potential_assets = potential_assets.select_related("item", "item__project")
+    queue = queue.select_for_update(skip_locked=True, of=("self",))
+    queue = get_reservation_backend().exclude_reserved(queue, field="asset_id")
+    queue = queue.select_related("asset__item__project__campaign")
+    queue = queue.order_by("sequence", "asset_id")
 
-    # We'll favor assets which are in the same item or project as the original:
-    potential_assets = potential_assets.annotate(
-        unstarted=Case(
-            When(transcription_status=TranscriptionStatus.NOT_STARTED, then=1),
-            default=0,
-            output_field=IntegerField(),
-        ),
-        same_project=Case(
-            When(item__project__slug=project_slug, then=1),
-            default=0,
-            output_field=IntegerField(),
-        ),
-        same_item=Case(
-            When(item__item_id=item_id, then=1), default=0, output_field=IntegerField()
-        ),
-        next_asset=Case(
-            When(pk__gt=asset_id, then=1), default=0, output_field=IntegerField()
-        ),
-    ).order_by("-next_asset", "-unstarted", "-same_project", "-same_item", "sequence")
+    # Each tier includes the previous ones, which is safe because we only reach
+    # it after they were found to be empty:
+    proximity_filters = []
+    if project_slug and item_id:
+        proximity_filters.append(Q(project__slug=project_slug, item__item_id=item_id))
+    if project_slug:
+        proximity_filters.append(Q(project__slug=project_slug))
+    proximity_filters.append(Q())
 
-    return potential_assets
+    position_filters = [Q(asset_id__gt=asset_id)] if asset_id else []
+    position_filters.append(Q())
+
+    for position_filter in position_filters:
+        for unstarted in (True, False):
+            for proximity_filter in proximity_filters:
+                entry = queue.filter(
+                    position_filter, proximity_filter, unstarted=unstarted
+                ).first()
+                if entry:
+                    return entry.asset
+
+    return None
 
 
 def filter_and_order_reviewable_assets(
@@ -1792,10 +1661,10 @@ def filter_and_order_reviewable_assets(
     potential_assets = potential_assets.filter(
         transcription_status=TranscriptionStatus.SUBMITTED
     )
-    potential_assets = potential_assets.exclude(transcription__user=user_pk)
     potential_assets = potential_assets.exclude(
-        pk__in=Subquery(AssetTranscriptionReservation.objects.values("asset_id"))
+        pk__in=AssetTranscriber.objects.filter(user=user_pk).values("asset_id")
     )
+    potential_assets = get_reservation_backend().exclude_reserved(potential_assets)
     potential_assets = potential_assets.select_related("item", "item__project")
 
     # We'll favor assets which are in the same item or project as the original:
@@ -1844,27 +1713,36 @@ def redirect_to_next_reviewable_asset(request):
     )
 
     return redirect_to_next_asset(
-        potential_assets, "review", request, project_slug, user
+        potential_assets.first(), "review", request, project_slug, user
     )
 
 
-def find_transcribable_assets(campaign_counter, project_slug, item_id, asset_id):
-    campaigns = Campaign.objects.published().listed().order_by("ordering")
-    potential_assets = Asset.objects.select_for_update(skip_locked=True, of=("self",))
-    potential_assets = potential_assets.filter(
-        item__project__campaign=campaigns[campaign_counter],
-        item__project__published=True,
-        item__published=True,
-        published=True,
+def find_transcribable_asset_in_listed_campaigns(project_slug, item_id, asset_id):
+    """
+    Return the next asset from the first listed campaign which has one, or None
+    """
+
+    # A single query finds the first campaign, by ordering, which has an asset
+    # that is neither reserved nor locked. Since we now hold the lock on that
+    # row, the search within the campaign is guaranteed to find an asset:
+    available = TranscribableAsset.objects.select_for_update(
+        skip_locked=True, of=("self",)
     )
+    available = get_reservation_backend().exclude_reserved(available, field="asset_id")
+    campaign_id = available.first_campaign_id(Campaign.objects.published().listed())
+
+    if campaign_id is None:
+        return None
+
     # FIXME: if project is specified, the campaign can only be
     # that project's campaign
-    potential_assets = filter_and_order_transcribable_assets(
-        potential_assets, project_slug, item_id, asset_id
+    return find_next_transcribable_asset(
+        TranscribableAsset.objects.filter(campaign=campaign_id),
+        project_slug,
+        item_id,
+        asset_id,
     )
 
-    return potential_assets
-
 
 @never_cache
 @atomic
@@ -1882,19 +1760,12 @@ def redirect_to_next_transcribable_asset(request):
     # FIXME: if the project is specified, select the campaign
     # to which it belongs
 
-    potential_assets = None
-    campaign_counter = 0
-
-    while not potential_assets:
-        potential_assets = find_transcribable_assets(
-            campaign_counter, project_slug, item_id, asset_id
-        )
-        campaign_counter = campaign_counter + 1
-
-    return redirect_to_next_asset(
-        potential_assets, "transcribe", request, project_slug, user
+    asset = find_transcribable_asset_in_listed_campaigns(
+        project_slug, item_id, asset_id
     )
 
+    return redirect_to_next_asset(asset, "transcribe", request, project_slug, user)
+
 
 @never_cache
 @atomic
@@ -1923,7 +1794,7 @@ def redirect_to_next_reviewable_campaign_asset(request, *, campaign_slug):
     )
 
     return redirect_to_next_asset(
-        potential_assets, "review", request, project_slug, user
+        potential_assets.first(), "review", request, project_slug, user
     )
 
 
@@ -1941,20 +1812,14 @@ def redirect_to_next_transcribable_campaign_asset(request, *, campaign_slug):
     else:
         user = request.user
 
-    potential_assets = Asset.objects.select_for_update(skip_locked=True, of=("self",))
-    potential_assets = potential_assets.filter(
-        item__project__campaign=campaign,
-        item__project__published=True,
-        item__published=True,
-        published=True,
-    )
-    potential_assets = filter_and_order_transcribable_assets(
-        potential_assets, project_slug, item_id, asset_id
+    asset = find_next_transcribable_asset(
+        TranscribableAsset.objects.filter(campaign=campaign),
+        project_slug,
+        item_id,
+        asset_id,
     )
 
-    return redirect_to_next_asset(
-        potential_assets, "transcribe", request, project_slug, user
-    )
+    return redirect_to_next_asset(asset, "transcribe", request, project_slug, user)
 
 
 @never_cache
@@ -1984,7 +1849,7 @@ def redirect_to_next_reviewable_topic_asset(request, *, topic_slug):
     )
 
     return redirect_to_next_asset(
-        potential_assets, "review", request, project_slug, user
+        potential_assets.first(), "review", request, project_slug, user
     )
 
 
@@ -2002,21 +1867,14 @@ def redirect_to_next_transcribable_topic_asset(request, *, topic_slug):
     else:
         user = request.user
 
-    potential_assets = Asset.objects.select_for_update(skip_locked=True, of=("self",))
-    potential_assets = potential_assets.filter(
-        item__project__topics__in=(topic,),
-        item__project__published=True,
-        item__published=True,
-        published=True,
+    asset = find_next_transcribable_asset(
+        TranscribableAsset.objects.filter(project__topics__in=(topic,)),
+        project_slug,
+        item_id,
+        asset_id,
     )
 
-    potential_assets = filter_and_order_transcribable_assets(
-        potential_assets, project_slug, item_id, asset_id
-    )
-
-    return redirect_to_next_asset(
-        potential_assets, "transcribe", request, project_slug, user
-    )
+    return redirect_to_next_asset(asset, "transcribe", request, project_slug, user)
 
 
 class AssetListView(APIListView):
@@ -2035,13 +1893,7 @@ class AssetListView(APIListView):
             except (ValueError, TypeError):
                 raise Http404
 
-        latest_transcription_qs = (
-            Transcription.objects.filter(asset=OuterRef("pk"))
-            .order_by("-pk")
-            .values_list("pk", flat=True)
-        )
-
-        qs = qs.annotate(latest_transcription_pk=Subquery(latest_transcription_qs[:1]))
+        qs = qs.select_related("latest_transcription")
 
         return qs.prefetch_related("item", "item__project", "item__project__campaign")
 
@@ -2057,13 +1909,6 @@ class AssetListView(APIListView):
         assets = ctx["assets"]
         asset_pks = [i.pk for i in assets]
 
-        latest_transcriptions = {
-            asset_id: {"id": id, "submitted_by": user_id, "text": text}
-            for id, asset_id, user_id, text in Transcription.objects.filter(
-                pk__in=[i.latest_transcription_pk for i in assets]
-            ).values_list("id", "asset_id", "user_id", "text")
-        }
-
         adjacent_asset_qs = Asset.objects.filter(
             published=True, item=OuterRef("item")
         ).values("sequence")
@@ -2090,8 +1935,6 @@ class AssetListView(APIListView):
         }
 
         for asset in assets:
-            asset.latest_transcription = latest_transcriptions.get(asset.pk, None)
-
             asset.previous_sequence, asset.next_sequence = adjacent_seqs.get(
                 asset.id, (None, None)
             )
@@ -2106,6 +1949,15 @@ class AssetListView(APIListView):
 
         image_url, thumbnail_url = get_image_urls_from_asset(obj)
 
+        if obj.latest_transcription is None:
+            latest_transcription = None
+        else:
+            latest_transcription = {
+                "id": obj.latest_transcription.pk,
+                "submitted_by": obj.latest_transcription.user_id,
+                "text": obj.latest_transcription.text,
+            }
+
         metadata = {
             "id": obj.pk,
             "status": obj.transcription_status,
@@ -2117,7 +1969,7 @@ class AssetListView(APIListView):
             "year": obj.year,
             "sequence": obj.sequence,
             "resource_url": obj.resource_url,
-            "latest_transcription": obj.latest_transcription,
+            "latest_transcription": latest_transcription,
             "item": {
                 "id": item.pk,
                 "item_id": item.item_id,
@@ -20,7 +20,13 @@ from requests.adapters import HTTPAdapter
 from requests.exceptions import HTTPError
 from requests.packages.urllib3.util.retry import Retry
 
-from concordia.models import Asset, Item, MediaType
+from concordia.models import (
+    Asset,
+    Item,
+    MediaType,
+    SiteReportEvent,
+    TranscriptionStatusCount,
+)
 from concordia.storage import ASSET_STORAGE
 from importer.models import ImportItem, ImportItemAsset, ImportJob
 
@@ -426,6 +432,12 @@ def import_item(self, import_item):
 
     Asset.objects.bulk_create(item_assets)
 
+    # bulk_create skips the post_save handler which records new assets for the
+    # transcription status counts and the incremental site reports:
+    asset_changes = [(None, i.get_tracked_values()) for i in item_assets]
+    TranscriptionStatusCount.objects.apply_asset_changes(asset_changes)
+    SiteReportEvent.objects.record_asset_changes(asset_changes)
+
     for asset in item_assets:
         import_asset = ImportItemAsset(
             import_item=import_item,